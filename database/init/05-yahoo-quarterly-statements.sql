@@ -0,0 +1,19 @@
+-- Quarterly financial statements for Yahoo Finance data
+-- Quarterly rows share fiscal_year with each other, so the statement tables are
+-- keyed on fiscal_quarter as well: the calendar quarter of the period end date
+-- for 'quarterly' rows and 0 for 'annual' rows.
+
+ALTER TABLE yahoo_income_statement ADD COLUMN IF NOT EXISTS fiscal_quarter INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE yahoo_balance_sheet ADD COLUMN IF NOT EXISTS fiscal_quarter INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE yahoo_cash_flow ADD COLUMN IF NOT EXISTS fiscal_quarter INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE yahoo_income_statement DROP CONSTRAINT IF EXISTS yahoo_income_statement_symbol_fiscal_year_period_type_key;
+ALTER TABLE yahoo_balance_sheet DROP CONSTRAINT IF EXISTS yahoo_balance_sheet_symbol_fiscal_year_period_type_key;
+ALTER TABLE yahoo_cash_flow DROP CONSTRAINT IF EXISTS yahoo_cash_flow_symbol_fiscal_year_period_type_key;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_yahoo_income_statement_period
+    ON yahoo_income_statement (symbol, fiscal_year, period_type, fiscal_quarter);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_yahoo_balance_sheet_period
+    ON yahoo_balance_sheet (symbol, fiscal_year, period_type, fiscal_quarter);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_yahoo_cash_flow_period
+    ON yahoo_cash_flow (symbol, fiscal_year, period_type, fiscal_quarter);
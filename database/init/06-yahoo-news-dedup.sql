@@ -0,0 +1,35 @@
+-- De-duplicated Yahoo news
+-- A story is stored once, keyed on a hash of its normalised title and publisher;
+-- every ticker it was fetched under is kept in `symbols`. `symbol` remains the
+-- first ticker the story was seen under.
+-- content_hash must match news_dedup.content_hash() in the data-ingestion service.
+
+ALTER TABLE yahoo_news ADD COLUMN IF NOT EXISTS content_hash CHAR(32);
+ALTER TABLE yahoo_news ADD COLUMN IF NOT EXISTS symbols TEXT[] NOT NULL DEFAULT '{}';
+
+UPDATE yahoo_news
+SET content_hash = md5(lower(trim(regexp_replace(title, '\s+', ' ', 'g'))) || '|' ||
+                       lower(trim(coalesce(publisher, '')))),
+    symbols = ARRAY[symbol]::TEXT[]
+WHERE content_hash IS NULL;
+
+-- Collapse stories stored once per ticker into their oldest row
+WITH stories AS (
+    SELECT content_hash, MIN(id) AS keep_id, array_agg(DISTINCT symbol) AS all_symbols
+    FROM yahoo_news
+    GROUP BY content_hash
+    HAVING COUNT(*) > 1
+)
+UPDATE yahoo_news n
+SET symbols = s.all_symbols
+FROM stories s
+WHERE n.id = s.keep_id;
+
+DELETE FROM yahoo_news n
+USING yahoo_news k
+WHERE n.content_hash = k.content_hash AND n.id > k.id;
+
+ALTER TABLE yahoo_news ALTER COLUMN content_hash SET NOT NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_yahoo_news_content_hash ON yahoo_news (content_hash);
+CREATE INDEX IF NOT EXISTS idx_yahoo_news_symbols ON yahoo_news USING GIN (symbols);
@@ -0,0 +1,16 @@
+-- Per-series indicator state for incremental Fyers ingestion
+-- Holds what is needed to continue SMA-20/50 and Wilder RSI-14 from the last
+-- stored bar of each (symbol, resolution); see indicators.continue_indicators in
+-- the data-ingestion service. A series without a row is recomputed on its next save.
+
+CREATE TABLE IF NOT EXISTS fyers_indicator_state (
+    symbol VARCHAR(50) NOT NULL,
+    resolution VARCHAR(10) NOT NULL DEFAULT '1D',
+    last_timestamp BIGINT NOT NULL,
+    closes DOUBLE PRECISION[] NOT NULL,
+    avg_gain DOUBLE PRECISION NOT NULL,
+    avg_loss DOUBLE PRECISION NOT NULL,
+    deltas INTEGER NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (symbol, resolution)
+);
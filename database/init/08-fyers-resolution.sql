@@ -0,0 +1,28 @@
+-- Candle resolution for Fyers historical data and indicator state
+-- Candles of different resolutions of one symbol are separate series: they are
+-- unique per (symbol, resolution, timestamp) and indicators continue per
+-- (symbol, resolution). Rows stored before the column existed were written by
+-- the daily ingestion and are labelled '1D'; indicator state is cleared so each
+-- series is recomputed from its stored candles on its next save.
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_name = 'fyers_historical_data' AND column_name = 'resolution') THEN
+        ALTER TABLE fyers_historical_data ADD COLUMN resolution VARCHAR(10) NOT NULL DEFAULT '1D';
+        ALTER TABLE fyers_historical_data DROP CONSTRAINT IF EXISTS fyers_historical_data_symbol_timestamp_key;
+        CREATE UNIQUE INDEX IF NOT EXISTS fyers_historical_data_symbol_resolution_timestamp_key
+            ON fyers_historical_data (symbol, resolution, timestamp);
+    END IF;
+END $$;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_name = 'fyers_indicator_state' AND column_name = 'resolution') THEN
+        DELETE FROM fyers_indicator_state;
+        ALTER TABLE fyers_indicator_state ADD COLUMN resolution VARCHAR(10) NOT NULL DEFAULT '1D';
+        ALTER TABLE fyers_indicator_state DROP CONSTRAINT IF EXISTS fyers_indicator_state_pkey;
+        ALTER TABLE fyers_indicator_state ADD PRIMARY KEY (symbol, resolution);
+    END IF;
+END $$;
@@ -6,6 +6,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from shared.database import db
 from shared.models import Algorithm, AlgorithmCreate, AlgorithmExecution, APIResponse
+from shared.fno_universe import fno_universe
 import importlib.util
 import asyncio
 import httpx
@@ -40,7 +41,9 @@ class AlgorithmExecutor:
                 
                 spec = importlib.util.spec_from_loader("custom_algo", loader=None)
                 module = importlib.util.module_from_spec(spec)
-                
+                # Custom algorithms pick expiries and strikes from the shared F&O universe
+                module.__dict__['fno_universe'] = fno_universe
+
                 exec(code, module.__dict__)
                 
                 algo_class = None
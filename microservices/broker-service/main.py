@@ -7,7 +7,9 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from shared.database import db
 from shared.models import BrokerConnection, APIResponse
+from shared.fno_universe import fno_universe
 from fyers_client import FyersClient
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,6 +27,17 @@ app.add_middleware(
 # Initialize Fyers client
 fyers_client = FyersClient()
 
+def load_fno_universe():
+    try:
+        fno_universe.load()
+    except Exception as e:
+        logger.error(f"Error loading F&O universe: {str(e)}")
+
+@app.on_event("startup")
+async def start_fno_universe():
+    """Load the F&O contract universe in the background; option-chain pre-filtering waits for it"""
+    asyncio.get_running_loop().run_in_executor(None, load_fno_universe)
+
 @app.get("/api/fyers/auth-url")
 async def get_fyers_auth_url():
     try:
@@ -188,14 +201,44 @@ async def get_historical_data(symbol: str, resolution: str = "D", from_date: str
         return APIResponse(success=False, error=str(e))
 
 @app.get("/api/fyers/optionchain")
-async def get_option_chain(symbol: str, strikecount: int = 5, timestamp: str = None):
+def get_option_chain(symbol: str, strikecount: int = 5, timestamp: str = None):
     try:
+        # Symbols without listed options and expiries that don't exist never reach Fyers
+        if fno_universe.ready():
+            if not fno_universe.has_derivatives(symbol):
+                return APIResponse(success=False, error=f"No options listed for {symbol}")
+            if timestamp and fno_universe.match_expiry(symbol, int(timestamp)) is None:
+                return APIResponse(success=False, error=f"No {symbol} expiry on {timestamp}; "
+                                                        f"listed: {fno_universe.expiries(symbol)}")
         result = fyers_client.get_option_chain(symbol, strikecount, timestamp)
         return APIResponse(success=result["success"], data=result.get("data"), error=result.get("error"))
     except Exception as e:
         logger.error(f"Option chain error: {str(e)}")
         return APIResponse(success=False, error=str(e))
 
+@app.get("/api/fyers/optionchain/contracts")
+def get_option_contracts(symbol: str, spot: float = None, strikecount: int = None,
+                         expiry: int = None, option_type: str = None):
+    """Listed option contracts from the in-memory F&O universe, without a Fyers call.
+
+    Next expiry unless `expiry` is given; with `spot` and `strikecount`, only
+    that many strikes either side of the strike nearest spot.
+    """
+    try:
+        if expiry is not None:
+            expiry = fno_universe.match_expiry(symbol, expiry)
+            if expiry is None:
+                return APIResponse(success=False, error=f"No {symbol} expiry on that day")
+        contracts = fno_universe.chain(symbol, expiry, spot, strikecount, option_type)
+        return APIResponse(success=True, data={
+            "symbol": symbol,
+            "expiries": fno_universe.expiries(symbol),
+            "contracts": contracts
+        })
+    except Exception as e:
+        logger.error(f"Option contracts error: {str(e)}")
+        return APIResponse(success=False, error=str(e))
+
 @app.get("/api/fyers/funds")
 async def get_fyers_funds():
     try:
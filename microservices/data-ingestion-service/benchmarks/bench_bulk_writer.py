@@ -0,0 +1,96 @@
+"""Rows/sec of the row-at-a-time INSERT path vs the COPY + merge path.
+
+Writes synthetic daily candles for BENCH* symbols into yahoo_historical_data
+and deletes them afterwards. Uses the same DB_* environment as the service.
+
+    python benchmarks/bench_bulk_writer.py --symbols 50 --days 1250
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from yahoo_finance_service import YahooFinanceService, YAHOO_TABLES
+
+
+def synthetic_candles(symbols: int, days: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    timestamps = pd.date_range(end=pd.Timestamp.utcnow().normalize(), periods=days, freq='D')
+    frame = pd.DataFrame({
+        'timestamp': np.tile(timestamps, symbols),
+        'symbol': np.repeat([f"BENCH{i:04d}" for i in range(symbols)], days),
+    })
+    close = 100 + rng.standard_normal(len(frame)).cumsum()
+    frame['open'] = close + rng.standard_normal(len(frame))
+    frame['high'] = np.maximum(frame['open'], close) + 1
+    frame['low'] = np.minimum(frame['open'], close) - 1
+    frame['close'] = close
+    frame['adj_close'] = close
+    frame['volume'] = rng.integers(1_000, 1_000_000, len(frame))
+    frame['interval'] = '1d'
+    return frame
+
+
+def rowwise_upsert(service: YahooFinanceService, frame: pd.DataFrame) -> int:
+    """The previous save_historical_data implementation: one statement per candle"""
+    spec = YAHOO_TABLES['historical']
+    sql = spec.insert_sql()
+    conn = service.get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            for row in frame[spec.columns].astype(object).itertuples(index=False):
+                cursor.execute(sql, tuple(None if pd.isna(v) else v for v in row))
+        conn.commit()
+        return len(frame)
+    finally:
+        conn.close()
+
+
+def cleanup(service: YahooFinanceService):
+    conn = service.get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM yahoo_historical_data WHERE symbol LIKE 'BENCH%'")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def timed(label: str, fn, frame: pd.DataFrame):
+    start = time.perf_counter()
+    rows = fn(frame)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {rows:>9} rows  {elapsed:8.2f}s  {rows / elapsed:>10.0f} rows/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--days', type=int, default=1250)
+    args = parser.parse_args()
+
+    service = YahooFinanceService()
+    frame = synthetic_candles(args.symbols, args.days)
+    spec = YAHOO_TABLES['historical']
+
+    cleanup(service)
+    try:
+        rowwise = timed('row-wise', lambda f: rowwise_upsert(service, f), frame)
+        cleanup(service)
+        bulk = timed('copy', lambda f: service.bulk_writer.upsert(spec, f), frame)
+        # Second pass exercises the ON CONFLICT DO UPDATE branch
+        timed('copy (upd)', lambda f: service.bulk_writer.upsert(spec, f), frame)
+        print(f"speedup    {rowwise / bulk:.1f}x")
+    finally:
+        cleanup(service)
+
+
+if __name__ == "__main__":
+    main()
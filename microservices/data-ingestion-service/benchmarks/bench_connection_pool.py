@@ -0,0 +1,61 @@
+"""Connection overhead of psycopg2.connect per call vs the shared ConnectionPool.
+
+Replays the database checkouts of a 100-symbol ingest (by default 22 per
+symbol: one save and one log insert for each of the 11 stages) from a pool
+of worker threads, each checkout running a trivial query. Uses the same
+DB_* environment as YahooFinanceService.
+
+    python benchmarks/bench_connection_pool.py --symbols 100 --per-symbol 22 --workers 8
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from yahoo_finance_service import YahooFinanceService
+
+
+def run(checkouts: int, workers: int, connect) -> float:
+    def checkout(_):
+        conn = connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.commit()
+        finally:
+            conn.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(checkout, range(checkouts)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--symbols', type=int, default=100)
+    parser.add_argument('--per-symbol', type=int, default=22)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    service = YahooFinanceService()
+    checkouts = args.symbols * args.per_symbol
+
+    direct = run(checkouts, args.workers, lambda: psycopg2.connect(**service.db_config))
+    pooled = run(checkouts, args.workers, service.get_db_connection)
+
+    print(f"{checkouts} checkouts from {args.workers} threads")
+    print(f"psycopg2.connect per call: {direct:8.2f}s  {direct / checkouts * 1000:7.2f} ms/checkout")
+    print(f"shared pool:               {pooled:8.2f}s  {pooled / checkouts * 1000:7.2f} ms/checkout")
+    print(f"speedup: {direct / pooled:.1f}x  pool: {service.pool.status()}")
+    service.log_sink.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Per-label .loc extraction vs the vectorized statement_records path.
+
+Builds a synthetic statement shaped like yfinance output (~80 labels x 4
+periods, labels in arbitrary order, some mapped labels missing) and times
+both paths over the three statements. No network or database needed.
+
+    python benchmarks/bench_financial_statements.py --runs 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from yahoo_finance_service import YahooFinanceService, STATEMENT_FIELDS
+
+
+def synthetic_statement(fields, periods: int = 4) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    labels = list(fields.values())[:-2] + [f"Other Line Item {i}" for i in range(70)]
+    rng.shuffle(labels)
+    columns = pd.date_range(end='2025-03-31', periods=periods, freq='A-MAR')[::-1]
+    return pd.DataFrame(rng.integers(10**6, 10**10, (len(labels), periods)).astype(float),
+                        index=labels, columns=columns)
+
+
+def loop_records(statement: pd.DataFrame, fields, symbol: str):
+    """The previous fetch_financial_statements loop: one .loc lookup per field per period"""
+    rows = []
+    for period in statement.columns:
+        row = {'symbol': symbol.replace('.NS', ''), 'fiscal_year': period.year, 'period_type': 'annual'}
+        for column, label in fields.items():
+            row[column] = statement.loc[label, period] if label in statement.index else None
+        rows.append(row)
+    return rows
+
+
+def timed(label: str, fn, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {elapsed / runs * 1e6:10.1f} us per symbol")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=1000)
+    args = parser.parse_args()
+
+    statements = {name: synthetic_statement(fields) for name, fields in STATEMENT_FIELDS.items()}
+
+    def run_loop():
+        for name, statement in statements.items():
+            loop_records(statement, STATEMENT_FIELDS[name], 'RELIANCE.NS')
+
+    def run_vectorized():
+        for name, statement in statements.items():
+            YahooFinanceService.statement_records(statement, STATEMENT_FIELDS[name], 'RELIANCE.NS')
+
+    loop = timed('loop', run_loop, args.runs)
+    vectorized = timed('vectorized', run_vectorized, args.runs)
+    print(f"speedup      {loop / vectorized:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
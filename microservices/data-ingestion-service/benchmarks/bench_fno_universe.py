@@ -0,0 +1,92 @@
+"""FnOUniverse option-chain queries vs filtering the contract rows in Python.
+
+Uses the synthetic derivatives universe of bench_symbol_search (NIFTY and
+BANKNIFTY weeklies plus monthly stock options) or the NSE_FO/BSE_FO rows
+of symbol_master with --from-db, and times next-expiry chains around spot,
+one-sided strike selection and full-expiry chains.
+
+    python benchmarks/bench_fno_universe.py --underlyings 180 --strikes 80
+    python benchmarks/bench_fno_universe.py --from-db
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from bench_symbol_search import synthetic_universe, timed
+from shared.fno_universe import FnOUniverse
+
+NOW = 1727913600  # 2024-10-03, the synthetic universe's "today"
+
+
+def derivative_rows(underlyings: int, strikes: int):
+    rows = []
+    for row in synthetic_universe(underlyings, strikes):
+        if not row['expiry_date']:
+            continue
+        code = row['symbol_ticker'][-2:]
+        rows.append({**row, 'under_sym': row['ex_symbol'], 'opt_type': code if code in ('CE', 'PE') else 'XX',
+                     'underlying_ticker': None})
+    return rows
+
+
+def row_scan(rows, underlying, spot, strike_count):
+    """Python filter over the rows: next expiry, then the strike_count strikes around spot"""
+    contracts = [row for row in rows if row['under_sym'] == underlying and row['opt_type'] in ('CE', 'PE')
+                 and int(row['expiry_date']) >= NOW]
+    expiry = min(int(row['expiry_date']) for row in contracts)
+    contracts = [row for row in contracts if int(row['expiry_date']) == expiry]
+    strikes = sorted({row['strike_price'] for row in contracts})
+    atm = min(range(len(strikes)), key=lambda i: abs(strikes[i] - spot))
+    keep = set(strikes[max(0, atm - strike_count):atm + strike_count + 1])
+    return [row for row in contracts if row['strike_price'] in keep]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--underlyings', type=int, default=180)
+    parser.add_argument('--strikes', type=int, default=80)
+    parser.add_argument('--strike-count', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--from-db', action='store_true', help="load NSE_FO/BSE_FO from symbol_master")
+    args = parser.parse_args()
+
+    universe = FnOUniverse(ttl=float('inf'))
+    start = time.perf_counter()
+    if args.from_db:
+        rows = universe.fetch_rows()
+    else:
+        rows = derivative_rows(args.underlyings, args.strikes)
+    universe.load(rows)
+    print(f"loaded {len(rows)} rows in {time.perf_counter() - start:.2f}s: {universe.stats()}")
+
+    now = None if args.from_db else NOW
+    spots = {'NIFTY': 25013.0, 'BANKNIFTY': 51990.0, 'RELIANCE': 2003.0}
+    print(f"{'query':<34} {'p50 us':>10}   result")
+    for underlying, spot in spots.items():
+        if not universe.has_derivatives(underlying):
+            continue
+        expiry = universe.next_expiry(underlying, now)
+        queries = [
+            (f"{underlying} next expiry", lambda: universe.next_expiry(underlying, now)),
+            (f"{underlying} chain +-{args.strike_count}",
+             lambda: universe.chain(underlying, expiry, spot, args.strike_count)),
+            (f"{underlying} 2 OTM CE", lambda: universe.select_strike(underlying, spot, 'CE', 2, expiry)),
+            (f"{underlying} full expiry", lambda: universe.chain(underlying, expiry)),
+        ]
+        for name, query in queries:
+            elapsed, result = timed(query, args.repeat)
+            summary = f"{len(result)} contracts" if isinstance(result, list) else \
+                (result['symbol'] if isinstance(result, dict) else result)
+            print(f"{name:<34} {elapsed:>10.1f}   {summary}")
+        if not args.from_db:
+            elapsed, result = timed(lambda: row_scan(rows, underlying, spot, args.strike_count), 3)
+            print(f"{underlying + ' row scan +-' + str(args.strike_count):<34} {elapsed:>10.1f}   {len(result)} contracts")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""FyersHistoricalService.save_to_database: row-wise INSERTs vs the COPY + merge path.
+
+Saves synthetic 1-minute candles (375 per trading day) for NSE:BENCH*
+symbols one symbol at a time, as ingest_all_symbols does, computing the
+indicators on each call, and deletes them afterwards. Uses the same
+POSTGRES_* environment as the service.
+
+    python benchmarks/bench_fyers_save.py --symbols 100 --days 5
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from fyers_service import FyersHistoricalService
+
+
+def synthetic_candles(symbols: int, days: int):
+    """One list of process_candles-style records per symbol"""
+    rng = np.random.default_rng(42)
+    sessions = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=days)
+    minutes = (sessions.values[:, None] + np.timedelta64(225, 'm')
+               + np.arange(375) * np.timedelta64(1, 'm')).ravel()
+    timestamps = minutes.astype('datetime64[s]').astype(np.int64)
+    dates = pd.to_datetime(timestamps, unit='s').date
+
+    per_symbol = []
+    for i in range(symbols):
+        close = 1000 + rng.standard_normal(len(timestamps)).cumsum()
+        open_ = close + rng.standard_normal(len(timestamps))
+        frame = pd.DataFrame({
+            'timestamp': timestamps, 'date': dates, 'open': open_,
+            'high': np.maximum(open_, close) + 1, 'low': np.minimum(open_, close) - 1,
+            'close': close, 'volume': rng.integers(100, 100_000, len(timestamps)),
+            'symbol': f"NSE:BENCH{i:03d}-EQ"
+        })
+        per_symbol.append(frame.to_dict('records'))
+    return per_symbol
+
+
+def rowwise_save(service: FyersHistoricalService, data) -> int:
+    """The previous save_to_database insert loop: iterrows with per-cell pd.isna checks"""
+    df, _ = service.calculate_indicators(pd.DataFrame(data))
+    conn = service.get_db_connection()
+    try:
+        cursor = conn.cursor()
+        for _, row in df.iterrows():
+            cursor.execute("""
+                INSERT INTO fyers_historical_data
+                (timestamp, date, open, high, low, close, volume, symbol,
+                 sma_20, sma_50, price_change, price_change_pct, rsi_14)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (symbol, resolution, timestamp) DO NOTHING
+            """, (
+                int(row['timestamp']), row['date'], float(row['open']), float(row['high']),
+                float(row['low']), float(row['close']), int(row['volume']), row['symbol'],
+                float(row['sma_20']) if not pd.isna(row['sma_20']) else None,
+                float(row['sma_50']) if not pd.isna(row['sma_50']) else None,
+                float(row['price_change']) if not pd.isna(row['price_change']) else None,
+                float(row['price_change_pct']) if not pd.isna(row['price_change_pct']) else None,
+                float(row['rsi_14']) if not pd.isna(row['rsi_14']) else None
+            ))
+        conn.commit()
+        return len(df)
+    finally:
+        conn.close()
+
+
+def cleanup(service: FyersHistoricalService):
+    conn = service.get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM fyers_historical_data WHERE symbol LIKE 'NSE:BENCH%'")
+            cursor.execute("DELETE FROM fyers_indicator_state WHERE symbol LIKE 'NSE:BENCH%'")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def timed(label: str, save, per_symbol) -> float:
+    start = time.perf_counter()
+    rows = sum(save(data) for data in per_symbol)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {rows:>9} rows  {elapsed:8.2f}s  {rows / elapsed:>10.0f} rows/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=100)
+    parser.add_argument('--days', type=int, default=5)
+    args = parser.parse_args()
+
+    service = FyersHistoricalService()
+    service.ensure_schema()
+    per_symbol = synthetic_candles(args.symbols, args.days)
+
+    cleanup(service)
+    try:
+        rowwise = timed('row-wise', lambda data: rowwise_save(service, data), per_symbol)
+        cleanup(service)
+        bulk = timed('copy', lambda data: service.save_to_database(data, "fyers_historical_data"),
+                     per_symbol)
+        print(f"speedup    {rowwise / bulk:.1f}x")
+    finally:
+        cleanup(service)
+
+
+if __name__ == "__main__":
+    main()
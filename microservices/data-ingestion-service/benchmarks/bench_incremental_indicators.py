@@ -0,0 +1,60 @@
+"""Incremental indicator updates vs recomputing the whole series.
+
+Builds a synthetic daily close series per symbol, computes SMA-20/50 and
+RSI-14 over the full history, then replays the last --updates days one bar
+at a time from the carried state. Checks both give identical values and
+times the daily update against a full recompute. No database needed.
+
+    python benchmarks/bench_incremental_indicators.py --symbols 500 --bars 2500 --updates 20
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from indicators import continue_indicators
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--bars', type=int, default=2500)
+    parser.add_argument('--updates', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    series = [1000 + rng.standard_normal(args.bars).cumsum() for _ in range(args.symbols)]
+    split = args.bars - args.updates
+
+    states = [continue_indicators(closes[:split])[1] for closes in series]
+
+    start = time.perf_counter()
+    full = [continue_indicators(closes)[0] for closes in series]
+    full_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    incremental = []
+    for closes, state in zip(series, states):
+        days = []
+        for bar in closes[split:]:
+            values, state = continue_indicators([bar], state)
+            days.append(values)
+        incremental.append({name: np.concatenate([day[name] for day in days]) for name in days[0]})
+    incremental_seconds = time.perf_counter() - start
+
+    identical = all(np.array_equal(whole[name][split:], update[name], equal_nan=True)
+                    for whole, update in zip(full, incremental) for name in update)
+    updates = args.symbols * args.updates
+    print(f"full recompute     {full_seconds:8.3f}s  ({args.symbols} symbols x {args.bars} bars)")
+    print(f"incremental        {incremental_seconds:8.3f}s  ({updates} one-bar updates, "
+          f"{incremental_seconds / updates * 1e6:.0f} us each)")
+    print(f"per daily update   {full_seconds * args.updates / incremental_seconds:.0f}x "
+          f"cheaper than recomputing, identical values: {identical}")
+
+
+if __name__ == '__main__':
+    main()
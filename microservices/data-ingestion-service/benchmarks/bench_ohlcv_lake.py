@@ -0,0 +1,84 @@
+"""Read latency of the Parquet OHLCV lake on ten years of synthetic daily bars.
+
+Writes a throwaway lake (no database needed) and times a full load, a
+single-symbol load and a one-year window, as DataFrames and as NumPy arrays.
+Then appends export-sized changes (200 symbols, last 5 bars) as part files,
+times the same reads over the parts, and compacts.
+
+    python benchmarks/bench_ohlcv_lake.py --symbols 2000 --years 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from ohlcv_lake import OHLCVLake
+
+
+def synthetic_bars(symbols: int, years: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    timestamps = pd.bdate_range(end=pd.Timestamp.utcnow().normalize(), periods=years * 250, tz='UTC')
+    frame = pd.DataFrame({
+        'symbol': np.repeat([f"SYM{i:04d}" for i in range(symbols)], len(timestamps)),
+        'timestamp': np.tile(timestamps, symbols),
+    })
+    close = 100 + rng.standard_normal(len(frame)).cumsum()
+    frame['open'] = close + rng.standard_normal(len(frame))
+    frame['high'] = np.maximum(frame['open'], close) + 1
+    frame['low'] = np.minimum(frame['open'], close) - 1
+    frame['close'] = close
+    frame['adj_close'] = close
+    frame['volume'] = rng.integers(1_000, 1_000_000, len(frame))
+    return frame
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    rows = len(result) if isinstance(result, pd.DataFrame) else len(next(iter(result.values())))
+    print(f"{label:<32} {time.perf_counter() - start:7.3f}s  {rows:>10} rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--symbols', type=int, default=2000)
+    parser.add_argument('--years', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        lake = OHLCVLake(root, connection_factory=None)
+        bars = synthetic_bars(args.symbols, args.years)
+        start = time.perf_counter()
+        lake.write_frame('yahoo', '1d', bars)
+        print(f"{'write':<32} {time.perf_counter() - start:7.3f}s  {len(bars):>10} rows")
+
+        last_year = bars['timestamp'].max() - pd.Timedelta(days=365)
+        timed('read all (DataFrame)', lambda: lake.read('yahoo', '1d'))
+        timed('read all (NumPy)', lambda: lake.read_arrays('yahoo', '1d'))
+        timed('read close only (NumPy)', lambda: lake.read_arrays('yahoo', '1d', columns=['close']))
+        timed('read one symbol', lambda: lake.read('yahoo', '1d', symbols=['SYM0042']))
+        timed('read last year, 50 symbols', lambda: lake.read(
+            'yahoo', '1d', symbols=[f"SYM{i:04d}" for i in range(50)], start=last_year))
+
+        recent = bars[bars['timestamp'] >= bars['timestamp'].unique()[-5]]
+        start = time.perf_counter()
+        for first in range(0, args.symbols, 200):
+            chunk = recent[recent['symbol'].isin([f"SYM{i:04d}" for i in range(first, first + 200)])]
+            lake.write_frame('yahoo', '1d', chunk.assign(close=chunk['close'] + 1))
+        print(f"{'append last 5 bars':<32} {time.perf_counter() - start:7.3f}s  {len(recent):>10} rows")
+
+        timed('read all, with parts (NumPy)', lambda: lake.read_arrays('yahoo', '1d'))
+        timed('read one symbol, with parts', lambda: lake.read('yahoo', '1d', symbols=['SYM0042']))
+        start = time.perf_counter()
+        result = lake.compact('yahoo', '1d')
+        print(f"{'compact':<32} {time.perf_counter() - start:7.3f}s  {result['parts']:>10} parts")
+
+
+if __name__ == '__main__':
+    main()
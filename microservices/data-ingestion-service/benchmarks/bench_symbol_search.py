@@ -0,0 +1,167 @@
+"""SymbolIndex search vs a LIKE '%q%'-style substring scan.
+
+Builds a synthetic universe shaped like the Fyers masters (NSE/BSE
+equities, indices, and weekly/monthly stock and index options and
+futures; about 100k rows by default), or loads symbol_master with
+--from-db. Then runs type-ahead sequences, multi-word names, typos and
+derivative codes through both and reports per-query latency percentiles.
+
+    python benchmarks/bench_symbol_search.py --underlyings 180 --strikes 80
+    python benchmarks/bench_symbol_search.py --from-db
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from symbol_index import INDEX_COLUMNS, SymbolIndex
+
+COMPANIES = [
+    ("RELIANCE", "RELIANCE INDUSTRIES LTD"), ("TCS", "TATA CONSULTANCY SERV LT"),
+    ("HDFCBANK", "HDFC BANK LTD"), ("INFY", "INFOSYS LIMITED"), ("ICICIBANK", "ICICI BANK LTD."),
+    ("HINDUNILVR", "HINDUSTAN UNILEVER LTD."), ("ITC", "ITC LTD"), ("SBIN", "STATE BANK OF INDIA"),
+    ("BHARTIARTL", "BHARTI AIRTEL LIMITED"), ("KOTAKBANK", "KOTAK MAHINDRA BANK LTD"),
+    ("TATAMOTORS", "TATA MOTORS LIMITED"), ("TATASTEEL", "TATA STEEL LIMITED"),
+    ("BAJFINANCE", "BAJAJ FINANCE LIMITED"), ("BAJAJ-AUTO", "BAJAJ AUTO LIMITED"),
+    ("M&M", "MAHINDRA & MAHINDRA LTD"), ("MARUTI", "MARUTI SUZUKI INDIA LTD."),
+    ("ASIANPAINT", "ASIAN PAINTS LIMITED"), ("WIPRO", "WIPRO LTD"), ("LT", "LARSEN & TOUBRO LTD."),
+    ("ADANIENT", "ADANI ENTERPRISES LIMITED"), ("AXISBANK", "AXIS BANK LIMITED"),
+]
+SYLLABLES = ["AL", "AN", "AR", "BA", "BH", "CH", "DE", "GA", "HI", "IN", "JA", "KA", "KO", "LA", "MA",
+             "NA", "NI", "PA", "RA", "SA", "SH", "SU", "TA", "TE", "VA", "VI", "YA", "ZE"]
+SUFFIXES = ["INDUSTRIES", "FINANCE", "PHARMA", "TEXTILES", "CHEMICALS", "MOTORS", "STEEL", "POWER",
+            "CEMENT", "INFRA", "FOODS", "TECH", "BANK", "CAPITAL", "AGRO", "POLYMERS"]
+
+QUERIES = {
+    'type-ahead': ["r", "re", "rel", "reli", "relia", "relian", "relianc", "reliance",
+                   "h", "hd", "hdf", "hdfc", "t", "ta", "tat", "tata", "tatam", "tatamo"],
+    'words': ["hdfc bank", "tata motors", "state bank", "bajaj fin", "industries", "mahindra",
+              "asian paints", "infosys", "larsen", "bank of india"],
+    'typos': ["relaince", "infosis", "tatamotrs", "bajaj finanse", "mahindar", "hdfcbnak", "wipor"],
+    'derivatives': ["nifty", "banknifty", "nifty 24", "reliance fut", "banknifty 52000 ce",
+                    "banknifty24o", "tcs 4000 pe"],
+    'ticker': ["NSE:RELIANCE-EQ", "NSE:NIFTY50-INDEX", "BSE:TCS-A"],
+}
+
+
+def synthetic_universe(underlyings: int, strikes: int, seed: int = 3):
+    rng = random.Random(seed)
+    companies = list(COMPANIES)
+    names = {symbol for symbol, _ in companies}
+    while len(companies) < 2500:
+        stem = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        suffix = rng.choice(SUFFIXES)
+        symbol = (stem + suffix[:rng.randint(0, 4)])[:10]
+        if symbol not in names:
+            names.add(symbol)
+            companies.append((symbol, f"{stem} {suffix} LTD"))
+
+    rows = []
+
+    def add(ticker, ex_symbol, details, exchange, series, expiry=None, strike=None):
+        rows.append({'symbol_ticker': ticker, 'fy_token': str(len(rows)), 'ex_symbol': ex_symbol,
+                     'sym_details': details, 'exchange_name': exchange, 'ex_series': series,
+                     'previous_close': 100.0, 'upper_price': 110.0, 'lower_price': 90.0, 'min_lot_size': 1,
+                     'tick_size': 0.05, 'trade_status': 1, 'symbol_desc': details,
+                     'expiry_date': str(int(expiry.timestamp())) if expiry else '', 'strike_price': strike})
+
+    for symbol, name in companies:
+        add(f"NSE:{symbol}-EQ", symbol, name, 'NSE', 'EQ')
+        add(f"BSE:{symbol}-A", symbol, name, 'BSE', 'A')
+    for index in ["NIFTY50", "NIFTYBANK", "FINNIFTY", "NIFTYIT", "INDIAVIX"]:
+        add(f"NSE:{index}-INDEX", index, index.replace("NIFTY", "NIFTY "), 'NSE', 'INDEX')
+
+    today = datetime(2024, 10, 3)
+    # Fyers codes: YYMON for a month's last expiry, YY + month digit/O/N/D + DD for weeklies
+    month_codes = "123456789OND"
+    derivatives = [("NIFTY", 25000, 8), ("BANKNIFTY", 52000, 8)] + \
+        [(symbol, rng.choice([500, 1000, 2000, 4000]), 3) for symbol, _ in companies[:underlyings]]
+    for underlying, spot, expiries in derivatives:
+        step = max(spot // 100, 5)
+        for e in range(expiries):
+            expiry = today + timedelta(days=7 * (e + 1))
+            if (expiry + timedelta(days=7)).month != expiry.month:
+                code = f"{expiry:%y}{expiry.strftime('%b').upper()}"
+            else:
+                code = f"{expiry:%y}{month_codes[expiry.month - 1]}{expiry:%d}"
+            add(f"NSE:{underlying}{code}FUT", underlying, f"{underlying} {expiry:%d %b %y} FUT", 'NSE', 'XX', expiry)
+            for k in range(-strikes // 2, strikes // 2):
+                strike = spot + k * step
+                for side in ("CE", "PE"):
+                    add(f"NSE:{underlying}{code}{strike}{side}", underlying,
+                        f"{underlying} {expiry:%d %b %y} {strike} {side}", 'NSE', 'XX', expiry, strike)
+    return rows
+
+
+def load_from_db():
+    from shared.database import db
+    conn = db.get_connection()
+    try:
+        import psycopg2.extras
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        cursor.execute(f"SELECT {', '.join(INDEX_COLUMNS)} FROM symbol_master")
+        return cursor.fetchall()
+    finally:
+        db.pool.putconn(conn)
+
+
+def like_scan(rows, query, exchange, limit):
+    """What the SQL did: first `limit` rows whose details or ticker contain the query"""
+    needle = query.upper()
+    found = []
+    for row in rows:
+        if exchange and row['exchange_name'] != exchange:
+            continue
+        if needle in (row['sym_details'] or '').upper() or needle in row['symbol_ticker'].upper():
+            found.append(row)
+            if len(found) >= limit:
+                break
+    return found
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--underlyings', type=int, default=180)
+    parser.add_argument('--strikes', type=int, default=80)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--exchange', default=None, help="e.g. NSE, as the frontend's search sends")
+    parser.add_argument('--from-db', action='store_true', help="index symbol_master instead of synthetic rows")
+    parser.add_argument('--show', action='store_true', help="print the top hits of each query")
+    args = parser.parse_args()
+
+    rows = load_from_db() if args.from_db else synthetic_universe(args.underlyings, args.strikes)
+    start = time.perf_counter()
+    index = SymbolIndex(rows)
+    print(f"built index over {len(index)} rows in {time.perf_counter() - start:.2f}s: {index.stats()}")
+
+    print(f"{'queries':<12} {'index p50':>10} {'index max':>10} {'scan p50':>10} {'scan max':>10}   (us per query)")
+    for category, queries in QUERIES.items():
+        index_times, scan_times = [], []
+        for query in queries:
+            elapsed, hits = timed(lambda: index.search(query, args.exchange, args.limit), args.repeat)
+            index_times.append(elapsed)
+            scan_times.append(timed(lambda: like_scan(rows, query, args.exchange, args.limit), 3)[0])
+            if args.show:
+                print(f"  {query!r:<24} {[hit['symbol_ticker'] for hit in hits[:4]]}")
+        print(f"{category:<12} {statistics.median(index_times):>10.0f} {max(index_times):>10.0f} "
+              f"{statistics.median(scan_times):>10.0f} {max(scan_times):>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Per-symbol fetch time: a new yf.Ticker per stage vs one shared Ticker and session.
+
+Fetches every ingestion stage for each symbol (no database writes) two ways:
+sequentially with a fresh yf.Ticker and its own session per stage, as the
+fetchers used to, and with the stages issued concurrently on the symbol's
+shared Ticker. Needs network access to Yahoo Finance.
+
+    python benchmarks/bench_ticker_sessions.py --symbols RELIANCE.NS TCS.NS INFY.NS
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yfinance as yf
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from yahoo_finance_service import YahooFinanceService
+
+
+class FreshTickers:
+    """Stand-in for TickerSessions that builds a new Ticker on every call"""
+
+    def get(self, symbol: str) -> yf.Ticker:
+        return yf.Ticker(symbol)
+
+
+def fresh_per_stage(service: YahooFinanceService, symbol: str, stages) -> float:
+    shared, service.tickers = service.tickers, FreshTickers()
+    start = time.perf_counter()
+    try:
+        for stage in stages:
+            service.fetch_stage(stage, symbol)
+    finally:
+        service.tickers = shared
+    return time.perf_counter() - start
+
+
+def shared_concurrent(service: YahooFinanceService, symbol: str, stages) -> float:
+    start = time.perf_counter()
+    service.tickers.open([symbol])
+    try:
+        with ThreadPoolExecutor(max_workers=len(stages)) as pool:
+            list(pool.map(lambda stage: service.fetch_stage(stage, symbol), stages))
+    finally:
+        service.tickers.release(symbol)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--symbols', nargs='+', default=['RELIANCE.NS', 'TCS.NS', 'INFY.NS'])
+    args = parser.parse_args()
+
+    service = YahooFinanceService()
+    stages = service.get_ingestion_stages()
+    fresh, shared = [], []
+    for symbol in args.symbols:
+        fresh.append(fresh_per_stage(service, symbol, stages))
+        shared.append(shared_concurrent(service, symbol, stages))
+        print(f"{symbol:<16} fresh Ticker per stage {fresh[-1]:6.2f}s   shared Ticker {shared[-1]:6.2f}s")
+
+    fresh_avg, shared_avg = sum(fresh) / len(fresh), sum(shared) / len(shared)
+    print(f"{len(stages)} stages per symbol, average per symbol: "
+          f"{fresh_avg:.2f}s -> {shared_avg:.2f}s ({fresh_avg / shared_avg:.1f}x)")
+    print(f"tickers: {service.tickers.stats()}")
+    service.log_sink.close()
+
+
+if __name__ == '__main__':
+    main()
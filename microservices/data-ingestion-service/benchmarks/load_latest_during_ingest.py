@@ -0,0 +1,90 @@
+"""p50/p95/p99 latency of GET /yahoo/latest, idle and while a Yahoo ingest runs.
+
+Needs the service running (uvicorn main:app). Measures a baseline first,
+then starts an ingest job, measures again and cancels the job.
+
+    python benchmarks/load_latest_during_ingest.py --url http://localhost:8000 --clients 8
+"""
+import argparse
+import statistics
+import threading
+import time
+from typing import List
+
+import requests
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def hammer(url: str, clients: int, seconds: float) -> dict:
+    """Issue GET /yahoo/latest from `clients` threads for `seconds`"""
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def client():
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                response = session.get(f"{url}/yahoo/latest", params={'limit': 30}, timeout=120)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if not latencies:
+        return {'requests': 0, 'errors': errors[0]}
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': round(len(latencies) / seconds, 1),
+        'p50_ms': round(percentile(latencies, 0.50), 1),
+        'p95_ms': round(percentile(latencies, 0.95), 1),
+        'p99_ms': round(percentile(latencies, 0.99), 1),
+        'max_ms': round(max(latencies), 1),
+        'mean_ms': round(statistics.mean(latencies), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=30)
+    args = parser.parse_args()
+
+    print('idle       ', hammer(args.url, args.clients, args.seconds))
+
+    # No symbols in the body: the service ingests its symbol-master universe
+    response = requests.post(f"{args.url}/yahoo/ingest", params={
+        'period': '5y', 'full_refresh': 'true'
+    }, timeout=30)
+    response.raise_for_status()
+    job_id = response.json()['job']['job_id']
+    try:
+        # Give the job a moment to leave the queue and start fetching
+        time.sleep(2)
+        print('ingesting  ', hammer(args.url, args.clients, args.seconds))
+        print('job        ', requests.get(f"{args.url}/jobs/{job_id}", timeout=30).json()['status'])
+    finally:
+        requests.post(f"{args.url}/jobs/{job_id}/cancel", timeout=30)
+
+
+if __name__ == '__main__':
+    main()
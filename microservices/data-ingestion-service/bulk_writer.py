@@ -0,0 +1,150 @@
+import io
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+Records = Union[pd.DataFrame, List[Dict[str, Any]]]
+
+COPY_NULL = '\\N'
+
+
+class TableSpec:
+    """Describes how a batch of records is merged into a target table"""
+
+    def __init__(self, table: str, columns: Sequence[str], conflict_columns: Sequence[str],
+                 update_columns: Optional[Sequence[str]] = None,
+                 touch_columns: Sequence[str] = ('updated_at',),
+                 array_columns: Sequence[str] = (),
+                 update_expressions: Optional[Dict[str, str]] = None,
+                 update_where: Optional[str] = None,
+                 skip_when: Optional[str] = None):
+        self.table = table
+        self.columns = list(columns)
+        self.conflict_columns = list(conflict_columns)
+        # None means "every non-key column"; an empty list means DO NOTHING
+        if update_columns is None:
+            update_columns = [c for c in self.columns if c not in self.conflict_columns]
+        self.update_columns = list(update_columns)
+        self.touch_columns = list(touch_columns) if self.update_columns else []
+        self.array_columns = set(array_columns)
+        # SQL replacing "EXCLUDED.<column>" for some update columns, e.g. to merge arrays
+        self.update_expressions = dict(update_expressions or {})
+        # Only rows matching this condition are updated on conflict
+        self.update_where = update_where
+        # Condition on the staged row (alias "s") for rows to leave out of the merge,
+        # e.g. ones that would violate a second unique key
+        self.skip_when = skip_when
+
+    def conflict_clause(self) -> str:
+        conflict = ", ".join(self.conflict_columns)
+        if not self.update_columns:
+            return f"ON CONFLICT ({conflict}) DO NOTHING"
+        assignments = [f"{c} = {self.update_expressions.get(c, f'EXCLUDED.{c}')}"
+                       for c in self.update_columns]
+        assignments += [f"{c} = CURRENT_TIMESTAMP" for c in self.touch_columns]
+        clause = f"ON CONFLICT ({conflict}) DO UPDATE SET " + ", ".join(assignments)
+        if self.update_where:
+            clause += f" WHERE {self.update_where}"
+        return clause
+
+    def insert_sql(self) -> str:
+        """Single-row INSERT ... ON CONFLICT statement (the row-at-a-time path)"""
+        placeholders = ", ".join(["%s"] * len(self.columns))
+        return (f"INSERT INTO {self.table} ({', '.join(self.columns)}) "
+                f"VALUES ({placeholders}) {self.conflict_clause()}")
+
+    def merge_sql(self, stage: str) -> str:
+        """Set-based merge of the staging table into the target table"""
+        cols = ", ".join(self.columns)
+        where = f" WHERE NOT ({self.skip_when})" if self.skip_when else ""
+        return (f"INSERT INTO {self.table} ({cols}) SELECT {cols} FROM {stage} s{where} "
+                f"{self.conflict_clause()}")
+
+
+class BulkUpsertWriter:
+    """Streams record batches into a temp staging table with COPY and merges
+    them into the target table with one INSERT ... SELECT ... ON CONFLICT per batch."""
+
+    def __init__(self, connection_factory: Callable[[], Any], batch_size: int = 50000):
+        self.connection_factory = connection_factory
+        self.batch_size = batch_size
+
+    def to_frame(self, spec: TableSpec, data: Records) -> pd.DataFrame:
+        """Project records onto the spec columns, ready for COPY"""
+        frame = data if isinstance(data, pd.DataFrame) else pd.DataFrame.from_records(data)
+        frame = frame.reindex(columns=spec.columns)
+        # ON CONFLICT cannot touch the same key twice in one statement,
+        # so keep only the latest record for each key
+        frame = frame.drop_duplicates(subset=spec.conflict_columns, keep='last')
+
+        for column in spec.columns:
+            series = frame[column]
+            if column in spec.array_columns:
+                frame[column] = series.map(self._array_literal)
+            elif pd.api.types.is_float_dtype(series.dtype):
+                values = series.to_numpy(dtype='float64', na_value=np.nan)
+                finite = values[~np.isnan(values)]
+                # Integral floats (NaN-widened BIGINT columns) must be written
+                # without a trailing ".0" or COPY rejects them for integer columns
+                if finite.size and np.all(np.mod(finite, 1) == 0) and np.all(np.abs(finite) < 2 ** 63):
+                    frame[column] = series.astype('Int64')
+        return frame
+
+    @staticmethod
+    def _array_literal(value) -> Optional[str]:
+        if value is None or (not isinstance(value, (list, tuple, np.ndarray)) and pd.isna(value)):
+            return None
+        items = ['"' + str(v).replace('\\', '\\\\').replace('"', '\\"') + '"' for v in value]
+        return "{" + ",".join(items) + "}"
+
+    def _copy_batch(self, cursor, spec: TableSpec, stage: str, frame: pd.DataFrame) -> int:
+        buffer = io.StringIO()
+        frame.to_csv(buffer, header=False, index=False, na_rep=COPY_NULL)
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {stage} ({', '.join(spec.columns)}) FROM STDIN "
+            f"WITH (FORMAT csv, NULL '{COPY_NULL}')",
+            buffer
+        )
+        cursor.execute(spec.merge_sql(stage))
+        cursor.execute(f"TRUNCATE {stage}")
+        return len(frame)
+
+    def write(self, cursor, spec: TableSpec, data: Records) -> int:
+        """Upsert records using an open cursor; the caller owns the transaction"""
+        frame = self.to_frame(spec, data)
+        if frame.empty:
+            return 0
+
+        stage = f"_stage_{spec.table}"
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {stage} ON COMMIT DROP AS "
+            f"SELECT {', '.join(spec.columns)} FROM {spec.table} WITH NO DATA"
+        )
+
+        records = 0
+        for start in range(0, len(frame), self.batch_size):
+            records += self._copy_batch(cursor, spec, stage, frame.iloc[start:start + self.batch_size])
+        return records
+
+    def upsert_many(self, batches: Iterable[Tuple[TableSpec, Records]]) -> List[int]:
+        """Upsert several (spec, records) pairs in a single transaction"""
+        conn = self.connection_factory()
+        try:
+            with conn.cursor() as cursor:
+                counts = [self.write(cursor, spec, data) for spec, data in batches]
+            conn.commit()
+            return counts
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def upsert(self, spec: TableSpec, data: Records) -> int:
+        """Upsert one batch of records into spec.table"""
+        return self.upsert_many([(spec, data)])[0]
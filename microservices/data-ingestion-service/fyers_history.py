@@ -0,0 +1,192 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from shared.rate_limiter import AdaptiveRateLimiter, RateLimitedError, RetryQueue, parse_retry_after
+from telemetry import telemetry
+
+logger = logging.getLogger(__name__)
+
+FYERS_HISTORY_URL = "https://api-t1.fyers.in/data/history"
+FYERS_HISTORY_ENDPOINT = "fyers:history"
+
+# Longest date range the history API serves in one call; longer ranges are cut short
+MAX_RANGE_DAYS = {"daily": 366, "intraday": 100}
+
+CANDLE_FIELDS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+
+def resolution_param(resolution: str) -> str:
+    """API resolution for the service's resolution names"""
+    return {"1D": "D", "1H": "60"}.get(resolution, resolution)
+
+
+# Minute resolutions of the history API; daily and hourly bars go by the service's names
+INTRADAY_RESOLUTIONS = {"1", "2", "3", "5", "10", "15", "20", "30", "45", "120", "180", "240"}
+
+
+def resolution_name(resolution: str) -> Optional[str]:
+    """Service name candles of a resolution are stored under ("D" and "1D" are both "1D");
+    None when the history API has no such resolution"""
+    resolution = {"D": "1D", "60": "1H"}.get(resolution, resolution)
+    return resolution if resolution in ("1D", "1H") or resolution in INTRADAY_RESOLUTIONS else None
+
+
+def date_chunks(start: date, end: date, max_days: int) -> List[Tuple[date, date]]:
+    """Consecutive inclusive [from, to] date ranges of at most max_days covering start..end"""
+    chunks = []
+    while start <= end:
+        chunk_end = min(end, start + timedelta(days=max_days - 1))
+        chunks.append((start, chunk_end))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def candle_frame(candles: Sequence[Sequence[float]], symbol: str) -> pd.DataFrame:
+    """Fyers [ts, o, h, l, c, v] rows as a frame sorted by timestamp, one row per timestamp"""
+    rows = [candle[:6] for candle in candles if len(candle) >= 6]
+    if not rows:
+        return pd.DataFrame(columns=CANDLE_FIELDS + ["date", "symbol"])
+    values = np.asarray(rows, dtype="float64")
+    frame = pd.DataFrame({
+        "timestamp": values[:, 0].astype("int64"),
+        "open": values[:, 1], "high": values[:, 2], "low": values[:, 3], "close": values[:, 4],
+        "volume": values[:, 5].astype("int64"),
+    })
+    # A retried chunk or an API page boundary can repeat a candle
+    frame = frame.drop_duplicates("timestamp", keep="last").sort_values("timestamp", ignore_index=True)
+    frame["date"] = pd.to_datetime(frame["timestamp"], unit="s").dt.date
+    frame["symbol"] = symbol
+    return frame
+
+
+class FyersHistoryFetcher:
+    """Concurrent Fyers history downloads split into API-sized date ranges.
+
+    Every (symbol, chunk) request is a task on a pool of `workers` threads
+    sharing one pooled HTTP session, paced by the adaptive rate limiter's
+    fyers:history budget. Throttled or failed chunks are retried with jittered
+    backoff; a symbol is yielded, with its candles merged and de-duplicated,
+    as soon as all of its chunks are in.
+    """
+
+    def __init__(self, token_provider: Callable[[], Optional[str]], app_id: str,
+                 rate_limiter: AdaptiveRateLimiter, workers: int = 8, max_retries: int = 3,
+                 timeout: float = 30.0):
+        self.token_provider = token_provider
+        self.app_id = app_id
+        self.rate_limiter = rate_limiter
+        self.workers = workers
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+
+    def plan(self, resolution: str, start: date, end: date) -> List[Tuple[date, date]]:
+        api_resolution = resolution_param(resolution)
+        daily = api_resolution in ("D", "1D", "W", "M")
+        return date_chunks(start, end, MAX_RANGE_DAYS["daily" if daily else "intraday"])
+
+    def fetch_chunk(self, symbol: str, resolution: str, chunk: Tuple[date, date]) -> list:
+        token = self.token_provider()
+        if not token:
+            raise ValueError("No Fyers access token available")
+
+        self.rate_limiter.acquire(FYERS_HISTORY_ENDPOINT)
+        started = time.perf_counter()
+        try:
+            response = self.session.get(FYERS_HISTORY_URL, timeout=self.timeout, params={
+                "symbol": symbol,
+                "resolution": resolution_param(resolution),
+                "date_format": "1",
+                "range_from": chunk[0].strftime("%Y-%m-%d"),
+                "range_to": chunk[1].strftime("%Y-%m-%d"),
+                "cont_flag": "1"
+            }, headers={"Authorization": f"{self.app_id}:{token}"})
+        except requests.RequestException as e:
+            self.rate_limiter.report(FYERS_HISTORY_ENDPOINT, None)
+            telemetry.source("fyers").record_request("history", time.perf_counter() - started, False, str(e))
+            raise
+        elapsed = time.perf_counter() - started
+
+        if self.rate_limiter.report(FYERS_HISTORY_ENDPOINT, response.status_code,
+                                    parse_retry_after(response.headers.get("Retry-After"))):
+            telemetry.source("fyers").record_request("history", elapsed, False, f"HTTP {response.status_code}")
+            raise RateLimitedError(f"Fyers history returned HTTP {response.status_code} for {symbol}")
+        data = response.json()
+        if data.get("s") == "no_data":
+            telemetry.source("fyers").record_request("history", elapsed)
+            return []
+        if response.status_code != 200 or data.get("s") != "ok":
+            error = f"Fyers history error for {symbol}: {data.get('message', response.status_code)}"
+            telemetry.source("fyers").record_request("history", elapsed, False, error)
+            raise ValueError(error)
+        telemetry.source("fyers").record_request("history", elapsed)
+        return data.get("candles", [])
+
+    def iter_history(self, symbols: Sequence[str], resolution: str, start: date, end: date,
+                     cancel_event: threading.Event = None) -> Iterator[Tuple[str, pd.DataFrame, Optional[str]]]:
+        """Yield (symbol, candles, error) per symbol as its chunks complete"""
+        chunks = self.plan(resolution, start, end)
+        remaining = {symbol: len(chunks) for symbol in symbols}
+        candles: Dict[str, list] = {symbol: [] for symbol in symbols}
+        errors: Dict[str, str] = {}
+        retries = RetryQueue(self.max_retries)
+
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fyers-history")
+        tasks = {}
+
+        def submit(symbol: str, chunk: Tuple[date, date], attempt: int = 0):
+            tasks[pool.submit(self.fetch_chunk, symbol, resolution, chunk)] = (symbol, chunk, attempt)
+
+        try:
+            # Symbol-major order keeps few symbols in flight at a time
+            for symbol in symbols:
+                for chunk in chunks:
+                    submit(symbol, chunk)
+            while tasks or len(retries):
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                for (symbol, chunk), attempt in retries.pop_due():
+                    submit(symbol, chunk, attempt)
+                delay = retries.next_delay()
+                timeout = None if delay is None else min(delay, 1.0)
+                if not tasks:
+                    time.sleep(timeout or 0)
+                    continue
+
+                done, _ = wait(list(tasks), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    symbol, chunk, attempt = tasks.pop(future)
+                    try:
+                        candles[symbol].extend(future.result())
+                    except Exception as e:
+                        retryable = isinstance(e, (RateLimitedError, requests.RequestException))
+                        if retryable and retries.push((symbol, chunk), attempt + 1):
+                            continue
+                        logger.error(f"Error fetching {symbol} {chunk[0]}..{chunk[1]}: {str(e)}")
+                        errors[symbol] = str(e)
+
+                    remaining[symbol] -= 1
+                    if remaining[symbol] == 0:
+                        yield symbol, candle_frame(candles.pop(symbol), symbol), errors.get(symbol)
+        finally:
+            # Also reached when the caller stops iterating early
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def fetch(self, symbols: Sequence[str], resolution: str, start: date, end: date
+              ) -> Dict[str, pd.DataFrame]:
+        return {symbol: frame for symbol, frame, _ in self.iter_history(symbols, resolution, start, end)}
+
+    @staticmethod
+    def window(days_back: int) -> Tuple[date, date]:
+        end = datetime.now() - timedelta(minutes=1)
+        return (end - timedelta(days=days_back)).date(), end.date()
@@ -1,234 +1,379 @@
 import requests
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 import psycopg2
 import psycopg2.extras
 import os
 import asyncio
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from shared.database import get_pool
+from shared.rate_limiter import AdaptiveRateLimiter, parse_budgets, parse_retry_after
+from shared.symbol_resolver import symbol_resolver
+from bulk_writer import BulkUpsertWriter, TableSpec
+from fyers_history import FyersHistoryFetcher, resolution_name
+from indicators import INDICATOR_COLUMNS, continue_indicators
+from ohlcv_lake import OHLCVLake
+from telemetry import relative_time, telemetry
+
+FYERS_TABLES = {
+    # Stored candles keep their prices; only recomputed indicators are updated
+    "fyers_historical_data": TableSpec(
+        "fyers_historical_data",
+        ["timestamp", "date", "open", "high", "low", "close", "volume", "symbol", "resolution"] + INDICATOR_COLUMNS,
+        ["symbol", "resolution", "timestamp"],
+        update_columns=INDICATOR_COLUMNS,
+        touch_columns=()
+    ),
+}
+
+CANDLE_COLUMNS = ["timestamp", "date", "open", "high", "low", "close", "volume"]
+
+# Most symbols the quotes API accepts in one call
+QUOTE_BATCH_SIZE = 50
+
+FYERS_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS fyers_historical_data (
+        id SERIAL PRIMARY KEY,
+        timestamp BIGINT,
+        date DATE,
+        open DOUBLE PRECISION,
+        high DOUBLE PRECISION,
+        low DOUBLE PRECISION,
+        close DOUBLE PRECISION,
+        volume BIGINT,
+        symbol VARCHAR(50),
+        resolution VARCHAR(10) NOT NULL DEFAULT '1D',
+        sma_20 DOUBLE PRECISION,
+        sma_50 DOUBLE PRECISION,
+        price_change DOUBLE PRECISION,
+        price_change_pct DOUBLE PRECISION,
+        rsi_14 DOUBLE PRECISION,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (symbol, resolution, timestamp)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS fyers_realtime_data (
+        id SERIAL PRIMARY KEY,
+        symbol VARCHAR(50),
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        ltp DOUBLE PRECISION,
+        open_price DOUBLE PRECISION,
+        high_price DOUBLE PRECISION,
+        low_price DOUBLE PRECISION,
+        volume BIGINT,
+        prev_close DOUBLE PRECISION,
+        change_val DOUBLE PRECISION,
+        change_percent DOUBLE PRECISION,
+        UNIQUE (symbol, timestamp)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS fyers_indicator_state (
+        symbol VARCHAR(50) NOT NULL,
+        resolution VARCHAR(10) NOT NULL DEFAULT '1D',
+        last_timestamp BIGINT NOT NULL,
+        closes DOUBLE PRECISION[] NOT NULL,
+        avg_gain DOUBLE PRECISION NOT NULL,
+        avg_loss DOUBLE PRECISION NOT NULL,
+        deltas INTEGER NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (symbol, resolution)
+    )
+    """,
+    # Tables created before candles carried a resolution: existing rows are daily,
+    # and indicator state is cleared so each series is recomputed on its next save
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                       WHERE table_name = 'fyers_historical_data' AND column_name = 'resolution') THEN
+            ALTER TABLE fyers_historical_data ADD COLUMN resolution VARCHAR(10) NOT NULL DEFAULT '1D';
+            ALTER TABLE fyers_historical_data DROP CONSTRAINT IF EXISTS fyers_historical_data_symbol_timestamp_key;
+            CREATE UNIQUE INDEX IF NOT EXISTS fyers_historical_data_symbol_resolution_timestamp_key
+                ON fyers_historical_data (symbol, resolution, timestamp);
+        END IF;
+    END $$
+    """,
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                       WHERE table_name = 'fyers_indicator_state' AND column_name = 'resolution') THEN
+            DELETE FROM fyers_indicator_state;
+            ALTER TABLE fyers_indicator_state ADD COLUMN resolution VARCHAR(10) NOT NULL DEFAULT '1D';
+            ALTER TABLE fyers_indicator_state DROP CONSTRAINT IF EXISTS fyers_indicator_state_pkey;
+            ALTER TABLE fyers_indicator_state ADD PRIMARY KEY (symbol, resolution);
+        END IF;
+    END $$
+    """,
+]
 
 class FyersHistoricalService:
     def __init__(self):
-        self.base_url = "https://api-t1.fyers.in/data/history"
         self.symbols = ["NSE:RELIANCE-EQ", "NSE:TCS-EQ", "NSE:INFY-EQ", "NSE:HDFCBANK-EQ", "NSE:ICICIBANK-EQ"]
-        self.access_token = self.get_access_token()
-        
-    def get_symbols_from_master(self, exchange="NSE", limit=100):
-        """Get symbols from symbol master table"""
-        conn = self.get_db_connection()
-        query = """
-            SELECT ex_symbol as fyers_symbol
-            FROM symbol_master
-            WHERE exchange_name = %s AND ex_series = 'EQ'
-            LIMIT %s
-        """
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        cursor.execute(query, (exchange, limit))
-        result = [row['fyers_symbol'] for row in cursor.fetchall()]
-        conn.close()
-        return result
-        
-    def get_db_connection(self):
-        return psycopg2.connect(
+        self.pool = get_pool(
             host=os.getenv("POSTGRES_HOST", "localhost"),
             port=int(os.getenv("POSTGRES_PORT", 5432)),
             user=os.getenv("POSTGRES_USER", "apiuser"),
             password=os.getenv("POSTGRES_PASSWORD", "apipass"),
             database=os.getenv("POSTGRES_DB", "stockmarket")
         )
+        self.bulk_writer = BulkUpsertWriter(self.get_db_connection)
+        self.schema_lock = threading.Lock()
+        self.schema_ready = False
+        lake_path = os.getenv("OHLCV_LAKE_PATH")
+        self.lake = OHLCVLake(lake_path, self.get_db_connection) if lake_path else None
+        self.access_token = self.get_access_token()
+        # Fyers allows 10 requests/s and 200/min; the default stays under the per-minute cap
+        self.rate_limiter = AdaptiveRateLimiter(float(os.getenv("FYERS_REQUESTS_PER_SECOND", 3)),
+                                                parse_budgets(os.getenv("FYERS_ENDPOINT_BUDGETS")))
+        self.history = FyersHistoryFetcher(lambda: self.access_token,
+                                           os.getenv("FYERS_CLIENT_ID", "your_app_id"),
+                                           self.rate_limiter,
+                                           workers=int(os.getenv("FYERS_HISTORY_WORKERS", 8)))
+        self.write_batch_rows = int(os.getenv("FYERS_WRITE_BATCH_ROWS", 200000))
+
+        # Realtime polling: the universe is cached and quoted in concurrent 50-symbol shards
+        self.realtime_interval = float(os.getenv("FYERS_REALTIME_INTERVAL", 5))
+        self.realtime_symbols = int(os.getenv("FYERS_REALTIME_SYMBOLS", 1000))
+        self.universe_ttl = float(os.getenv("FYERS_UNIVERSE_TTL", 3600))
+        self.universe = None
+        self.universe_loaded = 0.0
+        quote_workers = int(os.getenv("FYERS_QUOTE_WORKERS", 8))
+        self.quote_pool = ThreadPoolExecutor(max_workers=quote_workers, thread_name_prefix="fyers-quotes")
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=quote_workers))
+        
+    def get_symbols_from_master(self, exchange="NSE", limit=100):
+        """Fyers tickers of an exchange's equities in symbol_master, from the shared resolver"""
+        return [record.fyers for record in symbol_resolver.equities(exchange, limit)]
+        
+    def get_db_connection(self):
+        """Pooled connection; close() returns it to the shared pool"""
+        return self.pool.getconn()
 
     def get_access_token(self):
         """Get access token from database"""
         try:
             conn = self.get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT token FROM user_tokens
-                WHERE token_type = 'fyers_access_token'
-                ORDER BY created_at DESC
-                LIMIT 1
-            """)
-            result = cursor.fetchone()
-            conn.close()
+            try:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT token FROM user_tokens
+                    WHERE token_type = 'fyers_access_token'
+                    ORDER BY created_at DESC
+                    LIMIT 1
+                """)
+                result = cursor.fetchone()
+            finally:
+                conn.close()
             return result[0] if result else None
         except Exception as e:
             print(f"Error getting access token: {e}")
             return None
     
     def fetch_historical_data(self, symbol, resolution="1D", days_back=30):
-        """Fetch historical data from Fyers API"""
-        end_date = datetime.now() - timedelta(minutes=1)
-        start_date = end_date - timedelta(days=days_back)
-
-        # Convert resolution format
-        if resolution == "1D":
-            resolution_param = "D"
-        elif resolution == "1H":
-            resolution_param = "60"
-        elif resolution == "30":
-            resolution_param = "30"
-        else:
-            resolution_param = resolution
-
-        params = {
-            "symbol": symbol,
-            "resolution": resolution_param,
-            "date_format": "1",
-            "range_from": start_date.strftime("%Y-%m-%d"),
-            "range_to": end_date.strftime("%Y-%m-%d"),
-            "cont_flag": ""
-        }
-
+        """Fetch historical data from Fyers API, split into API-sized date ranges"""
         if not self.access_token:
             print(f"No access token available for {symbol}")
             return []
 
-        app_id = os.getenv("FYERS_CLIENT_ID", "your_app_id")
-        headers = {
-            "Authorization": f"{app_id}:{self.access_token}",
-            "Content-Type": "application/json"
-        }
-
+        start, end = self.history.window(days_back)
         try:
-            response = requests.get(self.base_url, params=params, headers=headers)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("s") == "ok":
-                    return self.process_candles(data.get("candles", []), symbol)
+            frame = self.history.fetch([symbol], resolution, start, end).get(symbol)
         except Exception as e:
             print(f"Error fetching {symbol}: {e}")
-
-        return []
-    
-    def process_candles(self, candles, symbol):
-        """Process candle data"""
-        data = []
-        for candle in candles:
-            if len(candle) >= 6:
-                data.append({
-                    "timestamp": candle[0],
-                    "date": datetime.fromtimestamp(candle[0]).date(),
-                    "open": float(candle[1]),
-                    "high": float(candle[2]),
-                    "low": float(candle[3]),
-                    "close": float(candle[4]),
-                    "volume": int(candle[5]),
-                    "symbol": symbol
-                })
-        return data
+            return []
+        return [] if frame is None else frame.to_dict("records")
     
-    def calculate_indicators(self, df):
-        """Calculate technical indicators"""
+    def calculate_indicators(self, df, state=None):
+        """Calculate technical indicators (SMA-20/50, Wilder RSI-14), continuing from `state`.
+
+        Returns the sorted frame with indicator columns and the state after its last bar.
+        """
         df = df.sort_values('timestamp')
-        df['sma_20'] = df['close'].rolling(20).mean()
-        df['sma_50'] = df['close'].rolling(50).mean()
-        df['price_change'] = df['close'].diff()
-        df['price_change_pct'] = df['close'].pct_change() * 100
-        
-        # RSI calculation
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        df['rsi_14'] = 100 - (100 / (1 + rs))
-        
-        return df
-    
-    def save_to_database(self, data, table_name):
-        """Save data to PostgreSQL"""
-        if not data:
-            return
+        values, state = continue_indicators(df['close'].to_numpy(dtype='float64'), state)
+        df = df.assign(**values)
+        if not df.empty:
+            state['last_timestamp'] = int(df['timestamp'].iloc[-1])
+        return df, state
 
-        conn = self.get_db_connection()
-        df = pd.DataFrame(data)
-        df = self.calculate_indicators(df)
+    def load_indicator_state(self, cursor, symbol, resolution):
+        cursor.execute("""
+            SELECT last_timestamp, closes, avg_gain, avg_loss, deltas
+            FROM fyers_indicator_state WHERE symbol = %s AND resolution = %s FOR UPDATE
+        """, (symbol, resolution))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip(['last_timestamp', 'closes', 'avg_gain', 'avg_loss', 'deltas'], row))
 
-        # Create table if not exists
-        cursor = conn.cursor()
-        if table_name == "fyers_historical_data":
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS fyers_historical_data (
-                    id SERIAL PRIMARY KEY,
-                    timestamp BIGINT,
-                    date DATE,
-                    open DOUBLE PRECISION,
-                    high DOUBLE PRECISION,
-                    low DOUBLE PRECISION,
-                    close DOUBLE PRECISION,
-                    volume BIGINT,
-                    symbol VARCHAR(50),
-                    sma_20 DOUBLE PRECISION,
-                    sma_50 DOUBLE PRECISION,
-                    price_change DOUBLE PRECISION,
-                    price_change_pct DOUBLE PRECISION,
-                    rsi_14 DOUBLE PRECISION,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE (symbol, timestamp)
-                )
-            """)
+    def indicator_bars(self, cursor, symbol, resolution, bars):
+        """Candles of one symbol and resolution to write, with indicators continuing the stored series.
 
-            # Enable TimescaleDB hypertable for time-series optimization
+        Bars after the stored state only need the state; bars already stored
+        are dropped. A first run, or a bar landing inside the stored series,
+        recomputes the series from the database once.
+        """
+        state = self.load_indicator_state(cursor, symbol, resolution)
+        if state is not None:
+            older = bars[bars["timestamp"] <= state["last_timestamp"]]
+            stored = 0
+            if not older.empty:
+                cursor.execute(
+                    "SELECT COUNT(*) FROM fyers_historical_data"
+                    " WHERE symbol = %s AND resolution = %s AND timestamp = ANY(%s)",
+                    (symbol, resolution, [int(t) for t in older["timestamp"]]))
+                stored = cursor.fetchone()[0]
+            if stored == len(older):
+                return self.calculate_indicators(bars[bars["timestamp"] > state["last_timestamp"]], state)
+
+        cursor.execute(f"""
+            SELECT {", ".join(CANDLE_COLUMNS)} FROM fyers_historical_data WHERE symbol = %s AND resolution = %s
+        """, (symbol, resolution))
+        history = pd.DataFrame(cursor.fetchall(), columns=CANDLE_COLUMNS).assign(symbol=symbol,
+                                                                                  resolution=resolution)
+        history["close"] = history["close"].astype("float64")
+        # Stored candles win over re-fetched ones, as they are never updated
+        bars = pd.concat([history, bars], ignore_index=True).drop_duplicates("timestamp", keep="first")
+        return self.calculate_indicators(bars)
+
+    def save_indicator_states(self, cursor, resolution, states):
+        psycopg2.extras.execute_values(cursor, """
+            INSERT INTO fyers_indicator_state (symbol, resolution, last_timestamp, closes, avg_gain, avg_loss, deltas)
+            VALUES %s
+            ON CONFLICT (symbol, resolution) DO UPDATE SET
+                last_timestamp = EXCLUDED.last_timestamp, closes = EXCLUDED.closes,
+                avg_gain = EXCLUDED.avg_gain, avg_loss = EXCLUDED.avg_loss,
+                deltas = EXCLUDED.deltas, updated_at = CURRENT_TIMESTAMP
+        """, [(symbol, resolution, state['last_timestamp'], state['closes'], state['avg_gain'],
+               state['avg_loss'], state['deltas'])
+              for symbol, state in states.items() if state['last_timestamp'] is not None])
+    
+    def ensure_schema(self):
+        """Create the Fyers tables once per process (normally at startup)"""
+        with self.schema_lock:
+            if self.schema_ready:
+                return
+            conn = self.get_db_connection()
             try:
-                cursor.execute("""
-                    SELECT create_hypertable('fyers_historical_data', 'timestamp', if_not_exists => TRUE);
-                """)
-            except:
-                # TimescaleDB might not be available, continue without it
-                pass
+                cursor = conn.cursor()
+                for statement in FYERS_SCHEMA:
+                    cursor.execute(statement)
+                conn.commit()
+
+                # Enable TimescaleDB hypertable for time-series optimization, in its own
+                # transaction so a failure cannot abort the table setup
+                try:
+                    cursor.execute("""
+                        SELECT create_hypertable('fyers_historical_data', 'timestamp', if_not_exists => TRUE);
+                    """)
+                    conn.commit()
+                except Exception:
+                    # TimescaleDB might not be available, continue without it
+                    conn.rollback()
+                self.schema_ready = True
+            finally:
+                conn.close()
+
+    def save_to_database(self, data, table_name, resolution="1D"):
+        """Compute indicators and bulk-load candles of one resolution: COPY into a staging table, one merge.
+
+        Indicators continue from each symbol's row in fyers_indicator_state for
+        the resolution, so an incremental run costs O(new bars) and writes the
+        values a full recompute would. NaN indicators (the warm-up rows of each
+        window) are written as NULL by the COPY encoder in one vectorized pass.
+        """
+        if data is None or len(data) == 0:
+            return 0
 
-        # Insert data with conflict resolution
-        for _, row in df.iterrows():
-            cursor.execute("""
-                INSERT INTO fyers_historical_data
-                (timestamp, date, open, high, low, close, volume, symbol,
-                 sma_20, sma_50, price_change, price_change_pct, rsi_14)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (symbol, timestamp) DO NOTHING
-            """, (
-                int(row['timestamp']), row['date'], float(row['open']), float(row['high']),
-                float(row['low']), float(row['close']), int(row['volume']), row['symbol'],
-                float(row['sma_20']) if not pd.isna(row['sma_20']) else None,
-                float(row['sma_50']) if not pd.isna(row['sma_50']) else None,
-                float(row['price_change']) if not pd.isna(row['price_change']) else None,
-                float(row['price_change_pct']) if not pd.isna(row['price_change_pct']) else None,
-                float(row['rsi_14']) if not pd.isna(row['rsi_14']) else None
-            ))
-
-        conn.commit()
-        conn.close()
+        self.ensure_schema()
+        df = pd.DataFrame(data).drop_duplicates(["symbol", "timestamp"], keep="last").assign(resolution=resolution)
+        conn = self.get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                frames, states = [], {}
+                for symbol, bars in df.groupby("symbol", sort=False):
+                    bars, states[symbol] = self.indicator_bars(cursor, symbol, resolution, bars)
+                    frames.append(bars)
+                written = self.bulk_writer.write(cursor, FYERS_TABLES[table_name],
+                                                 pd.concat(frames, ignore_index=True))
+                self.save_indicator_states(cursor, resolution, states)
+            conn.commit()
+            telemetry.source("fyers").record_rows(written, states)
+            return written
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
     
-    def ingest_all_symbols(self, resolution="1D", days_back=100):
-        """Ingest historical data for all symbols"""
-        for symbol in self.symbols:
-            print(f"Processing {symbol}...")
-            data = self.fetch_historical_data(symbol, resolution, days_back)
-            self.save_to_database(data, "fyers_historical_data")
-            print(f"Saved {len(data)} records for {symbol}")
+    def ingest_all_symbols(self, resolution="1D", days_back=100, symbols=None, cancel_event=None):
+        """Ingest historical data for all symbols.
+
+        Symbols and date-range chunks are fetched concurrently; candles are
+        bulk-written in batches of about write_batch_rows as symbols complete,
+        so writes overlap the remaining downloads.
+        """
+        # One name per resolution, so "D" and "1D" bars land in the same stored series
+        if resolution_name(resolution) is None:
+            raise ValueError(f"Unsupported Fyers resolution: {resolution}")
+        resolution = resolution_name(resolution)
+        symbols = symbols or self.symbols
+        start, end = self.history.window(days_back)
+        total, batch, batch_rows = 0, [], 0
+        for symbol, frame, error in self.history.iter_history(symbols, resolution, start, end,
+                                                               cancel_event=cancel_event):
+            if error:
+                print(f"Error fetching {symbol}: {error}")
+            if not frame.empty:
+                batch.append(frame)
+                batch_rows += len(frame)
+            if batch_rows >= self.write_batch_rows:
+                total += self.save_to_database(pd.concat(batch, ignore_index=True),
+                                               "fyers_historical_data", resolution)
+                batch, batch_rows = [], 0
+        if batch:
+            total += self.save_to_database(pd.concat(batch, ignore_index=True),
+                                           "fyers_historical_data", resolution)
+        print(f"Saved {total} records for {len(symbols)} symbols")
+
+        if self.lake is not None:
+            try:
+                self.lake.export("fyers", resolution, symbols)
+            except Exception as e:
+                print(f"Error exporting Fyers bars to the OHLCV lake: {e}")
+        return total
     
-    def get_latest_data(self, symbol=None):
-        """Get latest data from database"""
+    def get_latest_data(self, symbol=None, resolution="1D"):
+        """Get latest data of one resolution from database"""
         conn = self.get_db_connection()
 
         if symbol:
             query = """
                 SELECT * FROM fyers_historical_data
-                WHERE symbol = %s
+                WHERE symbol = %s AND resolution = %s
                 ORDER BY timestamp DESC
                 LIMIT 30
             """
-            df = pd.read_sql(query, conn, params=[symbol])
+            df = pd.read_sql(query, conn, params=[symbol, resolution])
         else:
             query = """
                 SELECT symbol, close as latest_price, price_change,
                        price_change_pct, volume, sma_20, rsi_14
                 FROM fyers_historical_data f1
-                WHERE timestamp = (
+                WHERE resolution = %s AND timestamp = (
                     SELECT MAX(timestamp)
                     FROM fyers_historical_data f2
-                    WHERE f2.symbol = f1.symbol
+                    WHERE f2.symbol = f1.symbol AND f2.resolution = f1.resolution
                 )
             """
-            df = pd.read_sql(query, conn)
+            df = pd.read_sql(query, conn, params=[resolution])
 
         conn.close()
         return df.to_dict('records')
@@ -283,35 +428,20 @@ class FyersHistoricalService:
             conn.close()
 
     def check_fyers_connection(self):
-        """Check if Fyers API connection is working"""
-        try:
-            # Simple check - try to get a quote
-            test_symbol = "NSE:RELIANCE-EQ"
-            data = self.fetch_historical_data(test_symbol, "1D", 1)
-            return len(data) > 0
-        except:
-            return False
+        """Connection status from request telemetry: connected, error, disconnected or idle"""
+        return telemetry.source("fyers").status()
 
     def get_last_update_time(self):
-        """Get last update time from database"""
+        """Age of the last write by this process, else of the newest row in the database"""
+        last_rows = telemetry.source("fyers").last_rows
+        if last_rows is not None:
+            return relative_time(last_rows)
         conn = self.get_db_connection()
         try:
             cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
             cursor.execute("SELECT MAX(created_at) as last_update FROM fyers_historical_data")
             result = cursor.fetchone()
-            if result and result['last_update']:
-                # Convert to relative time string
-                now = datetime.now()
-                diff = now - result['last_update']
-                if diff.days > 0:
-                    return f"{diff.days} days ago"
-                elif diff.seconds > 3600:
-                    return f"{diff.seconds // 3600} hours ago"
-                elif diff.seconds > 60:
-                    return f"{diff.seconds // 60} min ago"
-                else:
-                    return "Just now"
-            return "Never"
+            return relative_time(result['last_update'] if result else None)
         except:
             return "Unknown"
         finally:
@@ -331,11 +461,11 @@ class FyersHistoricalService:
             conn.close()
 
     def get_average_latency(self):
-        """Get average latency (placeholder - could be enhanced with actual measurements)"""
-        return 1500  # milliseconds
+        """Average Fyers API request latency in ms over the recent window"""
+        return telemetry.source("fyers").average_latency()
 
     def fetch_realtime_quotes(self, symbols):
-        """Fetch real-time quotes from Fyers API"""
+        """Fetch real-time quotes from Fyers API (at most QUOTE_BATCH_SIZE symbols per call)"""
         # Fyers quotes API endpoint
         quotes_url = "https://api-t1.fyers.in/data/quotes"
 
@@ -353,52 +483,57 @@ class FyersHistoricalService:
             "symbols": ",".join(symbols)
         }
 
+        self.rate_limiter.acquire("fyers:quotes")
+        started = time.perf_counter()
         try:
-            response = requests.get(quotes_url, params=params, headers=headers)
+            response = self.session.get(quotes_url, params=params, headers=headers, timeout=10)
+            self.rate_limiter.report("fyers:quotes", response.status_code,
+                                     parse_retry_after(response.headers.get("Retry-After")))
             if response.status_code == 200:
                 data = response.json()
                 if data.get("s") == "ok":
+                    telemetry.source("fyers").record_request("quotes", time.perf_counter() - started)
                     return data.get("d", [])
+            telemetry.source("fyers").record_request("quotes", time.perf_counter() - started, False,
+                                                     f"HTTP {response.status_code}")
         except Exception as e:
+            self.rate_limiter.report("fyers:quotes", None)
+            telemetry.source("fyers").record_request("quotes", time.perf_counter() - started, False, str(e))
             print(f"Error fetching real-time quotes: {e}")
         return []
 
-    def save_realtime_data(self, quotes_data):
-        """Save real-time quotes data to database"""
-        if not quotes_data:
-            return
+    def fetch_quote_shards(self, symbols):
+        """Quotes for any number of symbols, fetched as concurrent QUOTE_BATCH_SIZE-symbol requests"""
+        shards = [symbols[i:i + QUOTE_BATCH_SIZE] for i in range(0, len(symbols), QUOTE_BATCH_SIZE)]
+        return [quote for quotes in self.quote_pool.map(self.fetch_realtime_quotes, shards)
+                for quote in quotes]
 
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
+    def realtime_universe(self):
+        """Symbols polled by the realtime loop, reloaded from symbol_master every universe_ttl seconds"""
+        now = time.monotonic()
+        if self.universe is None or now - self.universe_loaded >= self.universe_ttl:
+            try:
+                symbols = self.get_symbols_from_master(limit=self.realtime_symbols)
+            except Exception as e:
+                print(f"Error loading realtime symbol universe: {e}")
+                symbols = []
+            if symbols:
+                self.universe, self.universe_loaded = symbols, now
+            elif self.universe is None:
+                return self.symbols  # Fallback to default symbols, retried next tick
+        return self.universe
 
-        # Create table if not exists
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS fyers_realtime_data (
-                id SERIAL PRIMARY KEY,
-                symbol VARCHAR(50),
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                ltp DOUBLE PRECISION,
-                open_price DOUBLE PRECISION,
-                high_price DOUBLE PRECISION,
-                low_price DOUBLE PRECISION,
-                volume BIGINT,
-                prev_close DOUBLE PRECISION,
-                change_val DOUBLE PRECISION,
-                change_percent DOUBLE PRECISION,
-                UNIQUE (symbol, timestamp)
-            )
-        """)
+    def save_realtime_data(self, quotes_data):
+        """Save one tick of quotes with a single multi-row INSERT"""
+        if not quotes_data:
+            return 0
 
+        # One row per symbol: every row of the tick shares the transaction timestamp
+        rows = {}
         for quote in quotes_data:
             symbol = quote.get("n", "")
             v = quote.get("v", {})
-
-            cursor.execute("""
-                INSERT INTO fyers_realtime_data
-                (symbol, ltp, open_price, high_price, low_price, volume,
-                 prev_close, change_val, change_percent)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
+            rows[symbol] = (
                 symbol,
                 v.get("lp"),  # last price
                 v.get("open_price"),
@@ -408,29 +543,45 @@ class FyersHistoricalService:
                 v.get("prev_close_price"),
                 v.get("ch"),  # change
                 v.get("chp")  # change percent
-            ))
+            )
 
-        conn.commit()
-        conn.close()
+        conn = self.get_db_connection()
+        try:
+            cursor = conn.cursor()
+            psycopg2.extras.execute_values(cursor, """
+                INSERT INTO fyers_realtime_data
+                (symbol, ltp, open_price, high_price, low_price, volume,
+                 prev_close, change_val, change_percent)
+                VALUES %s
+                ON CONFLICT (symbol, timestamp) DO NOTHING
+            """, list(rows.values()), page_size=len(rows))
+            conn.commit()
+        finally:
+            conn.close()
+        telemetry.source("fyers").record_rows(len(rows), rows)
+        return len(rows)
+
+    def realtime_tick(self):
+        """Fetch and store one round of quotes for the whole universe; returns the quotes saved"""
+        return self.save_realtime_data(self.fetch_quote_shards(self.realtime_universe()))
+
+    async def start_realtime_ingestion(self, interval_seconds=None):
+        """Start real-time data ingestion loop.
 
-    async def start_realtime_ingestion(self, interval_seconds=30):
-        """Start real-time data ingestion loop"""
+        Each tick runs on a worker thread so the event loop stays free; the
+        next tick starts interval_seconds after the previous one started.
+        """
+        interval_seconds = interval_seconds or self.realtime_interval
         print("Starting real-time ingestion...")
+        await asyncio.to_thread(self.ensure_schema)
         while True:
+            started = time.monotonic()
             try:
-                symbols = self.get_symbols_from_master(limit=50)  # Get symbols from master
-                if not symbols:
-                    symbols = self.symbols  # Fallback to default symbols
-
-                quotes = self.fetch_realtime_quotes(symbols)
-                if quotes:
-                    self.save_realtime_data(quotes)
-                    print(f"Saved {len(quotes)} real-time quotes")
-
-                await asyncio.sleep(interval_seconds)
+                saved = await asyncio.to_thread(self.realtime_tick)
+                print(f"Saved {saved} real-time quotes in {time.monotonic() - started:.2f}s")
             except Exception as e:
                 print(f"Error in real-time ingestion: {e}")
-                await asyncio.sleep(interval_seconds)
+            await asyncio.sleep(max(0.0, interval_seconds - (time.monotonic() - started)))
 
     def stop_realtime_ingestion(self):
         """Stop real-time ingestion (placeholder - actual stop handled by cancelling task)"""
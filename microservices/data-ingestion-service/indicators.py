@@ -0,0 +1,81 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+SMA_WINDOWS = {'sma_20': 20, 'sma_50': 50}
+RSI_PERIOD = 14
+
+# Closes carried in the state: enough to finish the longest SMA window
+STATE_BARS = max(SMA_WINDOWS.values()) - 1
+
+INDICATOR_COLUMNS = ['sma_20', 'sma_50', 'price_change', 'price_change_pct', 'rsi_14']
+
+
+def empty_state() -> Dict[str, Any]:
+    return {'last_timestamp': None, 'closes': [], 'avg_gain': 0.0, 'avg_loss': 0.0, 'deltas': 0}
+
+
+def continue_indicators(closes: Sequence[float], state: Optional[Dict[str, Any]] = None
+                        ) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Indicators for bars that follow `state`, plus the state after the last bar.
+
+    `closes` must be in timestamp order and all newer than the state. SMAs are
+    means over the exact window of closes and RSI uses Wilder smoothing, so
+    continuing from a state gives bit-identical values to recomputing the
+    whole series from an empty state, at O(new bars) cost. During the RSI
+    warm-up avg_gain/avg_loss hold the running sums of the first deltas.
+    The caller sets the new state's last_timestamp.
+    """
+    state = state or empty_state()
+    history = np.asarray(state['closes'], dtype='float64')
+    closes = np.asarray(closes, dtype='float64')
+    series = np.concatenate([history, closes])
+    offset, count = len(history), len(closes)
+
+    values = {}
+    for column, window in SMA_WINDOWS.items():
+        sma = np.full(count, np.nan)
+        first = max(offset, window - 1)
+        if len(series) > first:
+            # Mean of the window ending at each new bar
+            sma[first - offset:] = sliding_window_view(series[first - window + 1:], window).mean(axis=1)
+        values[column] = sma
+
+    previous = np.concatenate([[np.nan], series[:-1]])[offset:]
+    change = closes - previous
+    values['price_change'] = change
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values['price_change_pct'] = change / previous * 100
+
+    rsi = np.full(count, np.nan)
+    gain, loss, deltas = float(state['avg_gain']), float(state['avg_loss']), int(state['deltas'])
+    for i, delta in enumerate(change.tolist()):
+        if delta != delta:
+            continue
+        up, down = (delta, 0.0) if delta > 0 else (0.0, -delta)
+        deltas += 1
+        if deltas <= RSI_PERIOD:
+            gain += up
+            loss += down
+            if deltas < RSI_PERIOD:
+                continue
+            gain /= RSI_PERIOD
+            loss /= RSI_PERIOD
+        else:
+            gain = (gain * (RSI_PERIOD - 1) + up) / RSI_PERIOD
+            loss = (loss * (RSI_PERIOD - 1) + down) / RSI_PERIOD
+        if loss:
+            rsi[i] = 100 - 100 / (1 + gain / loss)
+        elif gain:
+            rsi[i] = 100.0
+    values['rsi_14'] = rsi
+
+    new_state = {
+        'last_timestamp': state['last_timestamp'],
+        'closes': series[-STATE_BARS:].tolist(),
+        'avg_gain': gain,
+        'avg_loss': loss,
+        'deltas': deltas
+    }
+    return values, new_state
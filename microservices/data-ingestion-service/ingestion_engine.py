@@ -0,0 +1,357 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from jobs import report_progress
+from shared.rate_limiter import RetryQueue
+
+logger = logging.getLogger(__name__)
+
+
+class StageTimings:
+    """Thread-safe per-stage fetch/write counters"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    def _stage(self, stage: str) -> Dict[str, float]:
+        if stage not in self.stages:
+            self.stages[stage] = {
+                'fetches': 0, 'fetch_seconds': 0.0, 'max_fetch_seconds': 0.0,
+                'writes': 0, 'write_seconds': 0.0, 'records': 0, 'errors': 0
+            }
+        return self.stages[stage]
+
+    def record_fetch(self, stage: str, seconds: float, error: bool = False):
+        with self.lock:
+            entry = self._stage(stage)
+            entry['fetches'] += 1
+            entry['fetch_seconds'] += seconds
+            entry['max_fetch_seconds'] = max(entry['max_fetch_seconds'], seconds)
+            entry['errors'] += int(error)
+
+    def record_write(self, stage: str, seconds: float, records: int, error: bool = False):
+        with self.lock:
+            entry = self._stage(stage)
+            entry['writes'] += 1
+            entry['write_seconds'] += seconds
+            entry['records'] += records
+            entry['errors'] += int(error)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            result = {}
+            for stage, entry in self.stages.items():
+                fetches = entry['fetches'] or 1
+                result[stage] = {
+                    'fetches': entry['fetches'],
+                    'avg_fetch_ms': round(entry['fetch_seconds'] / fetches * 1000, 1),
+                    'max_fetch_ms': round(entry['max_fetch_seconds'] * 1000, 1),
+                    'write_batches': entry['writes'],
+                    'write_seconds': round(entry['write_seconds'], 3),
+                    'records': entry['records'],
+                    'errors': entry['errors']
+                }
+            return result
+
+
+class IngestionRun:
+    """Progress and per-symbol results of one engine run"""
+
+    def __init__(self, service, symbols: List[str], stages: List[str], workers: int,
+                 cancel_event: Optional[threading.Event] = None, max_retries: int = 3,
+                 retry_base_delay: float = 1.0):
+        self.id = uuid.uuid4().hex
+        self.service = service
+        self.cancel_event = cancel_event or threading.Event()
+        # Failed (symbol, stage) fetches waiting for their backoff to elapse
+        self.retries = RetryQueue(max_retries, retry_base_delay)
+        self.lock = threading.Lock()
+        self.results = {symbol: {'breakdown': service.empty_results(), 'errors': {}}
+                        for symbol in symbols}
+        self.remaining = {symbol: len(stages) for symbol in symbols}
+        # Stages of a symbol share one yf.Ticker until its last stage is done
+        service.tickers.open(symbols)
+        self.progress = {
+            'run_id': self.id,
+            'running': True,
+            'workers': workers,
+            'total_symbols': len(symbols),
+            'completed_symbols': 0,
+            'failed_symbols': 0,
+            'stages': stages,
+            'cancelled': False,
+            'started_at': datetime.now().isoformat(),
+            'finished_at': None
+        }
+
+    def stage_done(self, item: Dict[str, Any], error: Optional[str], write_seconds: float):
+        """Record the outcome of one (symbol, stage) once it is persisted or has failed"""
+        symbol, stage = item['symbol'], item['stage']
+        with self.lock:
+            result = self.results[symbol]
+            if error:
+                result['errors'][stage] = error
+            elif stage == 'financial_statements':
+                result['breakdown'][stage].update(
+                    {dataset: len(records) for dataset, records in item['batches']})
+            else:
+                result['breakdown'][stage] = item['records']
+            if not error and item.get('cache_digest'):
+                self.service.stage_cache.record(symbol, stage, item['cache_digest'])
+
+            self.remaining[symbol] -= 1
+            finished = self.remaining[symbol] == 0
+            if finished:
+                self.progress['completed_symbols'] += 1
+                if result['errors']:
+                    self.progress['failed_symbols'] += 1
+
+        if finished:
+            self.service.tickers.release(symbol)
+
+        self.service.log_ingestion(
+            symbol, stage, 0 if error else item['records'], 'failed' if error else 'success',
+            error_message=error, execution_time=item['fetch_seconds'] + write_seconds,
+            interval=item.get('interval') if stage == 'historical' else None
+        )
+
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def finish(self):
+        with self.lock:
+            unfinished = [symbol for symbol, remaining in self.remaining.items() if remaining > 0]
+            self.progress['running'] = False
+            self.progress['cancelled'] = self.cancelled()
+            self.progress['finished_at'] = datetime.now().isoformat()
+        for symbol in unfinished:
+            self.service.tickers.release(symbol)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {**self.progress, 'retries': self.retries.stats()}
+
+
+class BatchedStageWriter(threading.Thread):
+    """Consumes fetched stage payloads and writes them in cross-symbol batches.
+
+    Payloads for the same dataset are concatenated until `batch_rows` records
+    are pending or `flush_interval` seconds have passed, then written in one
+    transaction through the service's bulk writer.
+    """
+
+    def __init__(self, service, run: IngestionRun, timings: StageTimings,
+                 batch_rows: int, flush_interval: float):
+        super().__init__(name='yahoo-batched-writer', daemon=True)
+        self.service = service
+        self.run_state = run
+        self.timings = timings
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.items: queue.Queue = queue.Queue()
+        self.pending: List[Dict[str, Any]] = []
+        self.pending_rows = 0
+
+    def submit(self, item: Dict[str, Any]):
+        self.items.put(item)
+
+    def close(self):
+        self.items.put(None)
+        self.join()
+
+    def run(self):
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self.items.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = False
+
+            if item:
+                self.pending.append(item)
+                self.pending_rows += sum(len(records) for _, records in item['batches'])
+
+            due = time.monotonic() - last_flush >= self.flush_interval
+            if self.pending and (item is None or due or self.pending_rows >= self.batch_rows):
+                self.flush()
+                last_flush = time.monotonic()
+            if item is None:
+                return
+
+    def flush(self):
+        items, self.pending, self.pending_rows = self.pending, [], 0
+
+        combined: Dict[str, list] = {}
+        for item in items:
+            for dataset, records in item['batches']:
+                combined.setdefault(dataset, []).append(records)
+
+        batches = []
+        for dataset, chunks in combined.items():
+            if isinstance(chunks[0], pd.DataFrame):
+                batches.append((dataset, pd.concat(chunks, ignore_index=True)))
+            else:
+                batches.append((dataset, [record for chunk in chunks for record in chunk]))
+
+        start = time.monotonic()
+        errors: Dict[int, str] = {}
+        try:
+            self.service.write_batches(batches)
+        except Exception as e:
+            logger.error(f"Error writing batch of {len(items)} stage results, retrying per stage: {str(e)}")
+            # Isolate the offending payload so one bad record does not fail the whole batch
+            for index, item in enumerate(items):
+                try:
+                    self.service.write_batches(item['batches'])
+                except Exception as item_error:
+                    errors[index] = str(item_error)
+        elapsed = time.monotonic() - start
+
+        # Attribute the batch write time to stages in proportion to their rows
+        total_rows = sum(item['records'] for item in items) or 1
+        for index, item in enumerate(items):
+            share = elapsed * item['records'] / total_rows
+            error = errors.get(index)
+            self.timings.record_write(item['stage'], share, item['records'], error is not None)
+            self.run_state.stage_done(item, error, share)
+
+
+class IngestionEngine:
+    """Bounded-concurrency Yahoo ingestion.
+
+    Every (symbol, stage) fetch is a task on a thread pool of `workers`
+    threads, throttled by the service's per-host rate limiter; results are
+    handed to a BatchedStageWriter so network and database work overlap.
+    Tasks are queued symbol by symbol, so the stages of a symbol run side by
+    side on the symbol's shared yf.Ticker. A failed fetch is re-queued with
+    jittered exponential backoff up to `max_retries` times before the stage
+    is recorded as failed.
+    """
+
+    def __init__(self, service, workers: int = 8, write_batch_rows: int = 50000,
+                 flush_interval: float = 2.0, max_retries: int = 3, retry_base_delay: float = 1.0):
+        self.service = service
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.write_batch_rows = write_batch_rows
+        self.flush_interval = flush_interval
+        self.timings = StageTimings()
+        # Runs in progress by run id; a job's run is also reported on its job record
+        self.lock = threading.Lock()
+        self.runs: Dict[str, IngestionRun] = {}
+
+    def _fetch(self, run: IngestionRun, writer: BatchedStageWriter, symbol: str, stage: str,
+               period: str, interval: str, history_start=None, use_cache: bool = True,
+               attempt: int = 0):
+        start = time.monotonic()
+        item = {'symbol': symbol, 'stage': stage, 'batches': [], 'records': 0,
+                'interval': interval, 'fetch_seconds': 0.0}
+        if run.cancelled():
+            # Queued stages of a cancelled run are drained without touching the network
+            run.stage_done(item, 'cancelled', 0.0)
+            return
+
+        cache = self.service.stage_cache
+        cached = use_cache and cache.caches(stage)
+        if cached and cache.is_fresh(symbol, stage):
+            run.stage_done(item, None, 0.0)
+            return
+
+        try:
+            payload = self.service.fetch_stage(stage, symbol, period, interval, start=history_start)
+            batches = [(dataset, records) for dataset, records in
+                       self.service.stage_batches(stage, payload, interval) if len(records)]
+            # An empty payload is never cached: it may stand for a failed request
+            if cached and batches:
+                item['cache_digest'] = cache.changed_digest(symbol, stage, payload)
+                if item['cache_digest'] is None:
+                    # Same content as the last write: nothing to persist
+                    batches = []
+            item['batches'] = batches
+        except Exception as e:
+            item['fetch_seconds'] = time.monotonic() - start
+            self.timings.record_fetch(stage, item['fetch_seconds'], error=True)
+            if run.retries.push((symbol, stage, history_start), attempt + 1):
+                logger.warning(f"Error fetching {stage} for {symbol}, retry {attempt + 1} scheduled: {str(e)}")
+                return
+            logger.error(f"Error fetching {stage} for {symbol}: {str(e)}")
+            run.stage_done(item, str(e), 0.0)
+            return
+
+        item['fetch_seconds'] = time.monotonic() - start
+        item['records'] = sum(len(records) for _, records in item['batches'])
+        self.timings.record_fetch(stage, item['fetch_seconds'])
+        if item['batches']:
+            writer.submit(item)
+        else:
+            run.stage_done(item, None, 0.0)
+
+    def run(self, symbols: List[str], historical_period: str = "2y",
+            historical_interval: str = "1d", include_extended: bool = True,
+            include_ai_data: bool = True, workers: Optional[int] = None,
+            starts: Optional[Dict[str, datetime]] = None,
+            use_cache: bool = True,
+            cancel_event: Optional[threading.Event] = None) -> Dict[str, Dict[str, Any]]:
+        """Ingest every stage for every symbol; returns per-symbol breakdown and errors.
+
+        `starts` maps symbols to an incremental start for the historical stage;
+        use_cache=False ignores stage cache TTLs and always fetches. Setting
+        `cancel_event` skips every stage that has not started fetching yet.
+        """
+        starts = starts or {}
+        stages = self.service.get_ingestion_stages(include_extended, include_ai_data)
+        workers = workers or self.workers
+        run = IngestionRun(self.service, symbols, stages, workers, cancel_event,
+                           self.max_retries, self.retry_base_delay)
+        with self.lock:
+            self.runs[run.id] = run
+        report_progress(run.snapshot)
+
+        writer = BatchedStageWriter(self.service, run, self.timings,
+                                    self.write_batch_rows, self.flush_interval)
+        writer.start()
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='yahoo-fetch') as pool:
+                def submit(symbol: str, stage: str, history_start, attempt: int = 0):
+                    return pool.submit(self._fetch, run, writer, symbol, stage, historical_period,
+                                       historical_interval, history_start, use_cache, attempt)
+
+                pending = {submit(symbol, stage, starts.get(symbol))
+                           for symbol in symbols for stage in stages}
+                while pending or len(run.retries):
+                    # A cancelled run resubmits its retries at once; _fetch drains them
+                    due = run.retries.drain() if run.cancelled() else run.retries.pop_due()
+                    pending |= {submit(*task, attempt=attempt) for task, attempt in due}
+                    delay = run.retries.next_delay()
+                    # Wake at least every second so cancellation is noticed
+                    timeout = None if delay is None else min(delay, 1.0)
+                    if pending:
+                        _, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                    elif timeout:
+                        time.sleep(timeout)
+        finally:
+            writer.close()
+            run.finish()
+            with self.lock:
+                del self.runs[run.id]
+
+        return run.results
+
+    def status(self) -> Dict[str, Any]:
+        """Progress of every run in progress and cumulative per-stage timings"""
+        with self.lock:
+            runs = list(self.runs.values())
+        return {
+            'runs': [run.snapshot() for run in runs],
+            'stage_timings': self.timings.snapshot()
+        }
@@ -0,0 +1,164 @@
+import bisect
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import psycopg2.extras
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with count/sum/min/max"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+
+    def observe(self, ms: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.min_ms = ms if self.min_ms is None else min(self.min_ms, ms)
+        self.max_ms = ms if self.max_ms is None else max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th percentile"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}" for bound in LATENCY_BUCKETS_MS] + ['le_inf']
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 1) if self.count else None,
+            'min_ms': self.min_ms,
+            'max_ms': self.max_ms,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'buckets': dict(zip(labels, self.counts))
+        }
+
+
+class IngestionLogSink:
+    """Buffers yahoo_ingestion_logs rows in process and inserts them in batches.
+
+    Rows are flushed when `batch_size` are pending, every `flush_interval`
+    seconds, and on close(). Latency histograms and the most recent records
+    are kept in memory so status endpoints need not query the log table.
+    """
+
+    def __init__(self, connection_factory: Callable[[], Any], batch_size: int = 500,
+                 flush_interval: float = 5.0, recent_size: int = 50):
+        self.connection_factory = connection_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.buffer: List[tuple] = []
+        self.recent = deque(maxlen=recent_size)
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.status_counts: Dict[str, Dict[str, int]] = {}
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='yahoo-log-sink', daemon=True)
+        self.thread.start()
+
+    def record(self, symbol: str, data_type: str, records_processed: int,
+               status: str = "success", error_message: str = None,
+               execution_time: float = None, interval: str = None,
+               start_date: datetime = None, end_date: datetime = None):
+        row = (symbol, data_type, interval, start_date, end_date, records_processed,
+               status, error_message, execution_time)
+        with self.lock:
+            self.buffer.append(row)
+            self.recent.appendleft({
+                'symbol': symbol, 'data_type': data_type, 'records_processed': records_processed,
+                'status': status, 'created_at': datetime.now().isoformat()
+            })
+            counts = self.status_counts.setdefault(data_type, {})
+            counts[status] = counts.get(status, 0) + 1
+            if execution_time is not None:
+                self.histograms.setdefault(data_type, LatencyHistogram()).observe(execution_time * 1000)
+            full = len(self.buffer) >= self.batch_size
+        if full:
+            self.wakeup.set()
+
+    def flush(self) -> int:
+        """Insert every buffered row; rows are put back if the insert fails"""
+        with self.flush_lock:
+            with self.lock:
+                rows, self.buffer = self.buffer, []
+            if not rows:
+                return 0
+
+            conn = None
+            try:
+                conn = self.connection_factory()
+                with conn.cursor() as cursor:
+                    psycopg2.extras.execute_values(cursor, """
+                        INSERT INTO yahoo_ingestion_logs
+                        (symbol, data_type, interval, start_date, end_date, records_processed,
+                         status, error_message, execution_time_seconds)
+                        VALUES %s
+                    """, rows, page_size=self.batch_size)
+                conn.commit()
+                return len(rows)
+            except Exception as e:
+                logger.error(f"Error flushing {len(rows)} ingestion log rows: {str(e)}")
+                with self.lock:
+                    # Keep the newest rows if the database stays unreachable
+                    self.buffer = (rows + self.buffer)[-self.batch_size * 20:]
+                return 0
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _run(self):
+        while not self.stopped.is_set():
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            self.flush()
+
+    def close(self):
+        """Stop the background flusher and write out anything still buffered"""
+        self.stopped.set()
+        self.wakeup.set()
+        self.thread.join(timeout=self.flush_interval * 2)
+        self.flush()
+
+    def recent_activity(self, limit: int = 10) -> List[Dict[str, Any]]:
+        with self.lock:
+            return list(self.recent)[:limit]
+
+    def latency(self, data_type: str = None) -> Dict[str, Any]:
+        """Per data_type latency histograms and status counts"""
+        with self.lock:
+            data_types = [data_type] if data_type else sorted(self.status_counts)
+            return {
+                name: {
+                    'latency': self.histograms[name].snapshot() if name in self.histograms else None,
+                    'statuses': dict(self.status_counts.get(name, {}))
+                }
+                for name in data_types
+            }
+
+    def pending(self) -> int:
+        with self.lock:
+            return len(self.buffer)
@@ -0,0 +1,139 @@
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# The job running on each pool thread, for report_progress
+_current = threading.local()
+
+
+def report_progress(snapshot: Callable[[], Dict[str, Any]]):
+    """Show `snapshot()` as the 'progress' of the job running on this thread; no-op outside a job"""
+    job = getattr(_current, 'job', None)
+    if job is not None:
+        job.progress = snapshot
+
+
+class Job:
+    """State of one background job"""
+
+    def __init__(self, kind: str, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.future = None
+        self.progress: Optional[Callable[[], Dict[str, Any]]] = None
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'params': self.params,
+            'status': self.status,
+            'error': self.error,
+            'progress': self.progress() if self.progress else None,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+
+class JobManager:
+    """Runs long ingest calls on a small dedicated pool, tracked by job id.
+
+    Job functions receive a `cancel_event` keyword argument; cancel() sets it
+    so a running job can stop between units of work, and a queued job never
+    starts. A job function may call report_progress() to expose live progress. Finished jobs are kept until `history` newer jobs exist.
+    """
+
+    def __init__(self, max_workers: int = 2, history: int = 100):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ingest-job')
+        self.history = history
+        self.lock = threading.Lock()
+        self.jobs: 'OrderedDict[str, Job]' = OrderedDict()
+
+    def submit(self, kind: str, fn: Callable[..., Any], **params) -> Dict[str, Any]:
+        job = Job(kind, params)
+        with self.lock:
+            self.jobs[job.id] = job
+            self._prune()
+            job.future = self.pool.submit(self._run, job, fn)
+        logger.info(f"Queued {kind} job {job.id}")
+        return job.to_dict(include_result=False)
+
+    def _run(self, job: Job, fn: Callable[..., Any]):
+        with self.lock:
+            if job.cancel_event.is_set():
+                return
+            job.status = 'running'
+            job.started_at = datetime.now()
+        _current.job = job
+        try:
+            result = fn(cancel_event=job.cancel_event, **job.params)
+            error = None
+        except Exception as e:
+            logger.error(f"{job.kind} job {job.id} failed: {str(e)}")
+            result, error = None, str(e)
+        finally:
+            _current.job = None
+        with self.lock:
+            job.result = result
+            job.error = error
+            job.finished_at = datetime.now()
+            if error:
+                job.status = 'failed'
+            elif job.cancel_event.is_set():
+                job.status = 'cancelled'
+            else:
+                job.status = 'completed'
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items()
+                    if job.status in ('completed', 'failed', 'cancelled')]
+        for job_id in finished[:max(0, len(self.jobs) - self.history)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def list(self, status: str = None) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [job.to_dict(include_result=False) for job in reversed(self.jobs.values())
+                    if status is None or job.status == status]
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Request cancellation; returns None for an unknown job id"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status in ('queued', 'running'):
+                job.cancel_event.set()
+                if job.status == 'queued':
+                    job.status = 'cancelled'
+                    job.finished_at = datetime.now()
+                    job.future.cancel()
+            return job.to_dict(include_result=False)
+
+    def shutdown(self):
+        with self.lock:
+            for job in self.jobs.values():
+                job.cancel_event.set()
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -1,3 +1,5 @@
+from anyio import to_thread
+import asyncio
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 import psycopg2
@@ -11,14 +13,19 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from pydantic import BaseModel
 from datetime import datetime
 from fyers_service import FyersHistoricalService
+from fyers_history import resolution_name
 from symbol_master import SymbolMasterService
 from yahoo_finance_service import YahooFinanceService
+from jobs import JobManager
+from telemetry import relative_time, telemetry
 from shared.database import db
+from shared.symbol_resolver import symbol_resolver
 
 app = FastAPI(title="Stock Market API", version="1.0.0")
 fyers_service = FyersHistoricalService()
 symbol_service = SymbolMasterService()
 yahoo_service = YahooFinanceService()
+ingest_jobs = JobManager(max_workers=int(os.getenv('INGEST_JOB_WORKERS', 2)))
 
 app.add_middleware(
     CORSMiddleware,
@@ -28,6 +35,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Blocking (psycopg2/yfinance/requests) handlers are plain `def` so FastAPI runs
+# them on its worker thread pool instead of the event loop; long ingests run as jobs.
+@app.on_event("startup")
+async def configure_threadpool():
+    """Bound the thread pool that runs synchronous route handlers"""
+    to_thread.current_default_thread_limiter().total_tokens = int(os.getenv('API_THREADPOOL_SIZE', 40))
+
+@app.on_event("startup")
+async def prepare_fyers_schema():
+    """Create the Fyers tables once instead of on every save"""
+    try:
+        await to_thread.run_sync(fyers_service.ensure_schema)
+    except Exception as e:
+        print(f"Error preparing Fyers schema: {e}")
+
+def build_symbol_index():
+    try:
+        symbol_service.load_index()
+    except Exception as e:
+        print(f"Error loading symbol index: {e}")
+
+@app.on_event("startup")
+async def load_symbol_index():
+    """Build the symbol search index in the background, outside the ingest job slots"""
+    asyncio.get_running_loop().run_in_executor(None, build_symbol_index)
+
+@app.on_event("shutdown")
+async def flush_ingestion_logs():
+    """Cancel running ingest jobs and write out buffered Yahoo ingestion log records"""
+    ingest_jobs.shutdown()
+    yahoo_service.log_sink.close()
+
 def get_db_connection():
     return psycopg2.connect(
         host=os.getenv("DB_HOST", "localhost"),
@@ -50,7 +89,7 @@ class UserDetails(BaseModel):
     email: str = None
 
 @app.post("/user-tokens")
-async def store_user_token(token: UserToken):
+def store_user_token(token: UserToken):
     try:
         conn = get_db_connection()
         with conn.cursor() as cursor:
@@ -68,7 +107,7 @@ async def store_user_token(token: UserToken):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/user-tokens/{user_id}")
-async def get_user_tokens(user_id: str):
+def get_user_tokens(user_id: str):
     try:
         conn = get_db_connection()
         with conn.cursor() as cursor:
@@ -81,7 +120,7 @@ async def get_user_tokens(user_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/user-details")
-async def store_user_details(details: UserDetails):
+def store_user_details(details: UserDetails):
     try:
         conn = get_db_connection()
         with conn.cursor() as cursor:
@@ -99,7 +138,7 @@ async def store_user_details(details: UserDetails):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/user-details/{user_id}")
-async def get_user_details(user_id: str):
+def get_user_details(user_id: str):
     try:
         conn = get_db_connection()
         with conn.cursor() as cursor:
@@ -117,7 +156,7 @@ async def root():
     return {"message": "Stock Market Data API"}
 
 @app.get("/market-summary")
-async def get_market_summary():
+def get_market_summary():
     try:
         conn = get_db_connection()
         query = "SELECT * FROM market_summary"
@@ -128,7 +167,7 @@ async def get_market_summary():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/stock/{symbol}")
-async def get_stock_data(symbol: str):
+def get_stock_data(symbol: str):
     try:
         conn = get_db_connection()
         query = "SELECT * FROM stock_analysis WHERE Symbol = %s ORDER BY Date DESC LIMIT 30"
@@ -139,7 +178,7 @@ async def get_stock_data(symbol: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/volatility")
-async def get_volatility_analysis():
+def get_volatility_analysis():
     try:
         conn = get_db_connection()
         query = "SELECT * FROM volatility_analysis"
@@ -150,7 +189,7 @@ async def get_volatility_analysis():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/trends")
-async def get_market_trends():
+def get_market_trends():
     try:
         conn = get_db_connection()
         query = "SELECT * FROM market_trends"
@@ -161,7 +200,7 @@ async def get_market_trends():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/fyers/historical/{symbol}")
-async def get_fyers_historical(symbol: str, resolution: str = "1D", days: int = 30):
+def get_fyers_historical(symbol: str, resolution: str = "1D", days: int = 30):
     try:
         data = fyers_service.fetch_historical_data(symbol, resolution, days)
         return data
@@ -169,15 +208,27 @@ async def get_fyers_historical(symbol: str, resolution: str = "1D", days: int =
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/fyers/ingest")
-async def ingest_fyers_data(resolution: str = "1D", days: int = 100):
+def ingest_fyers_data(resolution: str = "1D", days: int = 100, symbols: str = None):
+    """symbols is a comma-separated list of Fyers symbols; defaults to the service's list"""
+    if resolution_name(resolution) is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported Fyers resolution: {resolution}")
     try:
-        result = fyers_service.ingest_all_symbols(resolution, days)
+        result = fyers_service.ingest_all_symbols(resolution, days, symbols.split(",") if symbols else None)
         return {"message": "Data ingestion completed", "records_processed": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/fyers/backfill", status_code=202)
+def backfill_fyers_data(symbols: List[str] = None, resolution: str = "1D", days: int = 365):
+    """Start a background Fyers history backfill (daily bars for a year by default); poll /jobs/{job_id}"""
+    if resolution_name(resolution) is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported Fyers resolution: {resolution}")
+    job = ingest_jobs.submit('fyers_backfill', fyers_service.ingest_all_symbols,
+                             resolution=resolution, days_back=days, symbols=symbols)
+    return {"message": "Fyers history backfill started", "job": job}
+
 @app.get("/ingestion/status")
-async def get_ingestion_status():
+def get_ingestion_status():
     try:
         status = fyers_service.get_ingestion_status()
         return status
@@ -189,11 +240,10 @@ async def start_realtime_ingestion():
     try:
         # Start the real-time ingestion in background
         import asyncio
-        from fyers_service import fyers_service_instance
 
-        if not hasattr(fyers_service_instance, "realtime_task") or fyers_service_instance.realtime_task.done():
+        if not hasattr(fyers_service, "realtime_task") or fyers_service.realtime_task.done():
             loop = asyncio.get_event_loop()
-            fyers_service_instance.realtime_task = loop.create_task(fyers_service_instance.start_realtime_ingestion())
+            fyers_service.realtime_task = loop.create_task(fyers_service.start_realtime_ingestion())
             return {"message": "Real-time ingestion started", "status": "running"}
         else:
             return {"message": "Real-time ingestion already running", "status": "running"}
@@ -203,10 +253,8 @@ async def start_realtime_ingestion():
 @app.post("/ingestion/realtime/stop")
 async def stop_realtime_ingestion():
     try:
-        from fyers_service import fyers_service_instance
-
-        if hasattr(fyers_service_instance, "realtime_task") and not fyers_service_instance.realtime_task.done():
-            fyers_service_instance.realtime_task.cancel()
+        if hasattr(fyers_service, "realtime_task") and not fyers_service.realtime_task.done():
+            fyers_service.realtime_task.cancel()
             return {"message": "Real-time ingestion stopped", "status": "stopped"}
         else:
             return {"message": "Real-time ingestion not running", "status": "stopped"}
@@ -214,23 +262,24 @@ async def stop_realtime_ingestion():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/ingestion/data-sources")
-async def get_data_sources_status():
+def get_data_sources_status():
     try:
-        # Get status of different data sources
+        # Fyers and Yahoo status comes from the telemetry of real fetches, not a probe request
+        yahoo = telemetry.source('yahoo')
         sources = [
             {
                 "name": "Fyers API",
-                "status": "connected" if fyers_service.check_fyers_connection() else "disconnected",
+                "status": fyers_service.check_fyers_connection(),
                 "lastUpdate": fyers_service.get_last_update_time(),
                 "symbolsCount": fyers_service.get_symbols_count(),
                 "latency": fyers_service.get_average_latency()
             },
             {
                 "name": "Yahoo Finance",
-                "status": "connected",  # Assume always available
-                "lastUpdate": "2 min ago",
-                "symbolsCount": 5,
-                "latency": 1200
+                "status": yahoo.status(),
+                "lastUpdate": relative_time(yahoo.last_rows),
+                "symbolsCount": len(yahoo.symbols),
+                "latency": yahoo.average_latency()
             },
             {
                 "name": "NSE API",
@@ -244,63 +293,83 @@ async def get_data_sources_status():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/ingestion/telemetry")
+async def get_ingestion_telemetry():
+    """Per-source request latency histograms, error rates, rows/sec and last-success times"""
+    return telemetry.snapshot()
+
 @app.get("/fyers/latest")
-async def get_fyers_latest():
+def get_fyers_latest():
     try:
         return fyers_service.get_latest_data()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/symbols/update")
-async def update_symbols():
+def update_symbols():
+    try:
+        result = symbol_service.update_all_symbols()
+        return {"message": "Symbol master updated successfully", **result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/symbols/changes")
+def get_symbol_changes(since: int = 0, limit: int = 5000):
+    """Incremental symbol master changes for downstream caches"""
     try:
-        symbol_service.update_all_symbols()
-        return {"message": "Symbol master updated successfully"}
+        return symbol_service.get_changes(since, limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/symbols/search")
-async def search_symbols(q: str, exchange: str = None, limit: int = 50):
+def search_symbols(q: str, exchange: str = None, limit: int = 50):
     try:
         return symbol_service.search_symbols(q, exchange, limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/symbols/popular")
-async def get_popular_symbols():
+def get_popular_symbols():
     try:
         return symbol_service.get_popular_stocks()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/symbols/validate/{symbol}")
-async def validate_symbol(symbol: str):
+def validate_symbol(symbol: str):
+    """Validate a Fyers ticker, Yahoo symbol, ISIN, fy_token or exchange token from memory"""
     try:
-        conn = get_db_connection()
-        query = "SELECT * FROM symbol_master WHERE ex_symbol = %s OR symbol_ticker = %s"
-        cursor = conn.cursor()
-        cursor.execute(query, (symbol, symbol))
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            return {
-                "valid": True,
-                "symbol": result,
-                "tradeable": result['trade_status'] == 1,
-                "limits": {
-                    "upper_price": result['upper_price'],
-                    "lower_price": result['lower_price'],
-                    "min_lot_size": result['min_lot_size'],
-                    "tick_size": result['tick_size']
-                }
-            }
-        return {"valid": False}
+        return symbol_resolver.validate(symbol)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/symbols/validate")
+def validate_symbols(symbols: List[str]):
+    try:
+        return symbol_resolver.validate_many(symbols)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/symbols/resolve/{identifier}")
+def resolve_symbol(identifier: str):
+    """Every identifier of a symbol: Fyers, Yahoo, ISIN, fy_token and exchange token"""
+    try:
+        result = symbol_resolver.resolve(identifier)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Unknown symbol {identifier}")
+    return result
+
+@app.post("/symbols/resolve")
+def resolve_symbols(symbols: List[str]):
+    try:
+        return symbol_resolver.resolve_many(symbols)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/symbols/by-exchange/{exchange}")
-async def get_symbols_by_exchange(exchange: str, limit: int = 100):
+def get_symbols_by_exchange(exchange: str, limit: int = 100):
     try:
         conn = get_db_connection()
         query = "SELECT * FROM symbol_master WHERE exchange_name = %s LIMIT %s"
@@ -317,7 +386,7 @@ async def get_symbols_by_exchange(exchange: str, limit: int = 100):
 # ===========================================
 
 @app.get("/yahoo/historical/{symbol}")
-async def get_yahoo_historical(symbol: str, period: str = "1y", interval: str = "1d"):
+def get_yahoo_historical(symbol: str, period: str = "1y", interval: str = "1d"):
     """Get historical data from Yahoo Finance"""
     try:
         data = yahoo_service.fetch_historical_data(symbol, period, interval)
@@ -327,74 +396,67 @@ async def get_yahoo_historical(symbol: str, period: str = "1y", interval: str =
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/yahoo/ingest")
-async def ingest_yahoo_data(symbols: List[str] = None, period: str = "2y",
-                           interval: str = "1d", include_extended: bool = True,
-                           include_ai_data: bool = True):
-    """Ingest data from Yahoo Finance for specified symbols"""
-    try:
-        result = yahoo_service.ingest_all_symbols(symbols, period, interval, include_extended, include_ai_data)
-        return {
-            "message": "Yahoo Finance data ingestion completed with comprehensive AI data",
-            "results": result
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.post("/yahoo/ingest/{symbol}")
-async def ingest_single_symbol(symbol: str, period: str = "2y",
-                              interval: str = "1d", include_extended: bool = True,
-                              include_ai_data: bool = True):
-    """Ingest data from Yahoo Finance for a single symbol"""
-    try:
-        result = yahoo_service.ingest_symbol_data(symbol, period, interval, include_extended, include_ai_data)
-        return {
-            "message": f"Data ingestion completed for {symbol} with comprehensive AI data",
-            "results": result
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.post("/yahoo/ingest/ai-analysis")
-async def ingest_ai_analysis_data(symbols: List[str] = None, period: str = "5y",
-                                 interval: str = "1d"):
-    """Ingest comprehensive data for AI analysis purposes"""
-    try:
-        result = yahoo_service.ingest_all_symbols(symbols, period, interval,
-                                                 include_extended=True, include_ai_data=True)
-        return {
-            "message": "Comprehensive AI analysis data ingestion completed",
-            "results": result,
-            "data_types_ingested": [
-                "historical_data", "dividends", "stock_splits", "company_info",
-                "earnings", "news", "financial_statements", "options_data",
-                "analyst_recommendations", "institutional_holders", "insider_transactions"
-            ]
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.post("/yahoo/ingest/{symbol}/ai-analysis")
-async def ingest_single_symbol_ai_analysis(symbol: str, period: str = "5y",
-                                          interval: str = "1d"):
-    """Ingest comprehensive data for AI analysis for a single symbol"""
-    try:
-        result = yahoo_service.ingest_symbol_data(symbol, period, interval,
-                                                include_extended=True, include_ai_data=True)
-        return {
-            "message": f"Comprehensive AI analysis data ingestion completed for {symbol}",
-            "results": result,
-            "data_types_ingested": [
-                "historical_data", "dividends", "stock_splits", "company_info",
-                "earnings", "news", "financial_statements", "options_data",
-                "analyst_recommendations", "institutional_holders", "insider_transactions"
-            ]
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+AI_ANALYSIS_DATA_TYPES = [
+    "historical_data", "dividends", "stock_splits", "company_info",
+    "earnings", "news", "financial_statements", "options_data",
+    "analyst_recommendations", "institutional_holders", "insider_transactions"
+]
+
+@app.post("/yahoo/ingest", status_code=202)
+def ingest_yahoo_data(symbols: List[str] = None, period: str = "2y",
+                      interval: str = "1d", include_extended: bool = True,
+                      include_ai_data: bool = True, workers: int = None,
+                      full_refresh: bool = False):
+    """Start a background Yahoo Finance ingest for specified symbols; poll /jobs/{job_id}"""
+    job = ingest_jobs.submit('yahoo_ingest', yahoo_service.ingest_all_symbols,
+                             symbols=symbols, historical_period=period,
+                             historical_interval=interval, include_extended=include_extended,
+                             include_ai_data=include_ai_data, workers=workers,
+                             full_refresh=full_refresh)
+    return {"message": "Yahoo Finance data ingestion started", "job": job}
+
+@app.post("/yahoo/ingest/{symbol}", status_code=202)
+def ingest_single_symbol(symbol: str, period: str = "2y",
+                         interval: str = "1d", include_extended: bool = True,
+                         include_ai_data: bool = True, full_refresh: bool = False):
+    """Start a background Yahoo Finance ingest for a single symbol"""
+    job = ingest_jobs.submit('yahoo_ingest_symbol', yahoo_service.ingest_symbol_data,
+                             symbol=symbol, historical_period=period,
+                             historical_interval=interval, include_extended=include_extended,
+                             include_ai_data=include_ai_data, full_refresh=full_refresh)
+    return {"message": f"Data ingestion started for {symbol}", "job": job}
+
+@app.post("/yahoo/ingest/ai-analysis", status_code=202)
+def ingest_ai_analysis_data(symbols: List[str] = None, period: str = "5y",
+                            interval: str = "1d", workers: int = None,
+                            full_refresh: bool = False):
+    """Start a background ingest of comprehensive data for AI analysis purposes"""
+    job = ingest_jobs.submit('yahoo_ingest_ai', yahoo_service.ingest_all_symbols,
+                             symbols=symbols, historical_period=period,
+                             historical_interval=interval, include_extended=True,
+                             include_ai_data=True, workers=workers, full_refresh=full_refresh)
+    return {
+        "message": "Comprehensive AI analysis data ingestion started",
+        "job": job,
+        "data_types_ingested": AI_ANALYSIS_DATA_TYPES
+    }
+
+@app.post("/yahoo/ingest/{symbol}/ai-analysis", status_code=202)
+def ingest_single_symbol_ai_analysis(symbol: str, period: str = "5y",
+                                     interval: str = "1d", full_refresh: bool = False):
+    """Start a background ingest of comprehensive data for AI analysis for a single symbol"""
+    job = ingest_jobs.submit('yahoo_ingest_symbol_ai', yahoo_service.ingest_symbol_data,
+                             symbol=symbol, historical_period=period,
+                             historical_interval=interval, include_extended=True,
+                             include_ai_data=True, full_refresh=full_refresh)
+    return {
+        "message": f"Comprehensive AI analysis data ingestion started for {symbol}",
+        "job": job,
+        "data_types_ingested": AI_ANALYSIS_DATA_TYPES
+    }
 
 @app.get("/yahoo/company/{symbol}")
-async def get_yahoo_company_info(symbol: str):
+def get_yahoo_company_info(symbol: str):
     """Get company information from Yahoo Finance"""
     try:
         info = yahoo_service.fetch_company_info(symbol)
@@ -405,7 +467,7 @@ async def get_yahoo_company_info(symbol: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/yahoo/dividends/{symbol}")
-async def get_yahoo_dividends(symbol: str):
+def get_yahoo_dividends(symbol: str):
     """Get dividend history from Yahoo Finance"""
     try:
         dividends = yahoo_service.fetch_dividends(symbol)
@@ -416,7 +478,7 @@ async def get_yahoo_dividends(symbol: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/yahoo/splits/{symbol}")
-async def get_yahoo_splits(symbol: str):
+def get_yahoo_splits(symbol: str):
     """Get stock split history from Yahoo Finance"""
     try:
         splits = yahoo_service.fetch_splits(symbol)
@@ -427,7 +489,7 @@ async def get_yahoo_splits(symbol: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/yahoo/earnings/{symbol}")
-async def get_yahoo_earnings(symbol: str):
+def get_yahoo_earnings(symbol: str):
     """Get earnings data from Yahoo Finance"""
     try:
         earnings = yahoo_service.fetch_earnings(symbol)
@@ -436,7 +498,7 @@ async def get_yahoo_earnings(symbol: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/yahoo/news/{symbol}")
-async def get_yahoo_news(symbol: str):
+def get_yahoo_news(symbol: str):
     """Get news articles from Yahoo Finance"""
     try:
         news = yahoo_service.fetch_news(symbol)
@@ -444,17 +506,30 @@ async def get_yahoo_news(symbol: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/yahoo/options/snapshot", status_code=202)
+def snapshot_yahoo_options(symbols: List[str] = None, horizon_days: int = None):
+    """Start a background snapshot of full option chains (defaults to NIFTY and BANKNIFTY)"""
+    job = ingest_jobs.submit('yahoo_options_snapshot', yahoo_service.snapshot_options,
+                             symbols=symbols or ['^NSEI', '^NSEBANK'], horizon_days=horizon_days)
+    return {"message": "Options snapshot started", "job": job}
+
 @app.get("/yahoo/status")
-async def get_yahoo_ingestion_status():
-    """Get Yahoo Finance ingestion status"""
+def get_yahoo_ingestion_status():
+    """Get Yahoo Finance ingestion status, with the progress of recent Yahoo ingest jobs"""
     try:
         status = yahoo_service.get_ingestion_status()
+        status['jobs'] = [job for job in ingest_jobs.list() if job['kind'].startswith('yahoo_')]
         return status
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/yahoo/latency")
+async def get_yahoo_latency(data_type: str = None):
+    """Per-stage ingestion latency histograms since startup"""
+    return yahoo_service.log_sink.latency(data_type)
+
 @app.get("/yahoo/latest")
-async def get_yahoo_latest(symbol: str = None, limit: int = 30):
+def get_yahoo_latest(symbol: str = None, limit: int = 30):
     """Get latest Yahoo Finance data"""
     try:
         data = yahoo_service.get_latest_data(symbol, limit)
@@ -463,7 +538,7 @@ async def get_yahoo_latest(symbol: str = None, limit: int = 30):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/yahoo/performance/{symbol}")
-async def get_yahoo_performance(symbol: str, days: int = 30):
+def get_yahoo_performance(symbol: str, days: int = 30):
     """Get stock performance data"""
     try:
         conn = get_db_connection()
@@ -478,7 +553,7 @@ async def get_yahoo_performance(symbol: str, days: int = 30):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/yahoo/dividend-info/{symbol}")
-async def get_yahoo_dividend_info(symbol: str):
+def get_yahoo_dividend_info(symbol: str):
     """Get dividend information and yield"""
     try:
         conn = get_db_connection()
@@ -493,7 +568,7 @@ async def get_yahoo_dividend_info(symbol: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/yahoo/upcoming-dividends")
-async def get_upcoming_dividends():
+def get_upcoming_dividends():
     """Get upcoming dividend payments"""
     try:
         conn = get_db_connection()
@@ -510,7 +585,7 @@ async def get_upcoming_dividends():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/yahoo/earnings-calendar")
-async def get_earnings_calendar():
+def get_earnings_calendar():
     """Get upcoming earnings dates"""
     try:
         conn = get_db_connection()
@@ -526,8 +601,75 @@ async def get_earnings_calendar():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# ===========================================
+# OHLCV PARQUET LAKE
+# ===========================================
+
+@app.post("/lake/export", status_code=202)
+def export_ohlcv_lake(source: str = "yahoo", interval: str = None, symbols: List[str] = None):
+    """Start a background export (or backfill, when nothing was exported yet) of bars to Parquet.
+
+    interval defaults to daily bars: "1d" for yahoo, "1D" for fyers.
+    """
+    services = {"yahoo": yahoo_service, "fyers": fyers_service}
+    if source not in services:
+        raise HTTPException(status_code=400, detail=f"Unknown source: {source}")
+    if source == "fyers":
+        interval = resolution_name(interval or "1D")
+        if interval is None:
+            raise HTTPException(status_code=400, detail="Unsupported Fyers resolution")
+    interval = interval or "1d"
+    lake = services[source].lake
+    if lake is None:
+        raise HTTPException(status_code=400, detail="OHLCV_LAKE_PATH is not configured")
+    job = ingest_jobs.submit('lake_export', lake.export, source=source, interval=interval,
+                             symbols=symbols)
+    return {"message": f"{source} {interval} lake export started", "job": job}
+
+@app.post("/lake/compact", status_code=202)
+def compact_ohlcv_lake(source: str = "yahoo", interval: str = None, years: List[int] = None):
+    """Start a background merge of each year partition's part files into one file"""
+    services = {"yahoo": yahoo_service, "fyers": fyers_service}
+    if source not in services:
+        raise HTTPException(status_code=400, detail=f"Unknown source: {source}")
+    lake = services[source].lake
+    if lake is None:
+        raise HTTPException(status_code=400, detail="OHLCV_LAKE_PATH is not configured")
+    if source == "fyers":
+        interval = resolution_name(interval or "1D")
+        if interval is None:
+            raise HTTPException(status_code=400, detail="Unsupported Fyers resolution")
+    interval = interval or "1d"
+    job = ingest_jobs.submit('lake_compact', lake.compact, source=source, interval=interval, years=years)
+    return {"message": f"{source} {interval} lake compaction started", "job": job}
+
+# ===========================================
+# INGEST JOBS
+# ===========================================
+
+@app.get("/jobs")
+async def list_ingest_jobs(status: str = None):
+    """List ingest jobs, newest first"""
+    return ingest_jobs.list(status)
+
+@app.get("/jobs/{job_id}")
+async def get_ingest_job(job_id: str):
+    """Status of an ingest job, with its result once finished"""
+    job = ingest_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_ingest_job(job_id: str):
+    """Cancel a queued job, or stop a running one after its in-flight work"""
+    job = ingest_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 @app.get("/health")
-async def health_check():
+def health_check():
     try:
         conn = get_db_connection()
         conn.close()
@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import math
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(title: Optional[str], publisher: Optional[str]) -> str:
+    """md5 of the normalised title and publisher.
+
+    Must stay identical to the SQL backfill in 06-yahoo-news-dedup.sql.
+    """
+    normalised = ' '.join((title or '').split()).lower() + '|' + (publisher or '').strip().lower()
+    return hashlib.md5(normalised.encode()).hexdigest()
+
+
+def normalise_url(url: Optional[str]) -> str:
+    """Lower-cased scheme/host without fragment or trailing slash"""
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'),
+                       parts.query, ''))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for `capacity` keys at `error_rate` false positives"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _positions(self, key: str) -> List[int]:
+        # Kirsch-Mitzenmacher double hashing from one 128-bit digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= np.uint8(1 << (position & 7))
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(key))
+
+
+class NewsDeduplicator:
+    """Drops already-stored (article, symbol) pairs and merges multi-ticker articles.
+
+    Keys are the article content hash and its normalised URL, each paired with
+    the symbol, so the same story under a new ticker still reaches the database
+    where the symbol is appended to the stored row. The filter is only a
+    pre-check: the yahoo_news unique key on content_hash stays authoritative,
+    and a false positive (at most `error_rate`) only skips a redundant write
+    or, rarely, one ticker link.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.counters = {'articles_in': 0, 'articles_out': 0, 'merged': 0, 'seen': 0}
+        self.warm_lock = threading.Lock()
+        self.warmed = False
+
+    @staticmethod
+    def _keys(article: Dict[str, Any], symbol: str) -> List[str]:
+        keys = [f"h:{article['content_hash']}|{symbol}"]
+        url = normalise_url(article.get('link'))
+        if url:
+            keys.append(f"u:{url}|{symbol}")
+        return keys
+
+    def warm(self, connection_factory: Callable[[], Any], days: int = 30):
+        """Seed the filter from recently stored articles so a restart does not rewrite them.
+
+        Only a successful seed counts; after a failure the next call tries again.
+        """
+        with self.warm_lock:
+            if self.warmed:
+                return
+            conn = connection_factory()
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("""
+                        SELECT content_hash, link, symbols FROM yahoo_news
+                        WHERE created_at >= NOW() - make_interval(days => %s)
+                    """, (days,))
+                    rows = cursor.fetchall()
+            finally:
+                conn.close()
+            self.remember({'content_hash': row[0], 'link': row[1], 'symbols': row[2] or []}
+                          for row in rows)
+            self.warmed = True
+        logger.info(f"Seeded news de-duplication filter with {len(rows)} stored articles")
+
+    def merge(self, articles: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One record per story with its unseen symbols collected in `symbols`"""
+        merged: Dict[str, Dict[str, Any]] = {}
+        by_url: Dict[str, str] = {}
+        incoming = 0
+        with self.lock:
+            for article in articles:
+                incoming += 1
+                article = dict(article)
+                article['content_hash'] = article.get('content_hash') or content_hash(
+                    article.get('title'), article.get('publisher'))
+                symbols = article.get('symbols') or [article['symbol']]
+                fresh = [s for s in symbols
+                         if not any(key in self.bloom for key in self._keys(article, s))]
+                self.counters['seen'] += len(symbols) - len(fresh)
+                if not fresh:
+                    continue
+
+                # A story already in this batch under either key absorbs the symbols
+                url = normalise_url(article.get('link'))
+                key = article['content_hash'] if article['content_hash'] in merged else by_url.get(url)
+                if key is None:
+                    key = article['content_hash']
+                    article['symbol'] = fresh[0]
+                    article['symbols'] = []
+                    merged[key] = article
+                    if url:
+                        by_url[url] = key
+                else:
+                    self.counters['merged'] += 1
+                target = merged[key]['symbols']
+                target.extend(s for s in fresh if s not in target)
+
+            self.counters['articles_in'] += incoming
+            self.counters['articles_out'] += len(merged)
+        return list(merged.values())
+
+    def remember(self, articles: Iterable[Dict[str, Any]]):
+        """Mark written articles as seen for every symbol they were stored under"""
+        with self.lock:
+            for article in articles:
+                for symbol in article.get('symbols') or []:
+                    for key in self._keys(article, symbol):
+                        self.bloom.add(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                **self.counters,
+                'filter_keys': self.bloom.count,
+                'filter_capacity': self.capacity,
+                'filter_bytes': int(self.bloom.bits.nbytes)
+            }
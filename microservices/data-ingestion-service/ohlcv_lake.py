@@ -0,0 +1,357 @@
+import functools
+import json
+import logging
+import operator
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow.fs import LocalFileSystem
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_TYPE = pa.timestamp('us', tz='UTC')
+
+# Columns stored in every partition file; year lives in the path
+LAKE_SCHEMA = pa.schema([
+    ('symbol', pa.string()),
+    ('timestamp', TIMESTAMP_TYPE),
+    ('open', pa.float64()),
+    ('high', pa.float64()),
+    ('low', pa.float64()),
+    ('close', pa.float64()),
+    ('adj_close', pa.float64()),
+    ('volume', pa.int64()),
+])
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'adj_close']
+
+# Hive partition field added back by the reader
+PARTITION_FIELDS = [pa.field('year', pa.int32())]
+
+# Rows are sorted by symbol, so row groups of this size give tight min/max
+# statistics for skipping symbols that are not requested
+LAKE_ROW_GROUP_ROWS = 64 * 1024
+
+# Part files a year partition collects before an export compacts it into one
+LAKE_MAX_PARTS = 16
+
+# Rows changed since each symbol's watermark; %(watermarks)s holds one entry per symbol
+LAKE_SOURCES = {
+    'yahoo': {
+        'symbols': "SELECT DISTINCT symbol FROM yahoo_historical_data WHERE interval = %(interval)s",
+        'changes': """
+            SELECT h.symbol, h.timestamp, h.open, h.high, h.low, h.close, h.adj_close, h.volume,
+                   h.updated_at AS changed_at
+            FROM yahoo_historical_data h
+            JOIN unnest(%(symbols)s::text[], %(watermarks)s::timestamptz[]) AS w(symbol, watermark)
+              ON h.symbol = w.symbol
+            WHERE h.interval = %(interval)s AND h.updated_at > w.watermark
+        """,
+        'epoch_seconds': False,
+    },
+    # Fyers candles are never updated, so created_at is the watermark; the
+    # interval is the stored resolution name ("1D", "1H", "5", ...)
+    'fyers': {
+        'symbols': "SELECT DISTINCT symbol FROM fyers_historical_data WHERE resolution = %(interval)s",
+        'changes': """
+            SELECT f.symbol, f.timestamp, f.open, f.high, f.low, f.close, NULL AS adj_close, f.volume,
+                   f.created_at AS changed_at
+            FROM fyers_historical_data f
+            JOIN unnest(%(symbols)s::text[], %(watermarks)s::timestamp[]) AS w(symbol, watermark)
+              ON f.symbol = w.symbol
+            WHERE f.resolution = %(interval)s AND f.created_at > w.watermark
+        """,
+        'epoch_seconds': True,
+    },
+}
+
+
+def _utc(value) -> pd.Timestamp:
+    timestamp = pd.Timestamp(value)
+    return timestamp.tz_localize('UTC') if timestamp.tzinfo is None else timestamp.tz_convert('UTC')
+
+
+def _latest(table: pa.Table) -> pa.Table:
+    """Last row of each (symbol, timestamp) of a table in write order, sorted by symbol and timestamp"""
+    # Sorted on a key table: dictionary-decoded symbols cannot be sorted directly
+    keys = pa.table({'symbol': pc.cast(table.column('symbol'), pa.string()),
+                     'timestamp': table.column('timestamp'),
+                     'seq': np.arange(table.num_rows)})
+    order = pc.sort_indices(keys, [('symbol', 'ascending'), ('timestamp', 'ascending'), ('seq', 'ascending')])
+    keys, table = keys.take(order), table.take(order)
+    symbols = keys.column('symbol').to_numpy(zero_copy_only=False)
+    timestamps = keys.column('timestamp').to_numpy()
+    # A row is superseded when the next row has the same key
+    keep = np.ones(table.num_rows, dtype=bool)
+    keep[:-1] = (symbols[:-1] != symbols[1:]) | (timestamps[:-1] != timestamps[1:])
+    return table.filter(pa.array(keep))
+
+
+class OHLCVLake:
+    """Local Parquet copy of the OHLCV tables for research and backtests.
+
+    Layout is <root>/<source>/interval=<i>/year=<y>/part-<n>.parquet (hive
+    partitioning), each file sorted by symbol and timestamp. Symbol filters are
+    answered from row-group statistics rather than a symbol directory level:
+    one file per symbol-year means thousands of tiny files, and opening them
+    costs far more than the reads. Exports are incremental: each symbol keeps a
+    watermark of its last exported change, and each export chunk is appended as
+    new part files, so a write costs the size of the change. Parts are numbered
+    in write order and a re-exported bar in a later part supersedes the earlier
+    one on read. compact() merges a partition's parts into one file; exports
+    compact the partitions they touched once these hold more than `max_parts`.
+    """
+
+    def __init__(self, root: str, connection_factory: Callable[[], Any],
+                 export_chunk_symbols: int = 200, max_parts: int = LAKE_MAX_PARTS):
+        self.root = root
+        self.connection_factory = connection_factory
+        self.export_chunk_symbols = export_chunk_symbols
+        self.max_parts = max_parts
+        self.lock = threading.Lock()
+        self.last_part = 0
+
+    def _interval_dir(self, source: str, interval: str) -> str:
+        return os.path.join(self.root, source, f"interval={quote(interval, safe='')}")
+
+    def _watermark_path(self, source: str, interval: str) -> str:
+        # Leading underscore keeps the manifest out of Parquet dataset discovery
+        return os.path.join(self._interval_dir(source, interval), '_watermarks.json')
+
+    def _load_watermarks(self, source: str, interval: str) -> Dict[str, str]:
+        path = self._watermark_path(source, interval)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as handle:
+            return json.load(handle)
+
+    def _save_watermarks(self, source: str, interval: str, watermarks: Dict[str, str]):
+        path = self._watermark_path(source, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as handle:
+            json.dump(watermarks, handle, sort_keys=True)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _parts(directory: str) -> List[str]:
+        """Part files of a partition in write order ("data.parquet" of older lakes sorts first)"""
+        return sorted(name for name in os.listdir(directory)
+                      if name.endswith('.parquet') and not name.startswith(('.', '_')))
+
+    def _write_part(self, directory: str, table: pa.Table):
+        # Nanosecond clock numbering, kept increasing within the process
+        self.last_part = max(time.time_ns(), self.last_part + 1)
+        name = f"part-{self.last_part:020d}.parquet"
+        os.makedirs(directory, exist_ok=True)
+        # Dot-prefixed until complete, so readers never see a partial file
+        tmp = os.path.join(directory, '.' + name)
+        # Only symbols repeat; dictionary-encoding price columns just costs time
+        pq.write_table(table, tmp, row_group_size=LAKE_ROW_GROUP_ROWS, use_dictionary=['symbol'])
+        os.replace(tmp, os.path.join(directory, name))
+
+    def write_frame(self, source: str, interval: str, frame: pd.DataFrame) -> List[str]:
+        """Append OHLCV rows (symbol, timestamp, open..volume) as a new part of each year they
+        fall in; returns the partition directories written"""
+        if frame.empty:
+            return []
+        frame = frame.copy()
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'], utc=True)
+        columns = LAKE_SCHEMA.names
+
+        directories = []
+        for year, rows in frame.groupby(frame['timestamp'].dt.year, sort=False):
+            directory = os.path.join(self._interval_dir(source, interval), f"year={year}")
+            rows = rows.reindex(columns=columns)
+            rows[PRICE_COLUMNS] = rows[PRICE_COLUMNS].astype('float64')
+            rows['volume'] = rows['volume'].astype('Int64')
+            rows = rows.drop_duplicates(['symbol', 'timestamp'], keep='last')
+            rows = rows.sort_values(['symbol', 'timestamp'])
+            self._write_part(directory, pa.Table.from_pandas(rows, schema=LAKE_SCHEMA, preserve_index=False))
+            directories.append(directory)
+        return directories
+
+    def _compact_partition(self, directory: str) -> int:
+        parts = self._parts(directory)
+        if len(parts) < 2:
+            return 0
+        table = _latest(pa.concat_tables([pq.read_table(os.path.join(directory, part), schema=LAKE_SCHEMA)
+                                          for part in parts]))
+        # The merged part is numbered after every part it replaces, so a crash
+        # before the old parts are removed leaves duplicates the reader resolves
+        self._write_part(directory, table)
+        for part in parts:
+            os.remove(os.path.join(directory, part))
+        return len(parts)
+
+    def compact(self, source: str, interval: str, years: Optional[Sequence[int]] = None,
+                cancel_event: threading.Event = None) -> Dict[str, int]:
+        """Merge the parts of each year partition (every year when not given) into one file"""
+        base = self._interval_dir(source, interval)
+        with self.lock:
+            if years is None:
+                directories = [os.path.join(base, name) for name in sorted(os.listdir(base))
+                               if name.startswith('year=')] if os.path.isdir(base) else []
+            else:
+                directories = [os.path.join(base, f"year={year}") for year in years]
+            result = {'partitions': 0, 'parts': 0}
+            for directory in directories:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                if os.path.isdir(directory):
+                    merged = self._compact_partition(directory)
+                    result['partitions'] += bool(merged)
+                    result['parts'] += merged
+        logger.info(f"Compacted {result['parts']} {source} {interval} parts in {result['partitions']} partitions")
+        return result
+
+    def _fetch_changes(self, source: str, interval: str, symbols: List[str],
+                       watermarks: Dict[str, str]) -> pd.DataFrame:
+        config = LAKE_SOURCES[source]
+        conn = self.connection_factory()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(config['changes'], {
+                    'symbols': symbols,
+                    'watermarks': [watermarks.get(symbol, '-infinity') for symbol in symbols],
+                    'interval': interval
+                })
+                frame = pd.DataFrame.from_records(cursor.fetchall(), columns=[
+                    'symbol', 'timestamp', 'open', 'high', 'low', 'close', 'adj_close',
+                    'volume', 'changed_at'
+                ])
+        finally:
+            conn.close()
+
+        if config['epoch_seconds']:
+            frame['timestamp'] = pd.to_datetime(frame['timestamp'], unit='s', utc=True)
+        for column in PRICE_COLUMNS:
+            frame[column] = pd.to_numeric(frame[column], errors='coerce').astype('float64')
+        return frame
+
+    def export(self, source: str, interval: str, symbols: Optional[Sequence[str]] = None,
+               cancel_event: threading.Event = None) -> Dict[str, int]:
+        """Append rows changed since the last export; symbols=None exports every stored symbol.
+
+        Partitions the export wrote to are compacted once they hold more than max_parts parts.
+        """
+        config = LAKE_SOURCES[source]
+        with self.lock:
+            if symbols is None:
+                conn = self.connection_factory()
+                try:
+                    with conn.cursor() as cursor:
+                        cursor.execute(config['symbols'], {'interval': interval})
+                        symbols = [row[0] for row in cursor.fetchall()]
+                finally:
+                    conn.close()
+
+            symbols = sorted(set(symbols))
+            watermarks = self._load_watermarks(source, interval)
+            result = {'symbols': 0, 'rows': 0}
+            touched = set()
+            for i in range(0, len(symbols), self.export_chunk_symbols):
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                chunk = symbols[i:i + self.export_chunk_symbols]
+                changes = self._fetch_changes(source, interval, chunk, watermarks)
+                if changes.empty:
+                    continue
+
+                touched.update(self.write_frame(source, interval, changes))
+                latest = changes.groupby('symbol')['changed_at'].max()
+                for symbol, changed_at in latest.items():
+                    watermarks[symbol] = changed_at.isoformat()
+                # Saved per chunk so an interrupted backfill resumes where it stopped
+                self._save_watermarks(source, interval, watermarks)
+                result['symbols'] += len(latest)
+                result['rows'] += len(changes)
+
+            for directory in sorted(touched):
+                if len(self._parts(directory)) > self.max_parts:
+                    self._compact_partition(directory)
+
+            logger.info(f"Exported {result['rows']} {source} {interval} rows for "
+                        f"{result['symbols']} symbols to {self.root}")
+            return result
+
+    def read_table(self, source: str, interval: str, symbols: Optional[Sequence[str]] = None,
+                   start: datetime = None, end: datetime = None,
+                   columns: Optional[List[str]] = None) -> pa.Table:
+        """Memory-mapped read with symbol/date predicates pushed down to partitions and row groups"""
+        base = self._interval_dir(source, interval)
+        fields = {field.name: field for field in list(LAKE_SCHEMA) + PARTITION_FIELDS}
+        empty = pa.schema([fields[name] for name in (columns or fields)]).empty_table()
+        if not os.path.isdir(base):
+            return empty
+
+        predicates = []
+        if symbols:
+            # Equality (unlike isin) is checked against row-group min/max statistics
+            predicates.append(functools.reduce(operator.or_, [ds.field('symbol') == symbol
+                                                              for symbol in symbols]))
+        if start is not None:
+            start = _utc(start)
+            predicates += [ds.field('year') >= start.year,
+                           ds.field('timestamp') >= pa.scalar(start.to_pydatetime(), TIMESTAMP_TYPE)]
+        if end is not None:
+            end = _utc(end)
+            predicates += [ds.field('year') <= end.year,
+                           ds.field('timestamp') <= pa.scalar(end.to_pydatetime(), TIMESTAMP_TYPE)]
+
+        # Dictionary-decoding symbols speeds up wide scans but defeats row-group
+        # pruning, so it is only used when no symbol filter is given
+        file_format = ds.ParquetFileFormat(
+            read_options=ds.ParquetReadOptions(dictionary_columns=None if symbols else ['symbol']))
+        predicate = functools.reduce(operator.and_, predicates) if predicates else None
+        for attempt in range(3):
+            try:
+                return self._scan(base, file_format, predicate, columns or list(fields), empty)
+            except FileNotFoundError:
+                # A compaction replaced parts after they were listed; list them again
+                if attempt == 2:
+                    raise
+
+    @staticmethod
+    def _scan(base: str, file_format, predicate, names: List[str], empty: pa.Table) -> pa.Table:
+        """Matching rows of every partition; partitions with several parts keep each bar's latest row"""
+        dataset = ds.dataset(base, format=file_format, partitioning='hive',
+                             filesystem=LocalFileSystem(use_mmap=True))
+        # symbol and timestamp identify a bar where several parts may hold it
+        merge_columns = names + [name for name in ('symbol', 'timestamp') if name not in names]
+
+        partitions: Dict[str, list] = {}
+        for fragment in sorted(dataset.get_fragments(filter=predicate), key=lambda fragment: fragment.path):
+            partitions.setdefault(os.path.dirname(fragment.path), []).append(fragment)
+        tables = []
+        for fragments in partitions.values():
+            if len(fragments) == 1:
+                tables.append(fragments[0].to_table(schema=dataset.schema, columns=names, filter=predicate))
+                continue
+            parts = [fragment.to_table(schema=dataset.schema, columns=merge_columns, filter=predicate)
+                     for fragment in fragments]
+            tables.append(_latest(pa.concat_tables(parts)).select(names))
+        return pa.concat_tables(tables) if tables else empty
+
+    def read(self, source: str, interval: str, symbols: Optional[Sequence[str]] = None,
+             start: datetime = None, end: datetime = None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """OHLCV bars as a DataFrame, ordered by year, then symbol and timestamp"""
+        return self.read_table(source, interval, symbols, start, end, columns).to_pandas()
+
+    def read_arrays(self, source: str, interval: str, symbols: Optional[Sequence[str]] = None,
+                    start: datetime = None, end: datetime = None,
+                    columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Column name -> NumPy array, skipping the pandas conversion"""
+        table = self.read_table(source, interval, symbols, start, end, columns)
+        return {name: table.column(name).to_numpy() for name in table.column_names}
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+# Seconds a fetched payload stays fresh, per dataset; datasets not listed are never cached
+DEFAULT_TTLS = {
+    'company_info': 24 * 3600,
+    'institutional_holders': 24 * 3600,
+    'analyst_recommendations': 24 * 3600,
+    'financial_statements': 7 * 24 * 3600,
+}
+
+
+def parse_ttls(value: Optional[str]) -> Dict[str, float]:
+    """Parse "dataset=seconds,dataset=seconds" overrides on top of DEFAULT_TTLS"""
+    ttls = dict(DEFAULT_TTLS)
+    for part in (value or '').split(','):
+        if '=' in part:
+            dataset, seconds = part.split('=', 1)
+            ttls[dataset.strip()] = float(seconds)
+    return ttls
+
+
+class StageCache:
+    """TTL and content-hash cache keyed by (symbol, dataset).
+
+    Within the TTL a stage is skipped without a network call. After the TTL
+    the payload is fetched again, but the database write is skipped when its
+    content hash (an ETag computed locally, since Yahoo does not return one)
+    matches the last successfully written payload.
+    """
+
+    def __init__(self, ttls: Dict[str, float]):
+        self.ttls = ttls
+        self.lock = threading.Lock()
+        self.entries: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.counters = {'hits': 0, 'misses': 0, 'unchanged': 0, 'changed': 0}
+
+    def caches(self, dataset: str) -> bool:
+        return self.ttls.get(dataset, 0) > 0
+
+    @staticmethod
+    def payload_hash(payload) -> str:
+        digest = hashlib.sha1()
+        if isinstance(payload, pd.DataFrame):
+            digest.update(pd.util.hash_pandas_object(payload, index=False).values.tobytes())
+            digest.update(','.join(map(str, payload.columns)).encode())
+        else:
+            digest.update(json.dumps(payload, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def is_fresh(self, symbol: str, dataset: str) -> bool:
+        """True (a hit) when the dataset was fetched for the symbol within its TTL"""
+        if not self.caches(dataset):
+            return False
+        with self.lock:
+            entry = self.entries.get((symbol, dataset))
+            fresh = entry is not None and time.monotonic() - entry['fetched_at'] < self.ttls[dataset]
+            self.counters['hits' if fresh else 'misses'] += 1
+            return fresh
+
+    def changed_digest(self, symbol: str, dataset: str, payload) -> Optional[str]:
+        """Digest of a freshly fetched payload, or None when it matches the stored one.
+
+        An unchanged payload renews the TTL immediately; a changed one is only
+        remembered once record() confirms it was written.
+        """
+        if not self.caches(dataset):
+            return None
+        digest = self.payload_hash(payload)
+        with self.lock:
+            entry = self.entries.get((symbol, dataset))
+            if entry is not None and entry['hash'] == digest:
+                entry['fetched_at'] = time.monotonic()
+                self.counters['unchanged'] += 1
+                return None
+            self.counters['changed'] += 1
+            return digest
+
+    def record(self, symbol: str, dataset: str, digest: str):
+        with self.lock:
+            self.entries[(symbol, dataset)] = {'hash': digest, 'fetched_at': time.monotonic()}
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.counters['hits'] + self.counters['misses']
+            return {
+                **self.counters,
+                'hit_rate': round(self.counters['hits'] / lookups, 3) if lookups else 0.0,
+                'entries': len(self.entries),
+                'ttls': dict(self.ttls)
+            }
@@ -0,0 +1,321 @@
+import heapq
+import re
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import accumulate, islice, takewhile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Columns returned for each search hit (what the frontend's Symbol type reads)
+RESULT_COLUMNS = [
+    'symbol_ticker', 'fy_token', 'ex_symbol', 'sym_details', 'exchange_name', 'ex_series',
+    'previous_close', 'upper_price', 'lower_price', 'min_lot_size', 'tick_size', 'trade_status'
+]
+INDEX_COLUMNS = RESULT_COLUMNS + ['symbol_desc', 'expiry_date']
+
+# Prefixes matching more keys than this get their best TOP_K ids precomputed
+HEAVY_RANGE = 64
+TOP_K = 256
+
+TOKEN_RE = re.compile(r'[A-Z0-9]+')
+UPPER_BOUND = '\uffff'
+
+
+def words(text: Optional[str]) -> List[str]:
+    return TOKEN_RE.findall(text.upper()) if text else []
+
+
+def compact(text: Optional[str]) -> str:
+    """Upper-case alphanumerics only: 'M&M' -> 'MM', 'bajaj-auto' -> 'BAJAJAUTO'"""
+    return ''.join(words(text))
+
+
+def deletions(key: str) -> set:
+    """Every string one character shorter than key"""
+    return {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Edit distance counting an adjacent swap as one edit (optimal string alignment),
+    or limit + 1 once it is known to exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+def unique(ids: Iterable[int]) -> Iterator[int]:
+    """Drop consecutive repeats from a sorted id stream"""
+    last = None
+    for doc in ids:
+        if doc != last:
+            yield doc
+            last = doc
+
+
+def instrument_rank(row: Dict[str, Any]) -> tuple:
+    """Sort key that puts the instruments people usually mean first: NSE equities,
+    then indices and other cash series, then derivatives by nearest expiry"""
+    ticker = row.get('symbol_ticker') or ''
+    code = ticker.split(':', 1)[-1]
+    if code.endswith('-EQ'):
+        kind = 0
+    elif code.endswith('-INDEX'):
+        kind = 1
+    elif '-' in code:
+        kind = 2
+    else:
+        kind = 3
+    expiry = str(row.get('expiry_date') or '')
+    return (kind, {'NSE': 0, 'BSE': 1}.get(row.get('exchange_name'), 2),
+            int(expiry) if expiry.isdigit() else 0, len(row.get('ex_symbol') or ''), ticker)
+
+
+class KeyIndex:
+    """Sorted keys with best-first postings, searched by exact key, prefix or edit distance.
+
+    Document ids are assigned in rank order, so the smallest ids in a
+    posting list are the best matches and a prefix query is a lazy merge of
+    the postings of the keys in its range. Ranges too wide to merge per
+    query (every NIFTY option code starts with "N") have their top ids
+    precomputed. Keys with at most one digit (names and cash symbols, not
+    option codes) also go into a single-deletion index for typo lookups.
+    """
+
+    def __init__(self, pairs: Dict[str, List[int]]):
+        self.keys = sorted(pairs)
+        self.postings = [array('i', sorted(set(pairs[key]))) for key in self.keys]
+        # Running posting sizes, to estimate how many documents a prefix matches
+        self.sizes = [0] + list(accumulate(len(postings) for postings in self.postings))
+        self.top: Dict[str, array] = {}
+        self._cache_heavy_prefixes()
+
+        self.deletes: Dict[str, List[int]] = {}
+        for position, key in enumerate(self.keys):
+            if len(key) >= 3 and sum(c.isdigit() for c in key) <= 1:
+                for variant in deletions(key) | {key}:
+                    self.deletes.setdefault(variant, []).append(position)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _range(self, prefix: str, lo: int = 0, hi: int = None) -> Tuple[int, int]:
+        hi = len(self.keys) if hi is None else hi
+        lo = bisect_left(self.keys, prefix, lo, hi)
+        return lo, bisect_left(self.keys, prefix + UPPER_BOUND, lo, hi)
+
+    def _merge(self, lo: int, hi: int) -> Iterator[int]:
+        return unique(heapq.merge(*self.postings[lo:hi]))
+
+    def _cache_heavy_prefixes(self):
+        stack = [(0, len(self.keys), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            i = lo
+            while i < hi and len(self.keys[i]) <= depth:
+                i += 1
+            while i < hi:
+                prefix = self.keys[i][:depth + 1]
+                j = self._range(prefix, i, hi)[1]
+                if j - i > HEAVY_RANGE:
+                    self.top[prefix] = array('i', islice(self._merge(i, j), TOP_K))
+                    stack.append((i, j, depth + 1))
+                i = j
+
+    def prefix_size(self, prefix: str) -> int:
+        """Upper bound on the documents matching prefix"""
+        lo, hi = self._range(prefix)
+        return self.sizes[hi] - self.sizes[lo]
+
+    def exact(self, key: str) -> Sequence[int]:
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            return self.postings[position]
+        return ()
+
+    def prefix(self, prefix: str) -> Iterator[int]:
+        """Ids of documents with a key starting with prefix, best first"""
+        lo, hi = self._range(prefix)
+        if hi - lo > HEAVY_RANGE and prefix in self.top:
+            top = self.top[prefix]
+            yield from top
+            if len(top) < TOP_K:
+                return
+            # Past the precomputed head (a filter rejected most of it): full merge
+            yield from self._merge(lo, hi)
+        else:
+            yield from self._merge(lo, hi)
+
+    def fuzzy(self, key: str, max_distance: int) -> List[Tuple[int, int]]:
+        """(distance, key position) for keys within max_distance edits, nearest first.
+
+        Candidates are keys sharing a deletion variant with the query, which
+        finds every single edit or swap; with max_distance 2 the query is
+        also cut twice, finding double edits that cost the key one deletion.
+        """
+        variants = deletions(key) | {key}
+        if max_distance > 1:
+            variants |= {shorter for variant in deletions(key) for shorter in deletions(variant)}
+        candidates = set()
+        for variant in variants:
+            candidates.update(self.deletes.get(variant, ()))
+        matches = []
+        for position in candidates:
+            distance = edit_distance(key, self.keys[position], max_distance)
+            if 0 < distance <= max_distance:
+                matches.append((distance, position))
+        matches.sort()
+        return matches
+
+    def fuzzy_ids(self, key: str, max_distance: int) -> Iterator[Tuple[int, Iterator[int]]]:
+        """(distance, ids best first) for each distance with any match"""
+        matches = self.fuzzy(key, max_distance)
+        for distance in range(1, max_distance + 1):
+            positions = [position for d, position in matches if d == distance]
+            if positions:
+                yield distance, unique(heapq.merge(*(self.postings[p] for p in positions)))
+
+
+class SymbolIndex:
+    """In-memory search over the symbol master.
+
+    An exact ticker returns just that instrument. Otherwise matches are
+    tried in tiers, stopping once `limit` results are found: cash
+    instruments whose symbol is the query, symbol prefix, then name words
+    (every query word a prefix of some word of the symbol or its
+    description). Only when none of those match are symbols and words
+    within one edit (two for eight or more characters) tried. Within a
+    tier results follow instrument_rank.
+
+    Keys are partitioned by exchange, so an exchange filter never scans
+    other exchanges' matches; unfiltered queries merge the partitions'
+    best-first streams.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]]):
+        rows = sorted(rows, key=instrument_rank)
+        self.records: List[tuple] = []
+        self.exchanges: List[str] = []
+        # ' WORD WORD ...' per document: a word-prefix check is one substring search
+        self.doc_text: List[str] = []
+        self.tickers: Dict[str, int] = {}
+        symbol_keys: Dict[str, Dict[str, List[int]]] = {}
+        word_keys: Dict[str, Dict[str, List[int]]] = {}
+
+        for doc, row in enumerate(rows):
+            self.records.append(tuple(row.get(column) for column in RESULT_COLUMNS))
+            exchange = sys.intern((row.get('exchange_name') or '').upper())
+            self.exchanges.append(exchange)
+            ticker = (row.get('symbol_ticker') or '').upper()
+            self.tickers[ticker] = doc
+
+            symbols = symbol_keys.setdefault(exchange, {})
+            for key in {compact(row.get('ex_symbol')), compact(ticker.split(':', 1)[-1])}:
+                if key:
+                    symbols.setdefault(sys.intern(key), []).append(doc)
+
+            doc_words = {sys.intern(word) for word in
+                         words(row.get('ex_symbol')) + words(row.get('sym_details')) + words(row.get('symbol_desc'))}
+            self.doc_text.append(' ' + ' '.join(doc_words))
+            exchange_words = word_keys.setdefault(exchange, {})
+            for word in doc_words:
+                exchange_words.setdefault(word, []).append(doc)
+
+        self.partitions: Dict[str, Tuple[KeyIndex, KeyIndex]] = {
+            exchange: (KeyIndex(symbol_keys[exchange]), KeyIndex(word_keys[exchange]))
+            for exchange in symbol_keys
+        }
+        # Ids are in rank order, so derivatives are every id from here on
+        self.first_derivative = next((doc for doc, row in enumerate(rows) if instrument_rank(row)[0] == 3),
+                                     len(rows))
+
+    def __len__(self):
+        return len(self.records)
+
+    def record(self, doc: int) -> Dict[str, Any]:
+        return dict(zip(RESULT_COLUMNS, self.records[doc]))
+
+    def _word_matches(self, words_index: KeyIndex, tokens: List[str]) -> Iterator[int]:
+        # Drive from the word matching the fewest documents and check the rest per document
+        driver = min(tokens, key=words_index.prefix_size)
+        others = [' ' + token for token in tokens if token is not driver]
+        for doc in words_index.prefix(driver):
+            text = self.doc_text[doc]
+            if all(token in text for token in others):
+                yield doc
+
+    def _fuzzy_matches(self, symbols: KeyIndex, words_index: KeyIndex, key: str,
+                       tokens: List[str]) -> Iterator[int]:
+        max_distance = 1 if len(key) < 8 else 2
+        symbol_tiers = dict(symbols.fuzzy_ids(key, max_distance))
+        driver = max(tokens, key=len)
+        word_tiers = dict(words_index.fuzzy_ids(driver, 1 if len(driver) < 8 else 2)) if len(driver) >= 4 else {}
+        others = [' ' + token for token in tokens if token is not driver]
+        for distance in range(1, max_distance + 1):
+            yield from symbol_tiers.get(distance, ())
+            for doc in word_tiers.get(distance, ()):
+                text = self.doc_text[doc]
+                if all(token in text for token in others):
+                    yield doc
+
+    def search_ids(self, query: str, exchange: str = None, limit: int = 50) -> List[int]:
+        tokens = words(query)
+        if not tokens or limit <= 0:
+            return []
+        key = ''.join(tokens)
+        exchange = exchange.upper() if exchange else None
+
+        ticker = self.tickers.get(query.strip().upper())
+        if ticker is not None:
+            return [] if exchange and self.exchanges[ticker] != exchange else [ticker]
+
+        if exchange:
+            partitions = [self.partitions[exchange]] if exchange in self.partitions else []
+        else:
+            partitions = list(self.partitions.values())
+
+        def merged(tier) -> Iterator[int]:
+            return heapq.merge(*(tier(symbols, words_index) for symbols, words_index in partitions))
+
+        tiers = [
+            lambda: takewhile(lambda doc: doc < self.first_derivative,
+                              merged(lambda symbols, _: symbols.exact(key))),
+            lambda: merged(lambda symbols, _: symbols.prefix(key)),
+            lambda: merged(lambda _, words_index: self._word_matches(words_index, tokens)),
+            lambda: merged(lambda symbols, words_index: self._fuzzy_matches(symbols, words_index, key, tokens))
+            if not results and len(key) >= 4 else (),
+        ]
+
+        results: List[int] = []
+        seen = set()
+        for tier in tiers:
+            for doc in tier():
+                if doc in seen:
+                    continue
+                seen.add(doc)
+                results.append(doc)
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def search(self, query: str, exchange: str = None, limit: int = 50) -> List[Dict[str, Any]]:
+        return [self.record(doc) for doc in self.search_ids(query, exchange, limit)]
+
+    def stats(self) -> Dict[str, Any]:
+        indexes = [index for partition in self.partitions.values() for index in partition]
+        return {
+            'symbols': len(self.records),
+            'exchanges': sorted(self.partitions),
+            'keys': sum(len(index) for index in indexes),
+            'cached_prefixes': sum(len(index.top) for index in indexes)
+        }
@@ -1,10 +1,112 @@
 import requests
+import codecs
+import hashlib
 import json
 import os
 import sys
+import time
+import pandas as pd
+import psycopg2.extras
+from concurrent.futures import ThreadPoolExecutor
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from shared.database import db
-from typing import List, Dict
+from shared.symbol_resolver import RESOLVER_COLUMNS, symbol_resolver
+from bulk_writer import BulkUpsertWriter, TableSpec
+from symbol_index import INDEX_COLUMNS, SymbolIndex
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+# symbol_master column and the Fyers master JSON key it is loaded from
+MASTER_FIELDS = [
+    ("fy_token", "fyToken"), ("isin", "isin"), ("ex_symbol", "exSymbol"), ("sym_details", "symDetails"),
+    ("exchange_id", "exchange"), ("segment", "segment"), ("ex_sym_name", "exSymName"),
+    ("ex_token", "exToken"), ("ex_series", "exSeries"), ("opt_type", "optType"), ("under_sym", "underSym"),
+    ("under_fy_tok", "underFyTok"), ("ex_inst_type", "exInstType"), ("min_lot_size", "minLotSize"),
+    ("tick_size", "tickSize"), ("trading_session", "tradingSession"), ("last_update", "lastUpdate"),
+    ("expiry_date", "expiryDate"), ("strike_price", "strikePrice"), ("qty_freeze", "qtyFreeze"),
+    ("trade_status", "tradeStatus"), ("currency_code", "currencyCode"), ("upper_price", "upperPrice"),
+    ("lower_price", "lowerPrice"), ("face_value", "faceValue"), ("qty_multiplier", "qtyMultiplier"),
+    ("previous_close", "previousClose"), ("previous_oi", "previousOi"), ("asm_gsm_val", "asmGsmVal"),
+    ("exchange_name", "exchangeName"), ("symbol_desc", "symbolDesc"), ("original_exp_date", "originalExpDate"),
+    ("is_mtf_tradable", "is_mtf_tradable"), ("mtf_margin", "mtf_margin"), ("stream", "stream"),
+]
+
+MASTER_COLUMNS = ["symbol_ticker"] + [column for column, _ in MASTER_FIELDS] + \
+    ["row_hash", "source_master", "is_active", "delisted_at"]
+
+# Columns of a change-feed record: the master fields as loaded
+FEED_COLUMNS = MASTER_COLUMNS[:len(MASTER_FIELDS) + 1]
+
+SYMBOL_MASTER_SPEC = TableSpec("symbol_master", MASTER_COLUMNS, ["symbol_ticker"])
+
+# A refresh that would delist more than this share of a master's active
+# symbols is treated as a bad download and delists nothing
+MAX_DELIST_FRACTION = 0.5
+
+# Change-feed entries older than this are pruned; consumers further behind reload
+CHANGE_RETENTION_DAYS = int(os.getenv("SYMBOL_CHANGE_RETENTION_DAYS", 7))
+
+
+def row_hash(values: Iterable[Any]) -> int:
+    """Stable signed 64-bit hash of a master entry's field values"""
+    encoded = json.dumps(list(values), separators=(",", ":"), default=str).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "big", signed=True)
+
+
+def iter_json_items(chunks: Iterable[bytes], decoder: json.JSONDecoder = json.JSONDecoder()) -> Iterator[Tuple[str, Any]]:
+    """(key, value) pairs of a top-level JSON object, parsed as the chunks arrive"""
+    chunks = iter(chunks)
+    # Chunks can end mid-character; the incremental decoder holds the partial bytes back
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer, pos, started = "", 0, False
+
+    def more(at_least: int = 1) -> bool:
+        nonlocal buffer, pos
+        parts = []
+        size = 0
+        while size < at_least:
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            parts.append(text.decode(chunk))
+            size += len(chunk)
+        if not parts:
+            return False
+        buffer = buffer[pos:] + "".join(parts)
+        pos = 0
+        return True
+
+    def skip(chars: str):
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in chars:
+                pos += 1
+            if pos < len(buffer) or not more():
+                return
+
+    def decode():
+        nonlocal pos
+        while True:
+            try:
+                value, pos = decoder.raw_decode(buffer, pos)
+                return value
+            except json.JSONDecodeError:
+                # Value cut off at the chunk boundary; anything else fails once input ends.
+                # Read ahead at least as much again so small chunks don't re-parse per chunk
+                if not more(max(len(buffer) - pos, 1 << 16)):
+                    raise
+
+    skip(" \t\r\n")
+    if buffer[pos:pos + 1] != "{":
+        raise ValueError("symbol master is not a JSON object")
+    pos += 1
+    while True:
+        skip(" \t\r\n," if started else " \t\r\n")
+        if buffer[pos:pos + 1] == "}":
+            return
+        key = decode()
+        skip(" \t\r\n:")
+        yield key, decode()
+        started = True
 
 class SymbolMasterService:
     def __init__(self):
@@ -17,23 +119,47 @@ class SymbolMasterService:
             "BSE_FO": "https://public.fyers.in/sym_details/BSE_FO_sym_master.json",
             "MCX_COM": "https://public.fyers.in/sym_details/MCX_COM_sym_master.json"
         }
+        # In-memory search index; searches fall back to SQL until it is loaded
+        self.index = None
+        self.bulk_writer = BulkUpsertWriter(self.get_db_connection)
+        self.download_workers = int(os.getenv("SYMBOL_DOWNLOAD_WORKERS", len(self.symbol_urls)))
+        # Seconds to connect, between bytes, and for a whole master download
+        self.connect_timeout = float(os.getenv("SYMBOL_CONNECT_TIMEOUT", 10))
+        self.read_timeout = float(os.getenv("SYMBOL_READ_TIMEOUT", 30))
+        self.download_timeout = float(os.getenv("SYMBOL_DOWNLOAD_TIMEOUT", 300))
+        self.session = requests.Session()
+        self.schema_ready = False
 
     def get_db_connection(self):
         return db.get_connection()
     
-    def fetch_symbols(self, exchange: str) -> List[Dict]:
+    def stream_symbols(self, exchange: str) -> Iterator[Tuple[str, Dict]]:
+        """(ticker, details) pairs of an exchange master, parsed while it downloads.
+
+        Raises on HTTP errors, a stalled connection or a download running
+        past download_timeout, so a partial master is never mistaken for a
+        complete one.
+        """
+        deadline = time.monotonic() + self.download_timeout
+        with self.session.get(self.symbol_urls[exchange], stream=True,
+                              timeout=(self.connect_timeout, self.read_timeout)) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"{exchange} master took longer than {self.download_timeout}s")
+                yield chunk
+
+    def fetch_symbols(self, exchange: str) -> Dict[str, Dict]:
         """Fetch symbols from Fyers symbol master"""
         if exchange not in self.symbol_urls:
-            return []
-        
+            return {}
+
         try:
-            response = requests.get(self.symbol_urls[exchange])
-            if response.status_code == 200:
-                return response.json()
+            return dict(iter_json_items(self.stream_symbols(exchange)))
         except Exception as e:
             print(f"Error fetching {exchange}: {e}")
-        
-        return []
+
+        return {}
     
     def create_symbol_table(self):
         """Create symbol master table"""
@@ -78,65 +204,227 @@ class SymbolMasterService:
                 is_mtf_tradable INT,
                 mtf_margin DECIMAL(10,2),
                 stream VARCHAR(20),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                row_hash BIGINT,
+                source_master VARCHAR(10),
+                is_active BOOLEAN DEFAULT TRUE,
+                delisted_at TIMESTAMP,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # Tables created before delisting and row hashes were tracked
+        for column in ["row_hash BIGINT", "source_master VARCHAR(10)", "is_active BOOLEAN DEFAULT TRUE",
+                       "delisted_at TIMESTAMP", "updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP"]:
+            cursor.execute(f"ALTER TABLE symbol_master ADD COLUMN IF NOT EXISTS {column}")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_symbol_master_source ON symbol_master (source_master, is_active)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS symbol_master_changes (
+                version BIGSERIAL PRIMARY KEY,
+                source_master VARCHAR(10),
+                op CHAR(1),
+                symbol_ticker VARCHAR(50),
+                record JSONB,
+                refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
 
         conn.commit()
         db.pool.putconn(conn)
+        self.schema_ready = True
+
+    def master_rows(self, items: Iterable[Tuple[str, Dict]], exchange: str) -> List[tuple]:
+        """symbol_master rows, with their row hash, for a stream of master entries"""
+        keys = [key for _, key in MASTER_FIELDS]
+        rows = []
+        for ticker, data in items:
+            values = [data.get(key) for key in keys]
+            rows.append((ticker, *values, row_hash(values), exchange, True, None))
+        return rows
+
+    def load_master(self, exchange: str, rows: List[tuple]) -> Dict[str, Any]:
+        """Apply one complete exchange master as a diff against the stored rows.
+
+        Incoming row hashes are compared with the stored ones; only new and
+        changed rows go through the COPY and merge, and active symbols
+        missing from the master are marked delisted (relisted ones come back
+        through the merge). Every write is appended to symbol_master_changes
+        and announced with NOTIFY in the same transaction.
+        """
+        incoming = {row[0]: row for row in rows}
+        conn = self.get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                # Rows loaded before masters were tracked have no source_master yet
+                cursor.execute("""
+                    SELECT symbol_ticker, row_hash, is_active, source_master FROM symbol_master
+                    WHERE source_master = %s OR source_master IS NULL
+                """, (exchange,))
+                stored = {ticker: (hash_value, active, source) for ticker, hash_value, active, source in cursor}
+
+                inserts, updates = [], []
+                for ticker, row in incoming.items():
+                    current = stored.get(ticker)
+                    if current is None:
+                        inserts.append(row)
+                    elif current != (row[-4], True, exchange):
+                        updates.append(row)
+
+                listed = [ticker for ticker, (_, active, source) in stored.items() if active and source == exchange]
+                removed = [ticker for ticker in listed if ticker not in incoming]
+                if len(removed) > len(listed) * MAX_DELIST_FRACTION:
+                    print(f"Not delisting {len(removed)} of {len(listed)} {exchange} symbols: master looks incomplete")
+                    removed = []
+
+                if inserts or updates:
+                    self.bulk_writer.write(cursor, SYMBOL_MASTER_SPEC,
+                                           pd.DataFrame.from_records(inserts + updates, columns=MASTER_COLUMNS))
+                if removed:
+                    cursor.execute("""
+                        UPDATE symbol_master SET is_active = FALSE, delisted_at = CURRENT_TIMESTAMP,
+                        updated_at = CURRENT_TIMESTAMP WHERE symbol_ticker = ANY(%s)
+                    """, (removed,))
+                version = self.record_changes(cursor, exchange, inserts, updates, removed)
+            conn.commit()
+            return {"inserted": len(inserts), "updated": len(updates), "delisted": len(removed),
+                    "unchanged": len(incoming) - len(inserts) - len(updates), "version": version}
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def record_changes(self, cursor, exchange: str, inserts: List[tuple], updates: List[tuple],
+                       removed: List[str]):
+        """Append a master's changes to the feed; returns the latest version written, if any"""
+        def entry(op: str, row: tuple):
+            record = {column: value for column, value in zip(FEED_COLUMNS, row) if value is not None}
+            return (exchange, op, row[0], psycopg2.extras.Json(record))
+
+        entries = [entry("I", row) for row in inserts] + [entry("U", row) for row in updates] + \
+            [(exchange, "D", ticker, None) for ticker in removed]
+        if not entries:
+            return None
+
+        psycopg2.extras.execute_values(cursor, """
+            INSERT INTO symbol_master_changes (source_master, op, symbol_ticker, record) VALUES %s
+        """, entries, page_size=5000)
+        cursor.execute("SELECT currval(pg_get_serial_sequence('symbol_master_changes', 'version'))")
+        version = cursor.fetchone()[0]
+        # Delivered to LISTEN symbol_master_changes on commit
+        cursor.execute("SELECT pg_notify('symbol_master_changes', %s)", (json.dumps({
+            "source_master": exchange, "version": version, "inserted": len(inserts),
+            "updated": len(updates), "delisted": len(removed)}),))
+        return version
+
+    def refresh_exchange(self, exchange: str) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            rows = self.master_rows(iter_json_items(self.stream_symbols(exchange)), exchange)
+            downloaded = time.monotonic()
+            result = self.load_master(exchange, rows)
+        except Exception as e:
+            print(f"Error refreshing {exchange}: {e}")
+            return {"exchange": exchange, "error": str(e)}
+        print(f"{exchange}: {result['inserted']} new, {result['updated']} changed, "
+              f"{result['delisted']} delisted, {result['unchanged']} unchanged")
+        return {"exchange": exchange, **result,
+                "download_seconds": round(downloaded - started, 2),
+                "load_seconds": round(time.monotonic() - downloaded, 2)}
     
     def save_symbols(self, symbols: Dict, exchange: str):
-        """Save symbols to database"""
+        """Save a complete exchange master to the database"""
         if not symbols:
             return
+        self.load_master(exchange, self.master_rows(symbols.items(), exchange))
+
+    def update_all_symbols(self, cancel_event=None):
+        """Update all exchange symbols.
 
+        The masters download concurrently and each is parsed as it streams in
+        and loaded as soon as it completes. A master that fails to download
+        is reported and leaves its existing rows untouched.
+        """
+        self.create_symbol_table()
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.download_workers, thread_name_prefix="symbol-master") as pool:
+            results = list(pool.map(self.refresh_exchange, self.symbol_urls))
+
+        self.prune_changes()
+        if self.index is None or any(result.get("version") for result in results):
+            self.load_index()
+        return {"seconds": round(time.monotonic() - started, 2), "exchanges": results}
+
+    def prune_changes(self):
         conn = self.get_db_connection()
-        cursor = conn.cursor()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM symbol_master_changes WHERE refreshed_at < NOW() - %s * INTERVAL '1 day'",
+                               (CHANGE_RETENTION_DAYS,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_changes(self, since: int = 0, limit: int = 5000) -> Dict[str, Any]:
+        """Change-feed entries after version `since`, oldest first.
 
-        for ticker, data in symbols.items():
+        Apply "I"/"U" records as upserts by symbol_ticker and "D" as delistings,
+        then ask again from the returned version. `reset` means entries after
+        `since` were already pruned and the consumer must reload the master.
+        """
+        if not self.schema_ready:
+            self.create_symbol_table()
+        conn = self.get_db_connection()
+        try:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            cursor.execute("SELECT MIN(version) AS oldest, MAX(version) AS latest FROM symbol_master_changes")
+            bounds = cursor.fetchone()
             cursor.execute("""
-                INSERT INTO symbol_master
-                (symbol_ticker, fy_token, isin, ex_symbol, sym_details, exchange_id,
-                 segment, ex_sym_name, ex_token, ex_series, opt_type, under_sym,
-                 under_fy_tok, ex_inst_type, min_lot_size, tick_size, trading_session,
-                 last_update, expiry_date, strike_price, qty_freeze, trade_status,
-                 currency_code, upper_price, lower_price, face_value, qty_multiplier,
-                 previous_close, previous_oi, asm_gsm_val, exchange_name, symbol_desc,
-                 original_exp_date, is_mtf_tradable, mtf_margin, stream)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (symbol_ticker) DO UPDATE SET
-                fy_token=EXCLUDED.fy_token, sym_details=EXCLUDED.sym_details,
-                last_update=EXCLUDED.last_update, previous_close=EXCLUDED.previous_close
-            """, (
-                ticker, data.get('fyToken'), data.get('isin'), data.get('exSymbol'),
-                data.get('symDetails'), data.get('exchange'), data.get('segment'),
-                data.get('exSymName'), data.get('exToken'), data.get('exSeries'),
-                data.get('optType'), data.get('underSym'), data.get('underFyTok'),
-                data.get('exInstType'), data.get('minLotSize'), data.get('tickSize'),
-                data.get('tradingSession'), data.get('lastUpdate'), data.get('expiryDate'),
-                data.get('strikePrice'), data.get('qtyFreeze'), data.get('tradeStatus'),
-                data.get('currencyCode'), data.get('upperPrice'), data.get('lowerPrice'),
-                data.get('faceValue'), data.get('qtyMultiplier'), data.get('previousClose'),
-                data.get('previousOi'), data.get('asmGsmVal'), data.get('exchangeName'),
-                data.get('symbolDesc'), data.get('originalExpDate'), data.get('is_mtf_tradable'),
-                data.get('mtf_margin'), data.get('stream')
-            ))
+                SELECT version, source_master, op, symbol_ticker, record, refreshed_at
+                FROM symbol_master_changes WHERE version > %s ORDER BY version LIMIT %s
+            """, (since, limit))
+            changes = cursor.fetchall()
+            conn.commit()
+        finally:
+            conn.close()
+
+        return {
+            "version": changes[-1]["version"] if changes else max(since, bounds["latest"] or 0),
+            "latest": bounds["latest"] or 0,
+            "reset": bounds["oldest"] is not None and since < bounds["oldest"] - 1,
+            "changes": changes
+        }
+
+    def load_index(self):
+        """Build the search index and the symbol resolver from one scan of symbol_master and swap them in"""
+        if not self.schema_ready:
+            self.create_symbol_table()
+        columns = list(dict.fromkeys(INDEX_COLUMNS + RESOLVER_COLUMNS))
+        conn = self.get_db_connection()
+        try:
+            # Server-side cursor iterated in itersize batches, so the driver never
+            # buffers the whole result next to the rows built from it
+            cursor = conn.cursor(name="symbol_index")
+            cursor.itersize = 20000
+            cursor.execute(f"SELECT {', '.join(columns)} FROM symbol_master")
+            rows = [dict(zip(columns, row)) for row in cursor]
+            cursor.close()
+            conn.commit()
+        finally:
+            db.pool.putconn(conn)
+
+        # Delisted symbols stay resolvable (and report inactive) but are not searchable
+        resolver = symbol_resolver.load(rows)
+        index = SymbolIndex(row for row in rows if row["is_active"] is not False)
+        self.index = index
+        print(f"Symbol index loaded: {index.stats()}")
+        return {**index.stats(), "resolver": resolver}
 
-        conn.commit()
-        db.pool.putconn(conn)
-    
-    def update_all_symbols(self):
-        """Update all exchange symbols"""
-        self.create_symbol_table()
-        
-        for exchange in self.symbol_urls.keys():
-            print(f"Fetching {exchange} symbols...")
-            symbols = self.fetch_symbols(exchange)
-            self.save_symbols(symbols, exchange)
-            print(f"Saved {len(symbols)} symbols for {exchange}")
-    
     def search_symbols(self, query: str, exchange: str = None, limit: int = 50):
-        """Search symbols by name"""
+        """Search symbols by ticker, symbol or name: prefix, word and typo-tolerant matches"""
+        if self.index is not None:
+            return self.index.search(query, exchange, limit)
+
         conn = self.get_db_connection()
 
         if exchange:
@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from ingestion_log import LatencyHistogram
+
+# Rolling window (seconds) for error rate, recent latency and rows/sec
+WINDOW_SECONDS = 300
+
+# A source with no successful request for this long is reported disconnected
+STALE_SECONDS = 900
+
+
+def relative_time(moment: Optional[datetime]) -> str:
+    """'3 min ago' style age of a timestamp"""
+    if moment is None:
+        return "Never"
+    diff = datetime.now() - moment
+    if diff.days > 0:
+        return f"{diff.days} days ago"
+    elif diff.seconds > 3600:
+        return f"{diff.seconds // 3600} hours ago"
+    elif diff.seconds > 60:
+        return f"{diff.seconds // 60} min ago"
+    return "Just now"
+
+
+class SourceTelemetry:
+    """Request latency, outcomes and row throughput for one data source.
+
+    Requests feed a cumulative latency histogram per endpoint and per-second
+    buckets of (requests, errors, latency, rows) covering the last
+    WINDOW_SECONDS, from which recent error rate, latency and rows/sec are
+    derived without touching the network or the database.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.lock = threading.Lock()
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.seconds = deque()  # [second, requests, errors, latency_ms, rows]
+        self.requests = 0
+        self.errors = 0
+        self.rows = 0
+        self.symbols = set()
+        self.last_success: Optional[datetime] = None
+        self.last_error: Optional[datetime] = None
+        self.last_error_message: Optional[str] = None
+        self.last_rows: Optional[datetime] = None
+
+    def _bucket(self, now: float) -> list:
+        second = int(now)
+        if not self.seconds or self.seconds[-1][0] != second:
+            self.seconds.append([second, 0, 0, 0.0, 0])
+            while self.seconds[0][0] <= second - WINDOW_SECONDS:
+                self.seconds.popleft()
+        return self.seconds[-1]
+
+    def record_request(self, endpoint: str, seconds: float, ok: bool = True, error: str = None):
+        ms = seconds * 1000
+        with self.lock:
+            self.histograms.setdefault(endpoint, LatencyHistogram()).observe(ms)
+            bucket = self._bucket(time.time())
+            bucket[1] += 1
+            bucket[3] += ms
+            self.requests += 1
+            if ok:
+                self.last_success = datetime.now()
+            else:
+                bucket[2] += 1
+                self.errors += 1
+                self.last_error = datetime.now()
+                self.last_error_message = error
+
+    def record_rows(self, count: int, symbols: Iterable[str] = ()):
+        with self.lock:
+            self._bucket(time.time())[4] += count
+            self.rows += count
+            self.symbols.update(symbols)
+            if count:
+                self.last_rows = datetime.now()
+
+    def window(self) -> Dict[str, Any]:
+        with self.lock:
+            self._bucket(time.time())
+            requests = sum(bucket[1] for bucket in self.seconds)
+            errors = sum(bucket[2] for bucket in self.seconds)
+            latency_ms = sum(bucket[3] for bucket in self.seconds)
+            rows = sum(bucket[4] for bucket in self.seconds)
+            span = max(1, min(WINDOW_SECONDS, int(time.time()) - self.seconds[0][0] + 1))
+        return {
+            'seconds': span,
+            'requests': requests,
+            'errors': errors,
+            'error_rate': round(errors / requests, 3) if requests else None,
+            'avg_latency_ms': round(latency_ms / requests, 1) if requests else None,
+            'rows_per_sec': round(rows / span, 1)
+        }
+
+    def status(self, window: Dict[str, Any] = None) -> str:
+        """connected / error / disconnected, or idle before the first request"""
+        window = window or self.window()
+        if self.last_success is None and self.last_error is None:
+            return 'idle'
+        if window['error_rate'] is not None and window['error_rate'] >= 0.5:
+            return 'error'
+        if self.last_success is None or (datetime.now() - self.last_success).total_seconds() > STALE_SECONDS:
+            return 'disconnected'
+        return 'connected'
+
+    def average_latency(self) -> float:
+        """Recent average request latency in ms, else the all-time average, else 0"""
+        recent = self.window()['avg_latency_ms']
+        if recent is not None:
+            return recent
+        with self.lock:
+            count = sum(histogram.count for histogram in self.histograms.values())
+            total = sum(histogram.total_ms for histogram in self.histograms.values())
+        return round(total / count, 1) if count else 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        window = self.window()
+        status = self.status(window)
+        with self.lock:
+            return {
+                'status': status,
+                'requests': self.requests,
+                'errors': self.errors,
+                'rows': self.rows,
+                'symbols': len(self.symbols),
+                'last_success': self.last_success.isoformat() if self.last_success else None,
+                'last_error': self.last_error.isoformat() if self.last_error else None,
+                'last_error_message': self.last_error_message,
+                'last_rows': self.last_rows.isoformat() if self.last_rows else None,
+                'window': window,
+                'endpoints': {endpoint: histogram.snapshot() for endpoint, histogram in self.histograms.items()}
+            }
+
+
+class Telemetry:
+    """In-process registry of per-source ingestion telemetry"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sources: Dict[str, SourceTelemetry] = {}
+
+    def source(self, name: str) -> SourceTelemetry:
+        with self.lock:
+            if name not in self.sources:
+                self.sources[name] = SourceTelemetry(name)
+            return self.sources[name]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            sources = list(self.sources.values())
+        return {source.name: source.snapshot() for source in sources}
+
+
+telemetry = Telemetry()
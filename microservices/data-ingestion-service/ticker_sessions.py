@@ -0,0 +1,120 @@
+import threading
+import time
+from typing import Any, Dict, Iterable
+from urllib.parse import urlsplit
+
+import requests
+import yfinance as yf
+from requests.adapters import HTTPAdapter
+
+from shared.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+from telemetry import telemetry
+
+# URL path prefix -> rate limiter endpoint for Yahoo's APIs
+YAHOO_ENDPOINTS = [
+    ('/v8/finance/chart', 'yahoo:chart'),
+    ('/v10/finance/quotesummary', 'yahoo:quote_summary'),
+    ('/v7/finance/options', 'yahoo:options'),
+    ('/v1/finance/search', 'yahoo:search'),
+    ('/ws/fundamentals-timeseries', 'yahoo:fundamentals'),
+]
+
+
+def yahoo_endpoint(url: str) -> str:
+    path = urlsplit(url).path.lower()
+    for prefix, endpoint in YAHOO_ENDPOINTS:
+        if path.startswith(prefix):
+            return endpoint
+    return 'yahoo:other'
+
+
+class ThrottledAdapter(HTTPAdapter):
+    """HTTPAdapter that takes a limiter token before each request and reports the status after.
+
+    Sitting under yfinance, it throttles every HTTP call (including ones
+    yfinance makes from its own threads) against the budget of its endpoint,
+    and counts throttled responses per thread so callers can tell a fetch
+    that came back empty because Yahoo pushed back.
+    """
+
+    def __init__(self, limiter: AdaptiveRateLimiter, **kwargs):
+        super().__init__(**kwargs)
+        self.limiter = limiter
+        self.local = threading.local()
+
+    def throttled(self) -> int:
+        """Throttled responses seen by the calling thread so far"""
+        return getattr(self.local, 'throttled', 0)
+
+    def send(self, request, **kwargs):
+        endpoint = yahoo_endpoint(request.url)
+        self.limiter.acquire(endpoint)
+        started = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except requests.RequestException as e:
+            self.limiter.report(endpoint, None)
+            telemetry.source('yahoo').record_request(endpoint, time.perf_counter() - started, False, str(e))
+            self.local.throttled = self.throttled() + 1
+            raise
+        ok = response.status_code < 400
+        telemetry.source('yahoo').record_request(endpoint, time.perf_counter() - started, ok,
+                                                 None if ok else f"HTTP {response.status_code}")
+        if self.limiter.report(endpoint, response.status_code,
+                               parse_retry_after(response.headers.get('Retry-After'))):
+            self.local.throttled = self.throttled() + 1
+        return response
+
+
+class TickerSessions:
+    """One pooled, rate-limited HTTP session for all Yahoo calls and one yf.Ticker per symbol in flight.
+
+    yf.Ticker caches what it has fetched (quote summary modules, option
+    expiries) and the cookie/crumb handshake lives on its session, so every
+    stage of a symbol reuses one Ticker while the symbol is open. open() and
+    release() are reference counted; outside an open scope get() returns a
+    fresh Ticker on the shared session, so ad-hoc API calls never see data
+    cached by an earlier run.
+    """
+
+    def __init__(self, limiter: AdaptiveRateLimiter, pool_size: int = 32):
+        self.session = requests.Session()
+        self.adapter = ThrottledAdapter(limiter, pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self.lock = threading.Lock()
+        self.tickers: Dict[str, yf.Ticker] = {}
+        self.refs: Dict[str, int] = {}
+        self.counters = {'created': 0, 'reused': 0}
+
+    def open(self, symbols: Iterable[str]):
+        """Share one Ticker per symbol until the matching release()"""
+        with self.lock:
+            for symbol in symbols:
+                self.refs[symbol] = self.refs.get(symbol, 0) + 1
+
+    def release(self, symbol: str):
+        with self.lock:
+            refs = self.refs.get(symbol, 0) - 1
+            if refs > 0:
+                self.refs[symbol] = refs
+            else:
+                self.refs.pop(symbol, None)
+                self.tickers.pop(symbol, None)
+
+    def get(self, symbol: str) -> yf.Ticker:
+        with self.lock:
+            ticker = self.tickers.get(symbol)
+            if ticker is not None:
+                self.counters['reused'] += 1
+                return ticker
+            # Construction is cheap; requests only happen on attribute access
+            ticker = yf.Ticker(symbol, session=self.session)
+            self.counters['created'] += 1
+            if symbol in self.refs:
+                self.tickers[symbol] = ticker
+            return ticker
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {**self.counters, 'open_symbols': len(self.refs), 'cached_tickers': len(self.tickers)}
@@ -1,16 +1,218 @@
 import yfinance as yf
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import psycopg2
 import psycopg2.extras
 import os
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+from bulk_writer import BulkUpsertWriter, TableSpec
+from ingestion_engine import IngestionEngine
+from ingestion_log import IngestionLogSink
+from news_dedup import NewsDeduplicator
+from ohlcv_lake import OHLCVLake
+from stage_cache import StageCache, parse_ttls
+from telemetry import telemetry
+from ticker_sessions import TickerSessions
+from shared.database import get_pool
+from shared.rate_limiter import AdaptiveRateLimiter, RateLimitedError, parse_budgets
+from shared.symbol_resolver import symbol_resolver
 
 logger = logging.getLogger(__name__)
 
+# Ingestion stages grouped by the ingest_* flag that enables them
+INGESTION_STAGES = {
+    'core': ['historical', 'dividends', 'splits'],
+    'extended': ['company_info', 'earnings', 'news'],
+    'ai': ['financial_statements', 'options', 'analyst_recommendations',
+           'institutional_holders', 'insider_transactions'],
+}
+
+STAGE_FETCHERS = {
+    'dividends': 'fetch_dividends',
+    'splits': 'fetch_splits',
+    'company_info': 'fetch_company_info',
+    'earnings': 'fetch_earnings',
+    'news': 'fetch_news',
+    'financial_statements': 'fetch_financial_statements',
+    'options': 'fetch_options_data',
+    'analyst_recommendations': 'fetch_analyst_recommendations',
+    'institutional_holders': 'fetch_institutional_holders',
+    'insider_transactions': 'fetch_insider_transactions',
+}
+
+# Yahoo statement row label for each column of the statement tables
+STATEMENT_FIELDS = {
+    'income_statement': {
+        'total_revenue': 'Total Revenue',
+        'cost_of_revenue': 'Cost Of Revenue',
+        'gross_profit': 'Gross Profit',
+        'operating_expense': 'Operating Expense',
+        'operating_income': 'Operating Income',
+        'net_income': 'Net Income',
+        'ebit': 'EBIT',
+        'ebitda': 'EBITDA',
+        'interest_expense': 'Interest Expense',
+        'income_before_tax': 'Pretax Income',
+        'income_tax_expense': 'Tax Provision',
+        'research_development': 'Research And Development',
+        'selling_general_admin': 'Selling General And Administration',
+    },
+    'balance_sheet': {
+        'total_assets': 'Total Assets',
+        'current_assets': 'Current Assets',
+        'cash': 'Cash And Cash Equivalents',
+        'total_liabilities': 'Total Liabilities Net Minority Interest',
+        'current_liabilities': 'Current Liabilities',
+        'total_stockholder_equity': 'Total Equity Gross Minority Interest',
+        'retained_earnings': 'Retained Earnings',
+        'property_plant_equipment': 'Property Plant And Equipment Net',
+        'net_receivables': 'Receivables',
+        'inventory': 'Inventory',
+        'accounts_payable': 'Payables',
+    },
+    'cash_flow': {
+        'operating_cash_flow': 'Operating Cash Flow',
+        'investing_cash_flow': 'Investing Cash Flow',
+        'financing_cash_flow': 'Financing Cash Flow',
+        'net_income': 'Net Income',
+        'depreciation': 'Depreciation',
+        'change_in_receivables': 'Change In Receivables',
+        'change_in_liabilities': 'Change In Payables And Accrued Expense',
+        'change_in_inventory': 'Change In Inventory',
+        'capital_expenditures': 'Capital Expenditure',
+        'dividends_paid': 'Dividends Paid',
+    },
+}
+
+# yf.Ticker attribute holding each statement, per period type
+STATEMENT_SOURCES = {
+    'annual': {
+        'income_statement': 'income_stmt',
+        'balance_sheet': 'balance_sheet',
+        'cash_flow': 'cash_flow',
+    },
+    'quarterly': {
+        'income_statement': 'quarterly_income_stmt',
+        'balance_sheet': 'quarterly_balance_sheet',
+        'cash_flow': 'quarterly_cash_flow',
+    },
+}
+
+# Upsert targets for every save_* method, keyed by dataset name
+YAHOO_TABLES = {
+    'historical': TableSpec(
+        'yahoo_historical_data',
+        ['timestamp', 'symbol', 'interval', 'open', 'high', 'low', 'close', 'adj_close', 'volume'],
+        ['symbol', 'timestamp', 'interval']
+    ),
+    'dividends': TableSpec(
+        'yahoo_dividends',
+        ['symbol', 'ex_dividend_date', 'dividend_amount'],
+        ['symbol', 'ex_dividend_date']
+    ),
+    'splits': TableSpec(
+        'yahoo_stock_splits',
+        ['symbol', 'split_date', 'split_ratio', 'numerator', 'denominator'],
+        ['symbol', 'split_date']
+    ),
+    'company_info': TableSpec(
+        'yahoo_company_info',
+        ['symbol', 'company_name', 'sector', 'industry', 'country', 'website', 'business_summary',
+         'market_cap', 'enterprise_value', 'trailing_pe', 'forward_pe', 'peg_ratio',
+         'price_to_sales', 'price_to_book', 'enterprise_to_revenue', 'enterprise_to_ebitda',
+         'beta', 'fifty_two_week_high', 'fifty_two_week_low', 'fifty_day_moving_average',
+         'two_hundred_day_moving_average', 'shares_outstanding', 'shares_float',
+         'percent_held_by_insiders', 'percent_held_by_institutions', 'short_ratio',
+         'short_percent_of_float', 'shares_short', 'book_value',
+         'trailing_eps', 'forward_eps', 'last_dividend_value', 'last_dividend_date',
+         'dividend_yield', 'five_year_avg_dividend_yield', 'payout_ratio', 'currency'],
+        ['symbol'],
+        update_columns=['company_name', 'sector', 'industry', 'market_cap', 'trailing_pe',
+                        'dividend_yield', 'fifty_two_week_high', 'fifty_two_week_low'],
+        touch_columns=['last_updated', 'updated_at']
+    ),
+    'earnings': TableSpec(
+        'yahoo_earnings',
+        ['symbol', 'quarter', 'year', 'eps_estimate', 'eps_actual', 'eps_difference',
+         'surprise_percent', 'earnings_date'],
+        ['symbol', 'quarter', 'year']
+    ),
+    # One row per story: a story seen under another ticker only extends `symbols`
+    'news': TableSpec(
+        'yahoo_news',
+        ['symbol', 'symbols', 'content_hash', 'title', 'publisher', 'link', 'provider_publish_time',
+         'type', 'related_tickers', 'summary', 'thumbnail_url'],
+        ['content_hash'],
+        update_columns=['symbols'],
+        array_columns=['related_tickers', 'symbols'],
+        update_expressions={
+            'symbols': "ARRAY(SELECT DISTINCT unnest(yahoo_news.symbols || EXCLUDED.symbols))"
+        },
+        update_where="NOT yahoo_news.symbols @> EXCLUDED.symbols",
+        skip_when="EXISTS (SELECT 1 FROM yahoo_news t "
+                  "WHERE t.link = s.link AND t.content_hash <> s.content_hash)"
+    ),
+    'income_statement': TableSpec(
+        'yahoo_income_statement',
+        ['symbol', 'fiscal_year', 'period_type', 'fiscal_quarter', 'total_revenue',
+         'cost_of_revenue', 'gross_profit', 'operating_expense', 'operating_income', 'net_income',
+         'ebit', 'ebitda', 'interest_expense', 'income_before_tax', 'income_tax_expense',
+         'research_development', 'selling_general_admin'],
+        ['symbol', 'fiscal_year', 'period_type', 'fiscal_quarter']
+    ),
+    'balance_sheet': TableSpec(
+        'yahoo_balance_sheet',
+        ['symbol', 'fiscal_year', 'period_type', 'fiscal_quarter', 'total_assets',
+         'current_assets', 'cash', 'total_liabilities', 'current_liabilities',
+         'total_stockholder_equity', 'retained_earnings', 'property_plant_equipment',
+         'net_receivables', 'inventory', 'accounts_payable'],
+        ['symbol', 'fiscal_year', 'period_type', 'fiscal_quarter']
+    ),
+    'cash_flow': TableSpec(
+        'yahoo_cash_flow',
+        ['symbol', 'fiscal_year', 'period_type', 'fiscal_quarter', 'operating_cash_flow',
+         'investing_cash_flow', 'financing_cash_flow', 'net_income', 'depreciation',
+         'change_in_receivables', 'change_in_liabilities', 'change_in_inventory',
+         'capital_expenditures', 'dividends_paid'],
+        ['symbol', 'fiscal_year', 'period_type', 'fiscal_quarter']
+    ),
+    'options': TableSpec(
+        'yahoo_options_data',
+        ['symbol', 'option_symbol', 'contract_symbol', 'strike', 'last_price', 'bid', 'ask',
+         'change', 'change_percent', 'volume', 'open_interest', 'implied_volatility',
+         'in_the_money', 'currency', 'option_type', 'expiration_date', 'last_trade_date',
+         'data_date'],
+        ['option_symbol', 'data_date'],
+        update_columns=['last_price', 'bid', 'ask', 'change', 'change_percent', 'volume',
+                        'open_interest', 'implied_volatility', 'in_the_money', 'last_trade_date']
+    ),
+    'analyst_recommendations': TableSpec(
+        'yahoo_analyst_recommendations',
+        ['symbol', 'period', 'strong_buy', 'buy', 'hold', 'sell', 'strong_sell',
+         'total_ratings', 'average_rating', 'data_date'],
+        ['symbol', 'period', 'data_date']
+    ),
+    'institutional_holders': TableSpec(
+        'yahoo_institutional_holders',
+        ['symbol', 'holder_name', 'shares_held', 'shares_change', 'percent_held',
+         'value_held', 'date_reported'],
+        ['symbol', 'holder_name', 'date_reported']
+    ),
+    'insider_transactions': TableSpec(
+        'yahoo_insider_transactions',
+        ['symbol', 'insider_name', 'relation', 'transaction_date', 'transaction_type',
+         'owner_type', 'shares_traded', 'last_price', 'shares_held'],
+        ['symbol', 'insider_name', 'transaction_date', 'transaction_type'],
+        update_columns=['owner_type', 'shares_traded', 'last_price', 'shares_held']
+    ),
+}
+
 class YahooFinanceService:
     def __init__(self):
         self.db_config = {
@@ -20,6 +222,29 @@ class YahooFinanceService:
             'password': os.getenv('DB_PASSWORD', 'apipass'),
             'database': os.getenv('DB_NAME', 'stockmarket')
         }
+        self.pool = get_pool(**self.db_config)
+        self.bulk_writer = BulkUpsertWriter(self.get_db_connection)
+        # Per-endpoint budgets ("yahoo:chart=4,yahoo:quote_summary=2"); the rest share the default
+        self.rate_limiter = AdaptiveRateLimiter(float(os.getenv('YAHOO_REQUESTS_PER_SECOND', 4)),
+                                                parse_budgets(os.getenv('YAHOO_ENDPOINT_BUDGETS')))
+        self.tickers = TickerSessions(self.rate_limiter, pool_size=int(os.getenv('YAHOO_HTTP_POOL_SIZE', 32)))
+        self.stage_cache = StageCache(parse_ttls(os.getenv('YAHOO_CACHE_TTLS')))
+        self.news_dedup = NewsDeduplicator(capacity=int(os.getenv('YAHOO_NEWS_FILTER_CAPACITY', 1_000_000)))
+        self.engine = IngestionEngine(self, workers=int(os.getenv('YAHOO_INGEST_WORKERS', 8)),
+                                      max_retries=int(os.getenv('YAHOO_STAGE_RETRIES', 3)))
+        self.log_sink = IngestionLogSink(
+            self.get_db_connection,
+            batch_size=int(os.getenv('YAHOO_LOG_BATCH_SIZE', 500)),
+            flush_interval=float(os.getenv('YAHOO_LOG_FLUSH_SECONDS', 5))
+        )
+        self.download_batch_size = int(os.getenv('YAHOO_DOWNLOAD_BATCH_SIZE', 100))
+        # Parquet export of historical bars after each ingest; disabled unless a path is set
+        lake_path = os.getenv('OHLCV_LAKE_PATH')
+        self.lake = OHLCVLake(lake_path, self.get_db_connection) if lake_path else None
+        self.options_horizon_days = int(os.getenv('YAHOO_OPTIONS_HORIZON_DAYS', 0))
+        self.options_fetch_workers = int(os.getenv('YAHOO_OPTIONS_FETCH_WORKERS', 4))
+        # Re-fetch this much history before the watermark to pick up late corrections
+        self.watermark_overlap = timedelta(days=int(os.getenv('YAHOO_WATERMARK_OVERLAP_DAYS', 3)))
 
         # Default symbols for Indian market
         self.default_symbols = [
@@ -29,36 +254,46 @@ class YahooFinanceService:
         ]
 
     def get_db_connection(self):
-        """Get database connection"""
-        return psycopg2.connect(**self.db_config)
+        """Get a pooled database connection; close() returns it to the pool"""
+        return self.pool.getconn()
 
     def get_symbols_from_master(self, limit: int = 100) -> List[str]:
-        """Get symbols from symbol_master table and convert to Yahoo format"""
+        """Yahoo symbols of NSE equities in symbol_master, from the shared resolver"""
+        return [record.yahoo for record in symbol_resolver.equities('NSE', limit)]
+
+    def get_history_starts(self, symbols: List[str], interval: str = "1d") -> Dict[str, datetime]:
+        """Incremental fetch start per symbol: its stored watermark minus the overlap window.
+
+        Symbols with no stored candles for `interval` are absent and need a full download.
+        """
+        if not symbols:
+            return {}
+
+        db_symbols = {symbol.replace('.NS', ''): symbol for symbol in symbols}
         conn = self.get_db_connection()
         try:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
                 cursor.execute("""
-                    SELECT ex_symbol, exchange_name
-                    FROM symbol_master
-                    WHERE exchange_name = 'NSE' AND ex_series = 'EQ'
-                    LIMIT %s
-                """, (limit,))
-
-                symbols = []
-                for row in cursor.fetchall():
-                    # Convert NSE format to Yahoo format
-                    symbol = row['ex_symbol'].replace('NSE:', '').replace('-EQ', '.NS')
-                    symbols.append(symbol)
-
-                return symbols
+                    SELECT symbol, MAX(timestamp) AS watermark
+                    FROM yahoo_historical_data
+                    WHERE interval = %s AND symbol = ANY(%s)
+                    GROUP BY symbol
+                """, (interval, list(db_symbols)))
+
+                return {db_symbols[row['symbol']]: row['watermark'] - self.watermark_overlap
+                        for row in cursor.fetchall() if row['watermark']}
         finally:
             conn.close()
 
-    def fetch_historical_data(self, symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
-        """Fetch historical data from Yahoo Finance"""
+    def fetch_historical_data(self, symbol: str, period: str = "1y", interval: str = "1d",
+                              start: datetime = None) -> pd.DataFrame:
+        """Fetch historical data from Yahoo Finance, from `start` when given instead of `period`"""
         try:
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(period=period, interval=interval)
+            ticker = self.tickers.get(symbol)
+            if start is not None:
+                data = ticker.history(start=start, interval=interval)
+            else:
+                data = ticker.history(period=period, interval=interval)
 
             if data.empty:
                 logger.warning(f"No data found for {symbol}")
@@ -90,10 +325,65 @@ class YahooFinanceService:
             logger.error(f"Error fetching historical data for {symbol}: {str(e)}")
             return pd.DataFrame()
 
+    def fetch_historical_batch(self, symbols: List[str], period: str = "1y", interval: str = "1d",
+                               starts: Dict[str, datetime] = None) -> pd.DataFrame:
+        """Fetch historical data for many symbols with one multi-ticker download.
+
+        Returns the same long format as fetch_historical_data, one row per
+        (symbol, timestamp), built with a single stack of the wide frame.
+        With `starts` (see get_history_starts) the download begins at the
+        earliest start and each symbol is trimmed to its own start.
+        """
+        if not symbols:
+            return pd.DataFrame()
+
+        try:
+            window = {'period': period}
+            if starts:
+                window = {'start': min(starts[symbol] for symbol in symbols)}
+            wide = yf.download(symbols, interval=interval, group_by='column', auto_adjust=False,
+                               actions=False, threads=True, progress=False,
+                               session=self.tickers.session, **window)
+
+            if wide is None or wide.empty:
+                logger.warning(f"No data found for batch of {len(symbols)} symbols")
+                return pd.DataFrame()
+
+            if isinstance(wide.columns, pd.MultiIndex):
+                # (field, ticker) columns -> (timestamp, ticker) rows; rows where a
+                # ticker has no candle are all-NaN and dropped by stack
+                data = wide.stack(level=1)
+                data.index = data.index.set_names(['timestamp', 'symbol'])
+                data = data.reset_index()
+            else:
+                data = wide.reset_index()
+                data.insert(1, 'symbol', symbols[0])
+                data = data.rename(columns={data.columns[0]: 'timestamp'})
+
+            data = data.rename(columns={
+                'Open': 'open',
+                'High': 'high',
+                'Low': 'low',
+                'Close': 'close',
+                'Adj Close': 'adj_close',
+                'Volume': 'volume'
+            })
+            data['timestamp'] = pd.to_datetime(data['timestamp'], utc=True)
+            if starts:
+                symbol_starts = pd.to_datetime(data['symbol'].map(starts), utc=True)
+                data = data[data['timestamp'] >= symbol_starts].reset_index(drop=True)
+            data['symbol'] = data['symbol'].str.replace('.NS', '', regex=False)
+
+            return data
+
+        except Exception as e:
+            logger.error(f"Error fetching historical batch of {len(symbols)} symbols: {str(e)}")
+            return pd.DataFrame()
+
     def fetch_dividends(self, symbol: str) -> pd.DataFrame:
         """Fetch dividend history from Yahoo Finance"""
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = self.tickers.get(symbol)
             dividends = ticker.dividends
 
             if dividends.empty:
@@ -117,7 +407,7 @@ class YahooFinanceService:
     def fetch_splits(self, symbol: str) -> pd.DataFrame:
         """Fetch stock split history from Yahoo Finance"""
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = self.tickers.get(symbol)
             splits = ticker.splits
 
             if splits.empty:
@@ -152,10 +442,10 @@ class YahooFinanceService:
             logger.error(f"Error fetching splits for {symbol}: {str(e)}")
             return pd.DataFrame()
 
-    def fetch_company_info(self, symbol: str) -> Dict[str, Any]:
-        """Fetch company information from Yahoo Finance"""
+    def fetch_company_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Fetch company information from Yahoo Finance; None when the request failed"""
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = self.tickers.get(symbol)
             info = ticker.info
 
             if not info:
@@ -206,12 +496,12 @@ class YahooFinanceService:
 
         except Exception as e:
             logger.error(f"Error fetching company info for {symbol}: {str(e)}")
-            return {}
+            return None
 
     def fetch_earnings(self, symbol: str) -> List[Dict[str, Any]]:
         """Fetch earnings data from Yahoo Finance"""
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = self.tickers.get(symbol)
             earnings = ticker.earnings_history
 
             if earnings is None or earnings.empty:
@@ -236,10 +526,34 @@ class YahooFinanceService:
             logger.error(f"Error fetching earnings for {symbol}: {str(e)}")
             return []
 
-    def fetch_financial_statements(self, symbol: str) -> Dict[str, Any]:
-        """Fetch financial statements (income statement, balance sheet, cash flow)"""
+    @staticmethod
+    def statement_records(statement: pd.DataFrame, fields: Dict[str, str], symbol: str,
+                          period_type: str = 'annual') -> List[Dict[str, Any]]:
+        """Turn a Yahoo statement (labels x periods) into table records in one pass"""
+        if statement is None or statement.empty:
+            return []
+
+        statement = statement[~statement.index.duplicated()]
+        # Missing labels come back as all-NaN rows, then periods become rows
+        frame = statement.reindex(list(fields.values())).T
+        frame.columns = list(fields.keys())
+
+        periods = pd.DatetimeIndex(pd.to_datetime(frame.index))
+        frame.insert(0, 'symbol', symbol.replace('.NS', ''))
+        frame.insert(1, 'fiscal_year', periods.year.to_numpy())
+        frame.insert(2, 'period_type', period_type)
+        frame.insert(3, 'fiscal_quarter', periods.quarter.to_numpy() if period_type == 'quarterly' else 0)
+
+        frame = frame.astype(object).where(frame.notna(), None)
+        return frame.to_dict('records')
+
+    def fetch_financial_statements(self, symbol: str, include_quarterly: bool = True) -> Optional[Dict[str, Any]]:
+        """Fetch financial statements (income statement, balance sheet, cash flow).
+
+        None when the request failed or every statement lookup raised.
+        """
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = self.tickers.get(symbol)
 
             financial_data = {
                 'income_statement': [],
@@ -247,164 +561,80 @@ class YahooFinanceService:
                 'cash_flow': []
             }
 
-            # Income Statement
-            try:
-                income_stmt = ticker.income_stmt
-                if income_stmt is not None and not income_stmt.empty:
-                    for period in income_stmt.columns:
-                        year = period.year
-                        period_type = 'annual'
-                        row_data = {
-                            'symbol': symbol.replace('.NS', ''),
-                            'fiscal_year': year,
-                            'period_type': period_type,
-                            'total_revenue': income_stmt.loc['Total Revenue', period] if 'Total Revenue' in income_stmt.index else None,
-                            'cost_of_revenue': income_stmt.loc['Cost Of Revenue', period] if 'Cost Of Revenue' in income_stmt.index else None,
-                            'gross_profit': income_stmt.loc['Gross Profit', period] if 'Gross Profit' in income_stmt.index else None,
-                            'operating_expense': income_stmt.loc['Operating Expense', period] if 'Operating Expense' in income_stmt.index else None,
-                            'operating_income': income_stmt.loc['Operating Income', period] if 'Operating Income' in income_stmt.index else None,
-                            'net_income': income_stmt.loc['Net Income', period] if 'Net Income' in income_stmt.index else None,
-                            'ebit': income_stmt.loc['EBIT', period] if 'EBIT' in income_stmt.index else None,
-                            'ebitda': income_stmt.loc['EBITDA', period] if 'EBITDA' in income_stmt.index else None,
-                            'interest_expense': income_stmt.loc['Interest Expense', period] if 'Interest Expense' in income_stmt.index else None,
-                            'income_before_tax': income_stmt.loc['Pretax Income', period] if 'Pretax Income' in income_stmt.index else None,
-                            'income_tax_expense': income_stmt.loc['Tax Provision', period] if 'Tax Provision' in income_stmt.index else None,
-                            'research_development': income_stmt.loc['Research And Development', period] if 'Research And Development' in income_stmt.index else None,
-                            'selling_general_admin': income_stmt.loc['Selling General And Administration', period] if 'Selling General And Administration' in income_stmt.index else None
-                        }
-                        financial_data['income_statement'].append(row_data)
-            except Exception as e:
-                logger.warning(f"Error fetching income statement for {symbol}: {str(e)}")
+            period_types = ['annual', 'quarterly'] if include_quarterly else ['annual']
+            lookups = failures = 0
+            for period_type in period_types:
+                for name, attribute in STATEMENT_SOURCES[period_type].items():
+                    lookups += 1
+                    try:
+                        financial_data[name] += self.statement_records(
+                            getattr(ticker, attribute), STATEMENT_FIELDS[name], symbol, period_type)
+                    except Exception as e:
+                        failures += 1
+                        logger.warning(f"Error fetching {period_type} {name} for {symbol}: {str(e)}")
 
-            # Balance Sheet
-            try:
-                balance_sheet = ticker.balance_sheet
-                if balance_sheet is not None and not balance_sheet.empty:
-                    for period in balance_sheet.columns:
-                        year = period.year
-                        period_type = 'annual'
-                        row_data = {
-                            'symbol': symbol.replace('.NS', ''),
-                            'fiscal_year': year,
-                            'period_type': period_type,
-                            'total_assets': balance_sheet.loc['Total Assets', period] if 'Total Assets' in balance_sheet.index else None,
-                            'current_assets': balance_sheet.loc['Current Assets', period] if 'Current Assets' in balance_sheet.index else None,
-                            'cash': balance_sheet.loc['Cash And Cash Equivalents', period] if 'Cash And Cash Equivalents' in balance_sheet.index else None,
-                            'total_liabilities': balance_sheet.loc['Total Liabilities Net Minority Interest', period] if 'Total Liabilities Net Minority Interest' in balance_sheet.index else None,
-                            'current_liabilities': balance_sheet.loc['Current Liabilities', period] if 'Current Liabilities' in balance_sheet.index else None,
-                            'total_stockholder_equity': balance_sheet.loc['Total Equity Gross Minority Interest', period] if 'Total Equity Gross Minority Interest' in balance_sheet.index else None,
-                            'retained_earnings': balance_sheet.loc['Retained Earnings', period] if 'Retained Earnings' in balance_sheet.index else None,
-                            'property_plant_equipment': balance_sheet.loc['Property Plant And Equipment Net', period] if 'Property Plant And Equipment Net' in balance_sheet.index else None,
-                            'net_receivables': balance_sheet.loc['Receivables', period] if 'Receivables' in balance_sheet.index else None,
-                            'inventory': balance_sheet.loc['Inventory', period] if 'Inventory' in balance_sheet.index else None,
-                            'accounts_payable': balance_sheet.loc['Payables', period] if 'Payables' in balance_sheet.index else None
-                        }
-                        financial_data['balance_sheet'].append(row_data)
-            except Exception as e:
-                logger.warning(f"Error fetching balance sheet for {symbol}: {str(e)}")
-
-            # Cash Flow Statement
-            try:
-                cash_flow = ticker.cash_flow
-                if cash_flow is not None and not cash_flow.empty:
-                    for period in cash_flow.columns:
-                        year = period.year
-                        period_type = 'annual'
-                        row_data = {
-                            'symbol': symbol.replace('.NS', ''),
-                            'fiscal_year': year,
-                            'period_type': period_type,
-                            'operating_cash_flow': cash_flow.loc['Operating Cash Flow', period] if 'Operating Cash Flow' in cash_flow.index else None,
-                            'investing_cash_flow': cash_flow.loc['Investing Cash Flow', period] if 'Investing Cash Flow' in cash_flow.index else None,
-                            'financing_cash_flow': cash_flow.loc['Financing Cash Flow', period] if 'Financing Cash Flow' in cash_flow.index else None,
-                            'net_income': cash_flow.loc['Net Income', period] if 'Net Income' in cash_flow.index else None,
-                            'depreciation': cash_flow.loc['Depreciation', period] if 'Depreciation' in cash_flow.index else None,
-                            'change_in_receivables': cash_flow.loc['Change In Receivables', period] if 'Change In Receivables' in cash_flow.index else None,
-                            'change_in_liabilities': cash_flow.loc['Change In Payables And Accrued Expense', period] if 'Change In Payables And Accrued Expense' in cash_flow.index else None,
-                            'change_in_inventory': cash_flow.loc['Change In Inventory', period] if 'Change In Inventory' in cash_flow.index else None,
-                            'capital_expenditures': cash_flow.loc['Capital Expenditure', period] if 'Capital Expenditure' in cash_flow.index else None,
-                            'dividends_paid': cash_flow.loc['Dividends Paid', period] if 'Dividends Paid' in cash_flow.index else None
-                        }
-                        financial_data['cash_flow'].append(row_data)
-            except Exception as e:
-                logger.warning(f"Error fetching cash flow for {symbol}: {str(e)}")
-
-            return financial_data
+            return None if failures == lookups else financial_data
 
         except Exception as e:
             logger.error(f"Error fetching financial statements for {symbol}: {str(e)}")
-            return {'income_statement': [], 'balance_sheet': [], 'cash_flow': []}
+            return None
+
+    def fetch_options_data(self, symbol: str, horizon_days: int = None) -> pd.DataFrame:
+        """Fetch the options chain for every expiry within the horizon as one columnar frame.
 
-    def fetch_options_data(self, symbol: str) -> List[Dict[str, Any]]:
-        """Fetch options data from Yahoo Finance"""
+        horizon_days defaults to YAHOO_OPTIONS_HORIZON_DAYS; 0/None keeps all expiries.
+        """
         try:
-            ticker = yf.Ticker(symbol)
-            options = ticker.options
+            ticker = self.tickers.get(symbol)
+            expirations = ticker.options
 
-            if not options:
-                return []
+            if not expirations:
+                return pd.DataFrame()
 
-            options_data = []
-            for expiration_date in options[:5]:  # Limit to first 5 expiration dates
+            horizon_days = self.options_horizon_days if horizon_days is None else horizon_days
+            if horizon_days:
+                cutoff = (datetime.now() + timedelta(days=horizon_days)).strftime('%Y-%m-%d')
+                expirations = [expiry for expiry in expirations if expiry <= cutoff]
+
+            def fetch_expiry(expiration_date: str) -> List[pd.DataFrame]:
                 try:
                     opt = ticker.option_chain(expiration_date)
-
-                    # Calls
-                    if opt.calls is not None and not opt.calls.empty:
-                        for _, row in opt.calls.iterrows():
-                            options_data.append({
-                                'symbol': symbol.replace('.NS', ''),
-                                'option_symbol': row.get('contractSymbol'),
-                                'strike': row.get('strike'),
-                                'last_price': row.get('lastPrice'),
-                                'bid': row.get('bid'),
-                                'ask': row.get('ask'),
-                                'change': row.get('change'),
-                                'change_percent': row.get('percentChange'),
-                                'volume': row.get('volume'),
-                                'open_interest': row.get('openInterest'),
-                                'implied_volatility': row.get('impliedVolatility'),
-                                'in_the_money': row.get('inTheMoney'),
-                                'option_type': 'CALL',
-                                'expiration_date': expiration_date,
-                                'data_date': datetime.now().date()
-                            })
-
-                    # Puts
-                    if opt.puts is not None and not opt.puts.empty:
-                        for _, row in opt.puts.iterrows():
-                            options_data.append({
-                                'symbol': symbol.replace('.NS', ''),
-                                'option_symbol': row.get('contractSymbol'),
-                                'strike': row.get('strike'),
-                                'last_price': row.get('lastPrice'),
-                                'bid': row.get('bid'),
-                                'ask': row.get('ask'),
-                                'change': row.get('change'),
-                                'change_percent': row.get('percentChange'),
-                                'volume': row.get('volume'),
-                                'open_interest': row.get('openInterest'),
-                                'implied_volatility': row.get('impliedVolatility'),
-                                'in_the_money': row.get('inTheMoney'),
-                                'option_type': 'PUT',
-                                'expiration_date': expiration_date,
-                                'data_date': datetime.now().date()
-                            })
-
                 except Exception as e:
                     logger.warning(f"Error fetching options for {symbol} exp {expiration_date}: {str(e)}")
-                    continue
+                    return []
+                return [chain.assign(option_type=option_type, expiration_date=expiration_date)
+                        for chain, option_type in ((opt.calls, 'CALL'), (opt.puts, 'PUT'))
+                        if chain is not None and not chain.empty]
+
+            with ThreadPoolExecutor(max_workers=self.options_fetch_workers) as pool:
+                frames = [frame for frames in pool.map(fetch_expiry, expirations) for frame in frames]
+
+            if not frames:
+                return pd.DataFrame()
 
-            return options_data
+            data = pd.concat(frames, ignore_index=True).rename(columns={
+                'contractSymbol': 'option_symbol',
+                'lastTradeDate': 'last_trade_date',
+                'lastPrice': 'last_price',
+                'percentChange': 'change_percent',
+                'openInterest': 'open_interest',
+                'impliedVolatility': 'implied_volatility',
+                'inTheMoney': 'in_the_money'
+            })
+            data['contract_symbol'] = data['option_symbol']
+            data['symbol'] = symbol.replace('.NS', '')
+            data['data_date'] = datetime.now().date()
+
+            return data.reindex(columns=YAHOO_TABLES['options'].columns)
 
         except Exception as e:
             logger.error(f"Error fetching options data for {symbol}: {str(e)}")
-            return []
+            return pd.DataFrame()
 
-    def fetch_analyst_recommendations(self, symbol: str) -> List[Dict[str, Any]]:
-        """Fetch analyst recommendations from Yahoo Finance"""
+    def fetch_analyst_recommendations(self, symbol: str) -> Optional[List[Dict[str, Any]]]:
+        """Fetch analyst recommendations from Yahoo Finance; None when the request failed"""
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = self.tickers.get(symbol)
             recommendations = ticker.recommendations
 
             if recommendations is None or recommendations.empty:
@@ -431,12 +661,12 @@ class YahooFinanceService:
 
         except Exception as e:
             logger.error(f"Error fetching analyst recommendations for {symbol}: {str(e)}")
-            return []
+            return None
 
-    def fetch_institutional_holders(self, symbol: str) -> List[Dict[str, Any]]:
-        """Fetch institutional holdings from Yahoo Finance"""
+    def fetch_institutional_holders(self, symbol: str) -> Optional[List[Dict[str, Any]]]:
+        """Fetch institutional holdings from Yahoo Finance; None when the request failed"""
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = self.tickers.get(symbol)
             holders = ticker.institutional_holders
 
             if holders is None or holders.empty:
@@ -458,12 +688,12 @@ class YahooFinanceService:
 
         except Exception as e:
             logger.error(f"Error fetching institutional holders for {symbol}: {str(e)}")
-            return []
+            return None
 
     def fetch_insider_transactions(self, symbol: str) -> List[Dict[str, Any]]:
         """Fetch insider transactions from Yahoo Finance"""
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = self.tickers.get(symbol)
             insiders = ticker.insider_transactions
 
             if insiders is None or insiders.empty:
@@ -492,7 +722,7 @@ class YahooFinanceService:
     def fetch_news(self, symbol: str) -> List[Dict[str, Any]]:
         """Fetch news articles from Yahoo Finance"""
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = self.tickers.get(symbol)
             news = ticker.news
 
             if not news:
@@ -505,7 +735,7 @@ class YahooFinanceService:
                     'title': article.get('title'),
                     'publisher': article.get('publisher'),
                     'link': article.get('link'),
-                    'provider_publish_time': datetime.fromtimestamp(article.get('providerPublishTime', 0), tz=datetime.timezone.utc) if article.get('providerPublishTime') else None,
+                    'provider_publish_time': datetime.fromtimestamp(article.get('providerPublishTime', 0), tz=timezone.utc) if article.get('providerPublishTime') else None,
                     'type': article.get('type'),
                     'related_tickers': article.get('relatedTickers', []),
                     'summary': article.get('summary'),
@@ -523,673 +753,330 @@ class YahooFinanceService:
         if data.empty:
             return 0
 
-        conn = self.get_db_connection()
         try:
-            with conn.cursor() as cursor:
-                records = 0
-                for _, row in data.iterrows():
-                    cursor.execute("""
-                        INSERT INTO yahoo_historical_data
-                        (timestamp, symbol, interval, open, high, low, close, adj_close, volume)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (symbol, timestamp, interval) DO UPDATE SET
-                        open = EXCLUDED.open,
-                        high = EXCLUDED.high,
-                        low = EXCLUDED.low,
-                        close = EXCLUDED.close,
-                        adj_close = EXCLUDED.adj_close,
-                        volume = EXCLUDED.volume,
-                        updated_at = CURRENT_TIMESTAMP
-                    """, (
-                        row['timestamp'], row['symbol'], interval,
-                        row.get('open'), row.get('high'), row.get('low'),
-                        row.get('close'), row.get('adj_close'), row.get('volume')
-                    ))
-                    records += 1
-
-                conn.commit()
-                return records
-
+            return self.bulk_writer.upsert(YAHOO_TABLES['historical'], data.assign(interval=interval))
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error saving historical data: {str(e)}")
             raise
-        finally:
-            conn.close()
 
     def save_dividends(self, data: pd.DataFrame):
         """Save dividend data to database"""
         if data.empty:
             return 0
 
-        conn = self.get_db_connection()
         try:
-            with conn.cursor() as cursor:
-                records = 0
-                for _, row in data.iterrows():
-                    cursor.execute("""
-                        INSERT INTO yahoo_dividends
-                        (symbol, ex_dividend_date, dividend_amount)
-                        VALUES (%s, %s, %s)
-                        ON CONFLICT (symbol, ex_dividend_date) DO UPDATE SET
-                        dividend_amount = EXCLUDED.dividend_amount,
-                        updated_at = CURRENT_TIMESTAMP
-                    """, (
-                        row['symbol'], row['ex_dividend_date'], row['dividend_amount']
-                    ))
-                    records += 1
-
-                conn.commit()
-                return records
-
+            return self.bulk_writer.upsert(YAHOO_TABLES['dividends'], data)
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error saving dividend data: {str(e)}")
             raise
-        finally:
-            conn.close()
 
     def save_splits(self, data: pd.DataFrame):
         """Save stock split data to database"""
         if data.empty:
             return 0
 
-        conn = self.get_db_connection()
         try:
-            with conn.cursor() as cursor:
-                records = 0
-                for _, row in data.iterrows():
-                    cursor.execute("""
-                        INSERT INTO yahoo_stock_splits
-                        (symbol, split_date, split_ratio, numerator, denominator)
-                        VALUES (%s, %s, %s, %s, %s)
-                        ON CONFLICT (symbol, split_date) DO UPDATE SET
-                        split_ratio = EXCLUDED.split_ratio,
-                        numerator = EXCLUDED.numerator,
-                        denominator = EXCLUDED.denominator,
-                        updated_at = CURRENT_TIMESTAMP
-                    """, (
-                        row['symbol'], row['split_date'], row['split_ratio'],
-                        row['numerator'], row['denominator']
-                    ))
-                    records += 1
-
-                conn.commit()
-                return records
-
+            return self.bulk_writer.upsert(YAHOO_TABLES['splits'], data)
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error saving split data: {str(e)}")
             raise
-        finally:
-            conn.close()
 
     def save_company_info(self, data: Dict[str, Any]):
         """Save company information to database"""
         if not data:
             return 0
 
-        conn = self.get_db_connection()
         try:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    INSERT INTO yahoo_company_info
-                    (symbol, company_name, sector, industry, country, website, business_summary,
-                     market_cap, enterprise_value, trailing_pe, forward_pe, peg_ratio,
-                     price_to_sales, price_to_book, enterprise_to_revenue, enterprise_to_ebitda,
-                     beta, fifty_two_week_high, fifty_two_week_low, fifty_day_moving_average,
-                     two_hundred_day_moving_average, shares_outstanding, shares_float,
-                     percent_held_by_insiders, percent_held_by_institutions, short_ratio,
-                     short_percent_of_float, shares_short, book_value, price_to_book,
-                     trailing_eps, forward_eps, last_dividend_value, last_dividend_date,
-                     dividend_yield, five_year_avg_dividend_yield, payout_ratio, currency)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                            %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (symbol) DO UPDATE SET
-                    company_name = EXCLUDED.company_name,
-                    sector = EXCLUDED.sector,
-                    industry = EXCLUDED.industry,
-                    market_cap = EXCLUDED.market_cap,
-                    trailing_pe = EXCLUDED.trailing_pe,
-                    dividend_yield = EXCLUDED.dividend_yield,
-                    fifty_two_week_high = EXCLUDED.fifty_two_week_high,
-                    fifty_two_week_low = EXCLUDED.fifty_two_week_low,
-                    last_updated = CURRENT_TIMESTAMP,
-                    updated_at = CURRENT_TIMESTAMP
-                """, (
-                    data.get('symbol'), data.get('company_name'), data.get('sector'),
-                    data.get('industry'), data.get('country'), data.get('website'),
-                    data.get('business_summary'), data.get('market_cap'), data.get('enterprise_value'),
-                    data.get('trailing_pe'), data.get('forward_pe'), data.get('peg_ratio'),
-                    data.get('price_to_sales'), data.get('price_to_book'), data.get('enterprise_to_revenue'),
-                    data.get('enterprise_to_ebitda'), data.get('beta'), data.get('fifty_two_week_high'),
-                    data.get('fifty_two_week_low'), data.get('fifty_day_moving_average'),
-                    data.get('two_hundred_day_moving_average'), data.get('shares_outstanding'),
-                    data.get('shares_float'), data.get('percent_held_by_insiders'),
-                    data.get('percent_held_by_institutions'), data.get('short_ratio'),
-                    data.get('short_percent_of_float'), data.get('shares_short'), data.get('book_value'),
-                    data.get('price_to_book'), data.get('trailing_eps'), data.get('forward_eps'),
-                    data.get('last_dividend_value'), data.get('last_dividend_date'),
-                    data.get('dividend_yield'), data.get('five_year_avg_dividend_yield'),
-                    data.get('payout_ratio'), data.get('currency')
-                ))
-
-                conn.commit()
-                return 1
-
+            return self.bulk_writer.upsert(YAHOO_TABLES['company_info'], [data])
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error saving company info: {str(e)}")
             raise
-        finally:
-            conn.close()
 
     def save_earnings(self, data: List[Dict[str, Any]]):
         """Save earnings data to database"""
         if not data:
             return 0
 
-        conn = self.get_db_connection()
         try:
-            with conn.cursor() as cursor:
-                records = 0
-                for item in data:
-                    cursor.execute("""
-                        INSERT INTO yahoo_earnings
-                        (symbol, quarter, year, eps_estimate, eps_actual, eps_difference,
-                         surprise_percent, earnings_date)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (symbol, quarter, year) DO UPDATE SET
-                        eps_estimate = EXCLUDED.eps_estimate,
-                        eps_actual = EXCLUDED.eps_actual,
-                        eps_difference = EXCLUDED.eps_difference,
-                        surprise_percent = EXCLUDED.surprise_percent,
-                        earnings_date = EXCLUDED.earnings_date,
-                        updated_at = CURRENT_TIMESTAMP
-                    """, (
-                        item.get('symbol'), item.get('quarter'), item.get('year'),
-                        item.get('eps_estimate'), item.get('eps_actual'), item.get('eps_difference'),
-                        item.get('surprise_percent'), item.get('earnings_date')
-                    ))
-                    records += 1
-
-                conn.commit()
-                return records
-
+            return self.bulk_writer.upsert(YAHOO_TABLES['earnings'], data)
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error saving earnings data: {str(e)}")
             raise
-        finally:
-            conn.close()
 
     def save_news(self, data: List[Dict[str, Any]]):
-        """Save news data to database"""
+        """Save news data to database, skipping stories already stored for the symbol"""
         if not data:
             return 0
 
-        conn = self.get_db_connection()
         try:
-            with conn.cursor() as cursor:
-                records = 0
-                for item in data:
-                    cursor.execute("""
-                        INSERT INTO yahoo_news
-                        (symbol, title, publisher, link, provider_publish_time, type,
-                         related_tickers, summary, thumbnail_url)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (link) DO NOTHING
-                    """, (
-                        item.get('symbol'), item.get('title'), item.get('publisher'),
-                        item.get('link'), item.get('provider_publish_time'), item.get('type'),
-                        item.get('related_tickers'), item.get('summary'), item.get('thumbnail_url')
-                    ))
-                    records += 1
-
-                conn.commit()
-                return records
-
+            return self.write_batches([('news', data)])[0]
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error saving news data: {str(e)}")
             raise
-        finally:
-            conn.close()
 
     def save_financial_statements(self, data: Dict[str, Any]):
         """Save financial statements to database"""
-        records_saved = {'income_statement': 0, 'balance_sheet': 0, 'cash_flow': 0}
+        statements = ['income_statement', 'balance_sheet', 'cash_flow']
 
-        conn = self.get_db_connection()
         try:
-            with conn.cursor() as cursor:
-                # Income Statement
-                for item in data.get('income_statement', []):
-                    cursor.execute("""
-                        INSERT INTO yahoo_income_statement
-                        (symbol, fiscal_year, period_type, total_revenue, cost_of_revenue,
-                         gross_profit, operating_expense, operating_income, net_income,
-                         ebit, ebitda, interest_expense, income_before_tax, income_tax_expense,
-                         research_development, selling_general_admin)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (symbol, fiscal_year, period_type) DO UPDATE SET
-                        total_revenue = EXCLUDED.total_revenue,
-                        cost_of_revenue = EXCLUDED.cost_of_revenue,
-                        gross_profit = EXCLUDED.gross_profit,
-                        operating_expense = EXCLUDED.operating_expense,
-                        operating_income = EXCLUDED.operating_income,
-                        net_income = EXCLUDED.net_income,
-                        ebit = EXCLUDED.ebit,
-                        ebitda = EXCLUDED.ebitda,
-                        interest_expense = EXCLUDED.interest_expense,
-                        income_before_tax = EXCLUDED.income_before_tax,
-                        income_tax_expense = EXCLUDED.income_tax_expense,
-                        research_development = EXCLUDED.research_development,
-                        selling_general_admin = EXCLUDED.selling_general_admin,
-                        updated_at = CURRENT_TIMESTAMP
-                    """, (
-                        item.get('symbol'), item.get('fiscal_year'), item.get('period_type'),
-                        item.get('total_revenue'), item.get('cost_of_revenue'), item.get('gross_profit'),
-                        item.get('operating_expense'), item.get('operating_income'), item.get('net_income'),
-                        item.get('ebit'), item.get('ebitda'), item.get('interest_expense'),
-                        item.get('income_before_tax'), item.get('income_tax_expense'),
-                        item.get('research_development'), item.get('selling_general_admin')
-                    ))
-                    records_saved['income_statement'] += 1
-
-                # Balance Sheet
-                for item in data.get('balance_sheet', []):
-                    cursor.execute("""
-                        INSERT INTO yahoo_balance_sheet
-                        (symbol, fiscal_year, period_type, total_assets, current_assets, cash,
-                         total_liabilities, current_liabilities, total_stockholder_equity,
-                         retained_earnings, property_plant_equipment, net_receivables,
-                         inventory, accounts_payable)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (symbol, fiscal_year, period_type) DO UPDATE SET
-                        total_assets = EXCLUDED.total_assets,
-                        current_assets = EXCLUDED.current_assets,
-                        cash = EXCLUDED.cash,
-                        total_liabilities = EXCLUDED.total_liabilities,
-                        current_liabilities = EXCLUDED.current_liabilities,
-                        total_stockholder_equity = EXCLUDED.total_stockholder_equity,
-                        retained_earnings = EXCLUDED.retained_earnings,
-                        property_plant_equipment = EXCLUDED.property_plant_equipment,
-                        net_receivables = EXCLUDED.net_receivables,
-                        inventory = EXCLUDED.inventory,
-                        accounts_payable = EXCLUDED.accounts_payable,
-                        updated_at = CURRENT_TIMESTAMP
-                    """, (
-                        item.get('symbol'), item.get('fiscal_year'), item.get('period_type'),
-                        item.get('total_assets'), item.get('current_assets'), item.get('cash'),
-                        item.get('total_liabilities'), item.get('current_liabilities'),
-                        item.get('total_stockholder_equity'), item.get('retained_earnings'),
-                        item.get('property_plant_equipment'), item.get('net_receivables'),
-                        item.get('inventory'), item.get('accounts_payable')
-                    ))
-                    records_saved['balance_sheet'] += 1
-
-                # Cash Flow
-                for item in data.get('cash_flow', []):
-                    cursor.execute("""
-                        INSERT INTO yahoo_cash_flow
-                        (symbol, fiscal_year, period_type, operating_cash_flow, investing_cash_flow,
-                         financing_cash_flow, net_income, depreciation, change_in_receivables,
-                         change_in_liabilities, change_in_inventory, capital_expenditures, dividends_paid)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (symbol, fiscal_year, period_type) DO UPDATE SET
-                        operating_cash_flow = EXCLUDED.operating_cash_flow,
-                        investing_cash_flow = EXCLUDED.investing_cash_flow,
-                        financing_cash_flow = EXCLUDED.financing_cash_flow,
-                        net_income = EXCLUDED.net_income,
-                        depreciation = EXCLUDED.depreciation,
-                        change_in_receivables = EXCLUDED.change_in_receivables,
-                        change_in_liabilities = EXCLUDED.change_in_liabilities,
-                        change_in_inventory = EXCLUDED.change_in_inventory,
-                        capital_expenditures = EXCLUDED.capital_expenditures,
-                        dividends_paid = EXCLUDED.dividends_paid,
-                        updated_at = CURRENT_TIMESTAMP
-                    """, (
-                        item.get('symbol'), item.get('fiscal_year'), item.get('period_type'),
-                        item.get('operating_cash_flow'), item.get('investing_cash_flow'),
-                        item.get('financing_cash_flow'), item.get('net_income'), item.get('depreciation'),
-                        item.get('change_in_receivables'), item.get('change_in_liabilities'),
-                        item.get('change_in_inventory'), item.get('capital_expenditures'),
-                        item.get('dividends_paid')
-                    ))
-                    records_saved['cash_flow'] += 1
-
-                conn.commit()
-                return records_saved
-
+            counts = self.bulk_writer.upsert_many(
+                (YAHOO_TABLES[name], data.get(name, [])) for name in statements
+            )
+            return dict(zip(statements, counts))
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error saving financial statements: {str(e)}")
             raise
-        finally:
-            conn.close()
 
-    def save_options_data(self, data: List[Dict[str, Any]]):
+    def save_options_data(self, data: pd.DataFrame):
         """Save options data to database"""
-        if not data:
+        if data is None or len(data) == 0:
             return 0
 
-        conn = self.get_db_connection()
         try:
-            with conn.cursor() as cursor:
-                records = 0
-                for item in data:
-                    cursor.execute("""
-                        INSERT INTO yahoo_options_data
-                        (symbol, option_symbol, strike, last_price, bid, ask, change,
-                         change_percent, volume, open_interest, implied_volatility,
-                         in_the_money, option_type, expiration_date, data_date)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (option_symbol, data_date) DO UPDATE SET
-                        last_price = EXCLUDED.last_price,
-                        bid = EXCLUDED.bid,
-                        ask = EXCLUDED.ask,
-                        change = EXCLUDED.change,
-                        change_percent = EXCLUDED.change_percent,
-                        volume = EXCLUDED.volume,
-                        open_interest = EXCLUDED.open_interest,
-                        implied_volatility = EXCLUDED.implied_volatility,
-                        in_the_money = EXCLUDED.in_the_money,
-                        updated_at = CURRENT_TIMESTAMP
-                    """, (
-                        item.get('symbol'), item.get('option_symbol'), item.get('strike'),
-                        item.get('last_price'), item.get('bid'), item.get('ask'), item.get('change'),
-                        item.get('change_percent'), item.get('volume'), item.get('open_interest'),
-                        item.get('implied_volatility'), item.get('in_the_money'), item.get('option_type'),
-                        item.get('expiration_date'), item.get('data_date')
-                    ))
-                    records += 1
-
-                conn.commit()
-                return records
-
+            return self.bulk_writer.upsert(YAHOO_TABLES['options'], data)
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error saving options data: {str(e)}")
             raise
-        finally:
-            conn.close()
 
     def save_analyst_recommendations(self, data: List[Dict[str, Any]]):
         """Save analyst recommendations to database"""
         if not data:
             return 0
 
-        conn = self.get_db_connection()
         try:
-            with conn.cursor() as cursor:
-                records = 0
-                for item in data:
-                    cursor.execute("""
-                        INSERT INTO yahoo_analyst_recommendations
-                        (symbol, period, strong_buy, buy, hold, sell, strong_sell,
-                         total_ratings, average_rating, data_date)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (symbol, period, data_date) DO UPDATE SET
-                        strong_buy = EXCLUDED.strong_buy,
-                        buy = EXCLUDED.buy,
-                        hold = EXCLUDED.hold,
-                        sell = EXCLUDED.sell,
-                        strong_sell = EXCLUDED.strong_sell,
-                        total_ratings = EXCLUDED.total_ratings,
-                        average_rating = EXCLUDED.average_rating,
-                        updated_at = CURRENT_TIMESTAMP
-                    """, (
-                        item.get('symbol'), item.get('period'), item.get('strong_buy'),
-                        item.get('buy'), item.get('hold'), item.get('sell'), item.get('strong_sell'),
-                        item.get('total_ratings'), item.get('average_rating'), item.get('data_date')
-                    ))
-                    records += 1
-
-                conn.commit()
-                return records
-
+            return self.bulk_writer.upsert(YAHOO_TABLES['analyst_recommendations'], data)
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error saving analyst recommendations: {str(e)}")
             raise
-        finally:
-            conn.close()
 
     def save_institutional_holders(self, data: List[Dict[str, Any]]):
         """Save institutional holdings to database"""
         if not data:
             return 0
 
-        conn = self.get_db_connection()
         try:
-            with conn.cursor() as cursor:
-                records = 0
-                for item in data:
-                    cursor.execute("""
-                        INSERT INTO yahoo_institutional_holders
-                        (symbol, holder_name, shares_held, shares_change, percent_held,
-                         value_held, date_reported)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (symbol, holder_name, date_reported) DO UPDATE SET
-                        shares_held = EXCLUDED.shares_held,
-                        shares_change = EXCLUDED.shares_change,
-                        percent_held = EXCLUDED.percent_held,
-                        value_held = EXCLUDED.value_held,
-                        updated_at = CURRENT_TIMESTAMP
-                    """, (
-                        item.get('symbol'), item.get('holder_name'), item.get('shares_held'),
-                        item.get('shares_change'), item.get('percent_held'), item.get('value_held'),
-                        item.get('date_reported')
-                    ))
-                    records += 1
-
-                conn.commit()
-                return records
-
+            return self.bulk_writer.upsert(YAHOO_TABLES['institutional_holders'], data)
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error saving institutional holders: {str(e)}")
             raise
-        finally:
-            conn.close()
 
     def save_insider_transactions(self, data: List[Dict[str, Any]]):
         """Save insider transactions to database"""
         if not data:
             return 0
 
-        conn = self.get_db_connection()
         try:
-            with conn.cursor() as cursor:
-                records = 0
-                for item in data:
-                    cursor.execute("""
-                        INSERT INTO yahoo_insider_transactions
-                        (symbol, insider_name, relation, transaction_date, transaction_type,
-                         owner_type, shares_traded, last_price, shares_held)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (symbol, insider_name, transaction_date, transaction_type) DO UPDATE SET
-                        owner_type = EXCLUDED.owner_type,
-                        shares_traded = EXCLUDED.shares_traded,
-                        last_price = EXCLUDED.last_price,
-                        shares_held = EXCLUDED.shares_held,
-                        updated_at = CURRENT_TIMESTAMP
-                    """, (
-                        item.get('symbol'), item.get('insider_name'), item.get('relation'),
-                        item.get('transaction_date'), item.get('transaction_type'), item.get('owner_type'),
-                        item.get('shares_traded'), item.get('last_price'), item.get('shares_held')
-                    ))
-                    records += 1
-
-                conn.commit()
-                return records
-
+            return self.bulk_writer.upsert(YAHOO_TABLES['insider_transactions'], data)
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error saving insider transactions: {str(e)}")
             raise
-        finally:
-            conn.close()
 
     def log_ingestion(self, symbol: str, data_type: str, records_processed: int,
                      status: str = "success", error_message: str = None,
                      execution_time: float = None, interval: str = None,
                      start_date: datetime = None, end_date: datetime = None):
-        """Log ingestion activity"""
-        conn = self.get_db_connection()
-        try:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    INSERT INTO yahoo_ingestion_logs
-                    (symbol, data_type, interval, start_date, end_date, records_processed,
-                     status, error_message, execution_time_seconds)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    symbol, data_type, interval, start_date, end_date, records_processed,
-                    status, error_message, execution_time
-                ))
-                conn.commit()
-        except Exception as e:
-            logger.error(f"Error logging ingestion: {str(e)}")
-        finally:
-            conn.close()
-
-    def ingest_symbol_data(self, symbol: str, historical_period: str = "2y",
-                          historical_interval: str = "1d", include_extended: bool = True,
-                          include_ai_data: bool = True) -> Dict[str, int]:
-        """Ingest all available data for a symbol for comprehensive AI analysis"""
-        results = {
-            'historical': 0,
-            'dividends': 0,
-            'splits': 0,
-            'company_info': 0,
-            'earnings': 0,
-            'news': 0,
-            'financial_statements': {'income_statement': 0, 'balance_sheet': 0, 'cash_flow': 0},
-            'options': 0,
-            'analyst_recommendations': 0,
-            'institutional_holders': 0,
-            'insider_transactions': 0
-        }
-
-        try:
-            # Historical data
-            start_time = datetime.now()
-            hist_data = self.fetch_historical_data(symbol, historical_period, historical_interval)
-            if not hist_data.empty:
-                results['historical'] = self.save_historical_data(hist_data, historical_interval)
-            execution_time = (datetime.now() - start_time).total_seconds()
-            self.log_ingestion(symbol, 'historical', results['historical'], 'success',
-                             execution_time=execution_time, interval=historical_interval)
-
-            # Dividends
-            start_time = datetime.now()
-            div_data = self.fetch_dividends(symbol)
-            if not div_data.empty:
-                results['dividends'] = self.save_dividends(div_data)
-            execution_time = (datetime.now() - start_time).total_seconds()
-            self.log_ingestion(symbol, 'dividends', results['dividends'], 'success',
-                             execution_time=execution_time)
+        """Log ingestion activity; buffered and written to yahoo_ingestion_logs in batches"""
+        self.log_sink.record(symbol, data_type, records_processed, status, error_message,
+                             execution_time, interval, start_date, end_date)
+        if status == "success":
+            telemetry.source('yahoo').record_rows(records_processed or 0, [symbol])
+
+    def get_ingestion_stages(self, include_extended: bool = True, include_ai_data: bool = True) -> List[str]:
+        """Stages run by ingest_symbol_data for the given options, in order"""
+        stages = list(INGESTION_STAGES['core'])
+        if include_extended:
+            stages += INGESTION_STAGES['extended']
+        if include_ai_data:
+            stages += INGESTION_STAGES['ai']
+        return stages
+
+    def empty_results(self) -> Dict[str, Any]:
+        """Per-stage record counts for a symbol before anything is ingested"""
+        results = {stage: 0 for group in INGESTION_STAGES.values() for stage in group}
+        results['financial_statements'] = {'income_statement': 0, 'balance_sheet': 0, 'cash_flow': 0}
+        return results
 
-            # Stock splits
+    def fetch_stage(self, stage: str, symbol: str, period: str = "2y", interval: str = "1d",
+                    start: datetime = None):
+        """Fetch the payload of one ingestion stage.
+
+        Every request is throttled per endpoint by the shared session. Most
+        fetchers turn failed requests into empty payloads, so a stage during
+        which Yahoo throttled us raises RateLimitedError to be retried. The
+        fetchers of cached stages return None on failure, which raises too, so
+        a failed fetch is retried instead of cached as fresh.
+        """
+        throttled = self.tickers.adapter.throttled()
+        if stage == 'historical':
+            payload = self.fetch_historical_data(symbol, period, interval, start=start)
+        else:
+            payload = getattr(self, STAGE_FETCHERS[stage])(symbol)
+        if self.tickers.adapter.throttled() > throttled:
+            raise RateLimitedError(f"Yahoo throttled the {stage} fetch for {symbol}")
+        if payload is None:
+            raise RuntimeError(f"Yahoo {stage} fetch failed for {symbol}")
+        return payload
+
+    def stage_batches(self, stage: str, payload, interval: str = "1d") -> List[Tuple[str, Any]]:
+        """Split a stage payload into (YAHOO_TABLES key, records) pairs"""
+        if payload is None:
+            return []
+        if stage == 'historical':
+            return [('historical', payload.assign(interval=interval) if not payload.empty else payload)]
+        if stage == 'company_info':
+            return [('company_info', [payload] if payload else [])]
+        if stage == 'financial_statements':
+            return [(name, payload.get(name, [])) for name in ('income_statement', 'balance_sheet', 'cash_flow')]
+        return [(stage, payload)]
+
+    def dedupe_news(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge multi-ticker stories and drop ones already stored for their symbols"""
+        if not self.news_dedup.warmed:
+            try:
+                self.news_dedup.warm(self.get_db_connection)
+            except Exception as e:
+                logger.error(f"Error seeding news de-duplication filter: {str(e)}")
+        return self.news_dedup.merge(records)
+
+    def write_batches(self, batches: List[Tuple[str, Any]]) -> List[int]:
+        """Upsert several datasets in one transaction"""
+        batches = [(dataset, self.dedupe_news(records) if dataset == 'news' else records)
+                   for dataset, records in batches]
+        counts = self.bulk_writer.upsert_many((YAHOO_TABLES[dataset], records)
+                                              for dataset, records in batches)
+        for dataset, records in batches:
+            if dataset == 'news':
+                self.news_dedup.remember(records)
+        return counts
+
+    def snapshot_options(self, symbols: List[str], horizon_days: int = None,
+                         cancel_event: threading.Event = None) -> Dict[str, int]:
+        """Fetch and bulk-load the full option chain of each symbol (e.g. ^NSEI, ^NSEBANK)"""
+        results = {}
+        for symbol in symbols:
+            if cancel_event is not None and cancel_event.is_set():
+                break
             start_time = datetime.now()
-            split_data = self.fetch_splits(symbol)
-            if not split_data.empty:
-                results['splits'] = self.save_splits(split_data)
+            records, status, error = 0, 'success', None
+            try:
+                records = self.save_options_data(self.fetch_options_data(symbol, horizon_days))
+            except Exception as e:
+                status, error = 'failed', str(e)
             execution_time = (datetime.now() - start_time).total_seconds()
-            self.log_ingestion(symbol, 'splits', results['splits'], 'success',
-                             execution_time=execution_time)
-
-            if include_extended:
-                # Company info
-                start_time = datetime.now()
-                info_data = self.fetch_company_info(symbol)
-                if info_data:
-                    results['company_info'] = self.save_company_info(info_data)
-                execution_time = (datetime.now() - start_time).total_seconds()
-                self.log_ingestion(symbol, 'company_info', results['company_info'], 'success',
-                                 execution_time=execution_time)
-
-                # Earnings
-                start_time = datetime.now()
-                earnings_data = self.fetch_earnings(symbol)
-                if earnings_data:
-                    results['earnings'] = self.save_earnings(earnings_data)
-                execution_time = (datetime.now() - start_time).total_seconds()
-                self.log_ingestion(symbol, 'earnings', results['earnings'], 'success',
-                                 execution_time=execution_time)
-
-                # News
-                start_time = datetime.now()
-                news_data = self.fetch_news(symbol)
-                if news_data:
-                    results['news'] = self.save_news(news_data)
-                execution_time = (datetime.now() - start_time).total_seconds()
-                self.log_ingestion(symbol, 'news', results['news'], 'success',
-                                 execution_time=execution_time)
-
-            if include_ai_data:
-                # Financial Statements (for AI analysis)
-                start_time = datetime.now()
-                financial_data = self.fetch_financial_statements(symbol)
-                if financial_data:
-                    results['financial_statements'] = self.save_financial_statements(financial_data)
-                execution_time = (datetime.now() - start_time).total_seconds()
-                total_financial_records = sum(results['financial_statements'].values())
-                self.log_ingestion(symbol, 'financial_statements', total_financial_records, 'success',
-                                 execution_time=execution_time)
-
-                # Options Data (for AI analysis)
-                start_time = datetime.now()
-                options_data = self.fetch_options_data(symbol)
-                if options_data:
-                    results['options'] = self.save_options_data(options_data)
-                execution_time = (datetime.now() - start_time).total_seconds()
-                self.log_ingestion(symbol, 'options', results['options'], 'success',
-                                 execution_time=execution_time)
-
-                # Analyst Recommendations (for AI analysis)
-                start_time = datetime.now()
-                recommendations_data = self.fetch_analyst_recommendations(symbol)
-                if recommendations_data:
-                    results['analyst_recommendations'] = self.save_analyst_recommendations(recommendations_data)
-                execution_time = (datetime.now() - start_time).total_seconds()
-                self.log_ingestion(symbol, 'analyst_recommendations', results['analyst_recommendations'], 'success',
-                                 execution_time=execution_time)
-
-                # Institutional Holders (for AI analysis)
-                start_time = datetime.now()
-                holders_data = self.fetch_institutional_holders(symbol)
-                if holders_data:
-                    results['institutional_holders'] = self.save_institutional_holders(holders_data)
-                execution_time = (datetime.now() - start_time).total_seconds()
-                self.log_ingestion(symbol, 'institutional_holders', results['institutional_holders'], 'success',
-                                 execution_time=execution_time)
-
-                # Insider Transactions (for AI analysis)
-                start_time = datetime.now()
-                insider_data = self.fetch_insider_transactions(symbol)
-                if insider_data:
-                    results['insider_transactions'] = self.save_insider_transactions(insider_data)
-                execution_time = (datetime.now() - start_time).total_seconds()
-                self.log_ingestion(symbol, 'insider_transactions', results['insider_transactions'], 'success',
-                                 execution_time=execution_time)
+            self.log_ingestion(symbol, 'options', records, status, error, execution_time=execution_time)
+            results[symbol] = records
+        return results
 
-        except Exception as e:
-            logger.error(f"Error ingesting data for {symbol}: {str(e)}")
-            self.log_ingestion(symbol, 'error', 0, 'failed', str(e))
+    def ingest_symbol_data(self, symbol: str, historical_period: str = "2y",
+                          historical_interval: str = "1d", include_extended: bool = True,
+                          include_ai_data: bool = True, full_refresh: bool = False,
+                          cancel_event: threading.Event = None) -> Dict[str, int]:
+        """Ingest all available data for a symbol for comprehensive AI analysis.
+
+        Historical data is fetched from the stored watermark and slow-changing datasets
+        are served from the stage cache unless full_refresh is set.
+        """
+        stages = self.get_ingestion_stages(include_extended, include_ai_data)
+        starts = {} if full_refresh else self.get_history_starts([symbol], historical_interval)
+        # Independent stages of a single symbol are fetched concurrently
+        results = self.engine.run([symbol], historical_period, historical_interval,
+                                  include_extended, include_ai_data, workers=len(stages),
+                                  starts=starts, use_cache=not full_refresh,
+                                  cancel_event=cancel_event)
+        self.export_to_lake([symbol], historical_interval)
+        return results[symbol]['breakdown']
+
+    def ingest_historical_batch(self, symbols: List[str], historical_period: str = "2y",
+                                historical_interval: str = "1d",
+                                starts: Dict[str, datetime] = None,
+                                cancel_event: threading.Event = None) -> Dict[str, Any]:
+        """Ingest only historical data, downloading symbols in multi-ticker chunks"""
+        starts = starts or {}
+        total_results = {
+            'total_symbols': len(symbols),
+            'successful_symbols': 0,
+            'failed_symbols': 0,
+            'total_records': 0,
+            'details': []
+        }
 
-        return results
+        # Symbols without a watermark need the full period, so they are never
+        # mixed into the same download as incremental ones
+        chunks = []
+        for group in ([s for s in symbols if s not in starts], [s for s in symbols if s in starts]):
+            chunks += [group[i:i + self.download_batch_size]
+                       for i in range(0, len(group), self.download_batch_size)]
+
+        for index, chunk in enumerate(chunks):
+            if cancel_event is not None and cancel_event.is_set():
+                pending = sum(len(rest) for rest in chunks[index:])
+                logger.info(f"Historical batch ingest cancelled with {pending} symbols pending")
+                break
+            logger.info(f"Downloading historical data for {len(chunk)} symbols...")
+
+            fetch_start = datetime.now()
+            data = self.fetch_historical_batch(chunk, historical_period, historical_interval,
+                                               starts={s: starts[s] for s in chunk if s in starts})
+            fetch_time = (datetime.now() - fetch_start).total_seconds()
+            self.engine.timings.record_fetch('historical_batch', fetch_time)
+
+            counts = data['symbol'].value_counts() if not data.empty else pd.Series(dtype='int64')
+            error = None
+            write_start = datetime.now()
+            try:
+                self.save_historical_data(data, historical_interval)
+            except Exception as e:
+                error = str(e)
+            write_time = (datetime.now() - write_start).total_seconds()
+            self.engine.timings.record_write('historical_batch', write_time, len(data), error is not None)
+
+            execution_time = (fetch_time + write_time) / len(chunk)
+            for symbol in chunk:
+                records = 0 if error else int(counts.get(symbol.replace('.NS', ''), 0))
+                breakdown = self.empty_results()
+                breakdown['historical'] = records
+                detail = {'symbol': symbol, 'status': 'failed' if error else 'success',
+                          'records': records, 'breakdown': breakdown}
+                if error:
+                    detail['error'] = error
+                    total_results['failed_symbols'] += 1
+                else:
+                    total_results['successful_symbols'] += 1
+                total_results['details'].append(detail)
+                total_results['total_records'] += records
+                self.log_ingestion(symbol, 'historical', records, 'failed' if error else 'success',
+                                   error_message=error, execution_time=execution_time,
+                                   interval=historical_interval)
+
+        self.export_to_lake(symbols, historical_interval)
+        return total_results
 
     def ingest_all_symbols(self, symbols: List[str] = None, historical_period: str = "2y",
                           historical_interval: str = "1d", include_extended: bool = True,
-                          include_ai_data: bool = True) -> Dict[str, Any]:
-        """Ingest data for all symbols with comprehensive AI analysis data"""
+                          include_ai_data: bool = True, workers: int = None,
+                          full_refresh: bool = False,
+                          cancel_event: threading.Event = None) -> Dict[str, Any]:
+        """Ingest data for all symbols with comprehensive AI analysis data.
+
+        By default historical data only fetches the tail after each symbol's
+        stored watermark and cached datasets within their TTL are skipped;
+        full_refresh re-downloads the whole historical_period and bypasses the cache.
+        """
         if symbols is None:
             symbols = self.get_symbols_from_master()
 
+        starts = {} if full_refresh else self.get_history_starts(symbols, historical_interval)
+
+        if not include_extended and not include_ai_data:
+            return self.ingest_historical_batch(symbols, historical_period, historical_interval,
+                                                starts, cancel_event)
+
+        logger.info(f"Processing {len(symbols)} symbols for comprehensive AI analysis...")
+        results = self.engine.run(symbols, historical_period, historical_interval,
+                                  include_extended, include_ai_data, workers=workers,
+                                  starts=starts, use_cache=not full_refresh,
+                                  cancel_event=cancel_event)
+
         total_results = {
             'total_symbols': len(symbols),
             'successful_symbols': 0,
@@ -1199,55 +1086,51 @@ class YahooFinanceService:
         }
 
         for symbol in symbols:
-            logger.info(f"Processing {symbol} for comprehensive AI analysis...")
-            try:
-                results = self.ingest_symbol_data(symbol, historical_period, historical_interval,
-                                                include_extended, include_ai_data)
+            breakdown, errors = results[symbol]['breakdown'], results[symbol]['errors']
 
-                # Calculate total records including nested financial statements
-                total_records = (results['historical'] + results['dividends'] + results['splits'] +
-                               results['company_info'] + results['earnings'] + results['news'] +
-                               results['options'] + results['analyst_recommendations'] +
-                               results['institutional_holders'] + results['insider_transactions'] +
-                               sum(results['financial_statements'].values()))
+            # Calculate total records including nested financial statements
+            total_records = sum(sum(count.values()) if isinstance(count, dict) else count
+                                for count in breakdown.values())
 
+            if errors:
+                logger.error(f"Failed to process {symbol}: {errors}")
                 total_results['details'].append({
                     'symbol': symbol,
-                    'status': 'success',
+                    'status': 'failed',
                     'records': total_records,
-                    'breakdown': results
+                    'breakdown': breakdown,
+                    'error': '; '.join(f"{stage}: {error}" for stage, error in errors.items())
                 })
-
-                total_results['successful_symbols'] += 1
-                total_results['total_records'] += total_records
-
-                logger.info(f"Successfully processed {symbol}: {total_records} records for AI analysis")
-
-            except Exception as e:
-                logger.error(f"Failed to process {symbol}: {str(e)}")
+                total_results['failed_symbols'] += 1
+            else:
                 total_results['details'].append({
                     'symbol': symbol,
-                    'status': 'failed',
-                    'error': str(e)
+                    'status': 'success',
+                    'records': total_records,
+                    'breakdown': breakdown
                 })
-                total_results['failed_symbols'] += 1
+                total_results['successful_symbols'] += 1
+
+            total_results['total_records'] += total_records
 
+        self.export_to_lake(symbols, historical_interval)
         return total_results
 
+    def export_to_lake(self, symbols: List[str], interval: str = "1d") -> Optional[Dict[str, int]]:
+        """Append newly ingested bars to the Parquet lake; failures never fail the ingest"""
+        if self.lake is None:
+            return None
+        try:
+            return self.lake.export('yahoo', interval, [symbol.replace('.NS', '') for symbol in symbols])
+        except Exception as e:
+            logger.error(f"Error exporting {interval} bars to the OHLCV lake: {str(e)}")
+            return None
+
     def get_ingestion_status(self) -> Dict[str, Any]:
         """Get current ingestion status"""
         conn = self.get_db_connection()
         try:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-                # Get latest ingestion logs
-                cursor.execute("""
-                    SELECT symbol, data_type, records_processed, status, created_at
-                    FROM yahoo_ingestion_logs
-                    ORDER BY created_at DESC
-                    LIMIT 10
-                """)
-                recent_logs = cursor.fetchall()
-
                 # Get data counts
                 cursor.execute("""
                     SELECT
@@ -1262,8 +1145,16 @@ class YahooFinanceService:
                 counts = cursor.fetchone()
 
                 return {
-                    'recent_activity': recent_logs,
+                    'recent_activity': self.log_sink.recent_activity(10),
+                    'latency': self.log_sink.latency(),
+                    'pending_log_records': self.log_sink.pending(),
                     'data_counts': dict(counts) if counts else {},
+                    'engine': self.engine.status(),
+                    'cache': self.stage_cache.stats(),
+                    'news_dedup': self.news_dedup.stats(),
+                    'db_pool': self.pool.status(),
+                    'tickers': self.tickers.stats(),
+                    'rate_limits': self.rate_limiter.stats(),
                     'last_updated': datetime.now().isoformat()
                 }
 
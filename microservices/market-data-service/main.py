@@ -6,6 +6,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from shared.database import db
 from shared.models import MarketData, APIResponse
+from shared.symbol_resolver import yahoo_symbol
 import yfinance as yf
 import pandas as pd
 import httpx
@@ -52,10 +53,9 @@ async def get_market_data_from_broker(symbol: str, period: str = "1d"):
 async def get_market_data_from_yfinance(symbol: str, period: str = "1d"):
     """Fallback to yfinance for market data"""
     try:
-        # Add .NS suffix for Indian stocks if not present
-        if '.' not in symbol:
-            symbol = f"{symbol}.NS"
-        
+        # Bare NSE symbols and Fyers tickers map to their Yahoo symbols
+        symbol = yahoo_symbol(symbol) or symbol
+
         ticker = yf.Ticker(symbol)
         data = ticker.history(period=period)
         
@@ -150,16 +150,16 @@ async def get_quotes(symbols: str):
         except Exception as e:
             logger.error(f"Error getting quotes from broker: {str(e)}")
         
-        # Fallback to database cache
-        quotes = []
-        for symbol in symbol_list:
-            quote_data = db.execute_query(
-                "SELECT * FROM market_data WHERE symbol = %s",
-                (symbol.replace('.NS', ''),)
-            )
-            
-            if quote_data:
-                quotes.append(quote_data[0])
+        # Fallback to database cache, one query for the whole list
+        cached = db.execute_query(
+            "SELECT * FROM market_data WHERE symbol = ANY(%s)",
+            ([symbol.replace('.NS', '') for symbol in symbol_list],)
+        ) or []
+        by_symbol = {}
+        for row in cached:
+            by_symbol.setdefault(row['symbol'], row)
+        quotes = [by_symbol[symbol.replace('.NS', '')] for symbol in symbol_list
+                  if symbol.replace('.NS', '') in by_symbol]
         
         return APIResponse(success=True, data={"quotes": quotes})
         
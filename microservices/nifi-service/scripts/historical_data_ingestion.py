@@ -6,6 +6,14 @@ import pandas as pd
 from datetime import datetime, timedelta
 import time
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from shared.rate_limiter import AdaptiveRateLimiter, RetryQueue, parse_retry_after
+
+# Fyers allows 10 requests/s and 200/min; stay under the per-minute cap
+rate_limiter = AdaptiveRateLimiter(float(os.environ.get('FYERS_REQUESTS_PER_SECOND', 3)))
 
 def get_access_token():
     """Get access token from database"""
@@ -54,7 +62,7 @@ def get_symbols_from_db():
     return symbols
 
 def fetch_historical_data(symbol):
-    """Fetch historical data from Fyers API"""
+    """Fetch historical data from Fyers API; None means a retryable failure"""
     end_date = datetime.now() - timedelta(minutes=1)
     start_date = end_date - timedelta(days=1)
 
@@ -82,6 +90,7 @@ def fetch_historical_data(symbol):
         "Content-Type": "application/json"
     }
 
+    rate_limiter.acquire("fyers:history")
     try:
         response = requests.get(
             "https://api-t1.fyers.in/data/history",
@@ -89,13 +98,20 @@ def fetch_historical_data(symbol):
             headers=headers,
             timeout=10
         )
-
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("s") == "ok":
-                return data.get("candles", [])
     except Exception as e:
+        rate_limiter.report("fyers:history", None)
         print(f"Error fetching {symbol}: {e}")
+        return None
+
+    if rate_limiter.report("fyers:history", response.status_code,
+                           parse_retry_after(response.headers.get('Retry-After'))):
+        print(f"Fyers throttled {symbol} (HTTP {response.status_code})")
+        return None
+
+    if response.status_code == 200:
+        data = response.json()
+        if data.get("s") == "ok":
+            return data.get("candles", [])
 
     return []
 
@@ -122,9 +138,9 @@ def save_historical_data(symbol, candles):
             try:
                 cursor.execute("""
                     INSERT INTO fyers_historical_data
-                    (symbol, timestamp, date, open, high, low, close, volume)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (symbol, timestamp) DO UPDATE SET
+                    (symbol, resolution, timestamp, date, open, high, low, close, volume)
+                    VALUES (%s, '1D', %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (symbol, resolution, timestamp) DO UPDATE SET
                     open=EXCLUDED.open, high=EXCLUDED.high, low=EXCLUDED.low,
                     close=EXCLUDED.close, volume=EXCLUDED.volume
                 """, (
@@ -148,18 +164,27 @@ def save_historical_data(symbol, candles):
 def main():
     symbols = get_symbols_from_db()
     total_records = 0
-    
-    for symbol in symbols:
-        print(f"Processing {symbol}...")
-        candles = fetch_historical_data(symbol)
-        
-        if candles:
-            count = save_historical_data(symbol, candles)
-            total_records += count
-            print(f"Saved {count} records for {symbol}")
-        
-        time.sleep(0.5)  # Rate limiting
-    
+    retries = RetryQueue(max_attempts=3)
+    work = [(symbol, 0) for symbol in symbols]
+
+    while work or len(retries):
+        for symbol, attempt in work:
+            print(f"Processing {symbol}...")
+            candles = fetch_historical_data(symbol)
+
+            if candles is None:
+                if not retries.push(symbol, attempt + 1):
+                    print(f"Giving up on {symbol} after {attempt} retries")
+                continue
+
+            if candles:
+                count = save_historical_data(symbol, candles)
+                total_records += count
+                print(f"Saved {count} records for {symbol}")
+
+        time.sleep(retries.next_delay() or 0)
+        work = retries.pop_due()
+
     print(f"Total records processed: {total_records}")
     return total_records
 
@@ -1,15 +1,21 @@
+import os
 import requests
 import asyncio
 from datetime import datetime, timedelta
 from shared.database.connections import db
 from shared.events.kafka_manager import EventPublisher
+from shared.rate_limiter import AdaptiveRateLimiter, RateLimitedError, parse_budgets, parse_retry_after
 
 class FyersClient:
-    def __init__(self, user_id=None, access_token=None):
+    def __init__(self, user_id=None, access_token=None, rate_limiter=None):
         self.user_id = user_id
         self.access_token = access_token
         self.base_url = "https://api-t1.fyers.in/api/v3"
         self.headers = None
+        # Fyers allows 10 requests/s and 200/min; the default stays under the per-minute cap
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(
+            float(os.getenv('FYERS_REQUESTS_PER_SECOND', 3)),
+            parse_budgets(os.getenv('FYERS_ENDPOINT_BUDGETS')))
     
     async def init_client(self):
         if not self.access_token and self.user_id:
@@ -24,11 +30,20 @@ class FyersClient:
             result = await conn.fetchval(query, user_id)
             return result
 
+    async def _get(self, endpoint, url, params=None):
+        """GET throttled by the endpoint's budget; raises RateLimitedError on 429/5xx"""
+        await asyncio.sleep(self.rate_limiter.reserve(endpoint))
+        response = requests.get(url, headers=self.headers, params=params)
+        if self.rate_limiter.report(endpoint, response.status_code,
+                                    parse_retry_after(response.headers.get('Retry-After'))):
+            raise RateLimitedError(f"{endpoint} returned HTTP {response.status_code}")
+        return response
+
     async def get_quotes(self, symbols):
         url = f"{self.base_url}/data/quotes"
         params = {"symbols": ",".join(symbols)}
         
-        response = requests.get(url, headers=self.headers, params=params)
+        response = await self._get("fyers:quotes", url, params)
         if response.status_code == 200:
             data = response.json()
             await self._ingest_quotes(data.get('d', {}))
@@ -61,7 +76,7 @@ class FyersClient:
             "cont_flag": "1"
         }
         
-        response = requests.get(url, headers=self.headers, params=params)
+        response = await self._get("fyers:history", url, params)
         if response.status_code == 200:
             data = response.json()
             await self._ingest_historical_data(symbol, resolution, data.get('candles', []))
@@ -87,7 +102,7 @@ class FyersClient:
 
     async def get_holdings(self):
         url = f"{self.base_url}/holdings"
-        response = requests.get(url, headers=self.headers)
+        response = await self._get("fyers:holdings", url)
         if response.status_code == 200:
             data = response.json()
             await self._ingest_holdings(data.get('holdings', []))
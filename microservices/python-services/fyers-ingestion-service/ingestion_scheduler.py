@@ -1,7 +1,11 @@
 import asyncio
+import os
 from datetime import datetime
 from fyers_client import FyersClient
+from tick_stream import (FyersSocketFeed, TickFileFeed, TickStreamIngestion,
+                         kafka_sink, postgres_sink, redis_sink)
 from shared.database.connections import db
+from shared.rate_limiter import RetryQueue, backoff_delay
 
 class IngestionScheduler:
     def __init__(self, user_id=1):
@@ -12,28 +16,86 @@ class IngestionScheduler:
             "NSE:HDFCBANK-EQ", "NSE:ICICIBANK-EQ", "NSE:WIPRO-EQ",
             "NSE:LT-EQ", "NSE:BHARTIARTL-EQ", "NSE:MARUTI-EQ", "NSE:ASIANPAINT-EQ"
         ]
+        # "poll" polls REST quotes every second; "stream" holds a market-data socket open
+        self.realtime_mode = os.getenv('FYERS_REALTIME_MODE', 'poll')
+        stream_symbols = os.getenv('FYERS_STREAM_SYMBOLS')
+        self.stream_symbols = stream_symbols.split(',') if stream_symbols else self.symbols
+        self.tick_stream = None
+
+    def tick_feed(self):
+        """Replay FYERS_TICK_FILE when set, otherwise the live socket; RuntimeError when it cannot start"""
+        tick_file = os.getenv('FYERS_TICK_FILE')
+        if tick_file:
+            return TickFileFeed(tick_file, speed=float(os.getenv('FYERS_TICK_REPLAY_SPEED', 1.0)),
+                                repeat=os.getenv('FYERS_TICK_REPLAY_REPEAT', 'false').lower() == 'true')
+        feed = FyersSocketFeed(self.fyers_client.access_token, self.stream_symbols,
+                               record_path=os.getenv('FYERS_TICK_RECORD'))
+        feed.check()
+        return feed
+
+    async def start_tick_stream(self):
+        """Stream ticks to TimescaleDB, Redis and Kafka in micro-batches.
+
+        A failed stream is reopened with jittered backoff. When the socket
+        cannot start at all (no fyers-apiv3, client id or access token) this
+        falls back to polling REST quotes.
+        """
+        failures = 0
+        while True:
+            try:
+                feed = self.tick_feed()
+            except RuntimeError as e:
+                print(f"Tick stream unavailable, polling quotes instead: {e}")
+                await self.start_real_time_ingestion()
+                return
+            self.tick_stream = TickStreamIngestion(
+                feed, [postgres_sink, redis_sink, kafka_sink],
+                capacity=int(os.getenv('FYERS_TICK_BUFFER', 65536)),
+                batch_size=int(os.getenv('FYERS_TICK_BATCH', 2000)),
+                flush_interval=float(os.getenv('FYERS_TICK_FLUSH_SECONDS', 0.2)))
+            try:
+                await self.tick_stream.run()
+                print(f"Tick stream ended: {self.tick_stream.stats()}")
+                if isinstance(feed, TickFileFeed):
+                    return
+            except Exception as e:
+                print(f"Tick stream error: {e} ({self.tick_stream.stats()})")
+            # A stream that delivered ticks was healthy; start the backoff over
+            failures = 1 if self.tick_stream.received else failures + 1
+            await asyncio.sleep(backoff_delay(failures, base=1.0, cap=60.0))
 
     async def start_real_time_ingestion(self):
         """Start real-time market data ingestion"""
+        failures = 0
         while True:
             try:
                 await self.fyers_client.get_quotes(self.symbols)
+                failures = 0
                 await asyncio.sleep(1)  # 1 second interval
             except Exception as e:
                 print(f"Real-time ingestion error: {e}")
-                await asyncio.sleep(5)
+                failures += 1
+                await asyncio.sleep(backoff_delay(failures, base=1.0, cap=60.0))
 
     async def ingest_historical_data(self):
-        """Ingest historical data for all symbols"""
-        for symbol in self.symbols:
-            try:
-                # Daily data
-                await self.fyers_client.get_historical_data(symbol, "1D")
-                # Hourly data
-                await self.fyers_client.get_historical_data(symbol, "60")
-                await asyncio.sleep(0.5)  # Rate limiting
-            except Exception as e:
-                print(f"Historical ingestion error for {symbol}: {e}")
+        """Ingest daily and hourly history for all symbols.
+
+        Requests are paced by the client's rate limiter; failed (symbol,
+        resolution) pairs are re-queued with jittered backoff.
+        """
+        retries = RetryQueue(max_attempts=3)
+        work = [((symbol, resolution), 0) for symbol in self.symbols for resolution in ("1D", "60")]
+        while work or len(retries):
+            for (symbol, resolution), attempt in work:
+                try:
+                    await self.fyers_client.get_historical_data(symbol, resolution)
+                except Exception as e:
+                    if retries.push((symbol, resolution), attempt + 1):
+                        print(f"Historical ingestion error for {symbol} ({resolution}), retrying: {e}")
+                    else:
+                        print(f"Historical ingestion error for {symbol} ({resolution}): {e}")
+            await asyncio.sleep(retries.next_delay() or 0)
+            work = retries.pop_due()
 
     async def ingest_user_data(self):
         """Ingest user profile, funds, and holdings"""
@@ -52,7 +114,8 @@ class IngestionScheduler:
         
         # Start background tasks
         tasks = [
-            asyncio.create_task(self.start_real_time_ingestion()),
+            asyncio.create_task(self.start_tick_stream() if self.realtime_mode == 'stream'
+                                else self.start_real_time_ingestion()),
             asyncio.create_task(self.periodic_historical_update()),
             asyncio.create_task(self.periodic_user_data_update())
         ]
@@ -0,0 +1,299 @@
+import asyncio
+import importlib.util
+import json
+import os
+import time
+from array import array
+from collections import namedtuple
+from datetime import datetime, timezone
+from shared.database.connections import db
+
+# Numeric tick fields, in ring-buffer column order
+TICK_FIELDS = ('ltp', 'open_price', 'high_price', 'low_price', 'prev_close',
+               'change_value', 'change_percent', 'volume', 'bid', 'ask')
+
+# Fyers data-socket message keys for each tick field
+SOCKET_KEYS = ('ltp', 'open_price', 'high_price', 'low_price', 'prev_close_price',
+               'ch', 'chp', 'vol_traded_today', 'bid_price', 'ask_price')
+
+Tick = namedtuple('Tick', ('symbol', 'time', 'received') + TICK_FIELDS)
+
+
+def decode_tick(message):
+    """(symbol, exchange time, field values) for a socket price message, None for anything else"""
+    if not isinstance(message, dict) or 'symbol' not in message or 'ltp' not in message:
+        return None
+    feed_time = message.get('exch_feed_time') or message.get('last_traded_time') or time.time()
+    return message['symbol'], float(feed_time), tuple(float(message.get(key) or 0) for key in SOCKET_KEYS)
+
+
+class TickRingBuffer:
+    """Fixed-size ring of ticks stored column-wise in typed arrays.
+
+    Symbols are interned to int ids so a tick costs 12 doubles and one int
+    regardless of how many symbols stream. When the writer laps the reader
+    the oldest unread ticks are overwritten and counted in `dropped`.
+    """
+
+    def __init__(self, capacity=65536):
+        self.capacity = capacity
+        self.symbol_ids = {}
+        self.symbols = []
+        self.symbol = array('i', [0]) * capacity
+        self.time = array('d', [0.0]) * capacity
+        self.received = array('d', [0.0]) * capacity
+        self.columns = [array('d', [0.0]) * capacity for _ in TICK_FIELDS]
+        self.write = 0
+        self.read = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self.write - self.read
+
+    def push(self, symbol, feed_time, values, received=None):
+        symbol_id = self.symbol_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self.symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+
+        slot = self.write % self.capacity
+        self.symbol[slot] = symbol_id
+        self.time[slot] = feed_time
+        self.received[slot] = time.time() if received is None else received
+        for column, value in zip(self.columns, values):
+            column[slot] = value
+        self.write += 1
+        if self.write - self.read > self.capacity:
+            self.dropped += self.write - self.read - self.capacity
+            self.read = self.write - self.capacity
+
+    def drain(self, limit=None):
+        """Unread ticks, oldest first, up to limit"""
+        count = len(self) if limit is None else min(len(self), limit)
+        ticks = []
+        for position in range(self.read, self.read + count):
+            slot = position % self.capacity
+            ticks.append(Tick(self.symbols[self.symbol[slot]], self.time[slot], self.received[slot],
+                              *(column[slot] for column in self.columns)))
+        self.read += count
+        return ticks
+
+
+class TickFileFeed:
+    """Replays a recorded tick file in place of the broker socket.
+
+    Each line is one socket message as JSON; an optional "_at" key holds
+    the receive time, and the gaps between lines are replayed scaled by
+    1/speed (speed <= 0 replays as fast as possible).
+    """
+
+    def __init__(self, path, speed=1.0, repeat=False):
+        self.path = path
+        self.speed = speed
+        self.repeat = repeat
+
+    async def __aiter__(self):
+        while True:
+            first = started = None
+            with open(self.path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    message = json.loads(line)
+                    at = message.pop('_at', None)
+                    if self.speed > 0 and at is not None:
+                        if first is None:
+                            first, started = at, time.monotonic()
+                        # Sleep only once ahead of the recorded clock, not per message
+                        ahead = started + (at - first) / self.speed - time.monotonic()
+                        await asyncio.sleep(ahead if ahead > 0.001 else 0)
+                    else:
+                        await asyncio.sleep(0)
+                    yield message
+            if not self.repeat:
+                return
+
+
+class FyersSocketFeed:
+    """Live Fyers market-data socket as an async stream of messages.
+
+    The fyers-apiv3 data socket runs its callbacks on its own thread; they
+    are handed to the event loop through a queue. With record_path every
+    message is also appended, stamped with "_at", in TickFileFeed format.
+    """
+
+    def __init__(self, access_token, symbols, app_id=None, record_path=None, queue_size=100000):
+        self.access_token = access_token
+        self.symbols = list(symbols)
+        self.app_id = app_id or os.getenv('FYERS_CLIENT_ID', '')
+        self.record_path = record_path
+        self.queue_size = queue_size
+        self.dropped = 0
+
+    def check(self):
+        """Raise RuntimeError when the socket cannot be opened at all"""
+        if importlib.util.find_spec('fyers_apiv3') is None:
+            raise RuntimeError("Streaming mode needs the fyers-apiv3 package")
+        if not self.app_id:
+            raise RuntimeError("Streaming mode needs FYERS_CLIENT_ID")
+        if not self.access_token:
+            raise RuntimeError("Streaming mode needs a Fyers access token")
+
+    async def __aiter__(self):
+        self.check()
+        from fyers_apiv3.FyersWebsocket.data_ws import FyersDataSocket
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        record = open(self.record_path, 'a') if self.record_path else None
+
+        def enqueue(message):
+            if queue.full():
+                self.dropped += 1
+            else:
+                queue.put_nowait(message)
+
+        def on_message(message):
+            loop.call_soon_threadsafe(enqueue, message)
+
+        def on_connect():
+            socket.subscribe(symbols=self.symbols, data_type="SymbolUpdate")
+            socket.keep_running()
+
+        socket = FyersDataSocket(
+            access_token=f"{self.app_id}:{self.access_token}",
+            litemode=False,
+            write_to_file=False,
+            reconnect=True,
+            on_connect=on_connect,
+            on_message=on_message,
+            on_error=lambda error: print(f"Fyers socket error: {error}"),
+            on_close=lambda message: print(f"Fyers socket closed: {message}")
+        )
+        await asyncio.to_thread(socket.connect)
+        try:
+            while True:
+                message = await queue.get()
+                if record is not None:
+                    record.write(json.dumps({**message, '_at': time.time()}) + '\n')
+                yield message
+        finally:
+            socket.close_connection()
+            if record is not None:
+                record.close()
+
+
+def tick_record(tick):
+    return {'symbol': tick.symbol, 'exchange': tick.symbol.split(':', 1)[0],
+            'time': datetime.fromtimestamp(tick.time, timezone.utc).isoformat(),
+            **{field: getattr(tick, field) for field in TICK_FIELDS}}
+
+
+async def postgres_sink(batch):
+    """COPY the batch into market_data"""
+    records = [(datetime.fromtimestamp(tick.time, timezone.utc), tick.symbol, tick.symbol.split(':', 1)[0],
+                *(getattr(tick, field) for field in TICK_FIELDS[:7]), int(tick.volume), tick.bid, tick.ask)
+               for tick in batch]
+    async with db.pg_pool.acquire() as conn:
+        await conn.copy_records_to_table('market_data', records=records, columns=[
+            'time', 'symbol', 'exchange', 'ltp', 'open_price', 'high_price', 'low_price', 'prev_close',
+            'change_value', 'change_percent', 'volume', 'bid', 'ask'])
+
+
+async def redis_sink(batch, ttl=60):
+    """Latest quote per symbol under market:{symbol}:{exchange}, plus one batch message on market-ticks"""
+    latest = {tick.symbol: tick_record(tick) for tick in batch}
+    pipe = db.redis_client.pipeline(transaction=False)
+    for symbol, record in latest.items():
+        pipe.setex(f"market:{symbol}:{record['exchange']}", ttl, json.dumps(record))
+    pipe.publish('market-ticks', json.dumps(list(latest.values())))
+    await pipe.execute()
+
+
+async def kafka_sink(batch):
+    """One market-data event per tick, sent without waiting per message"""
+    deliveries = []
+    for tick in batch:
+        record = tick_record(tick)
+        event = {'event_type': 'price_update', 'symbol': tick.symbol, 'exchange': record['exchange'],
+                 'timestamp': record['time'], 'data': record}
+        deliveries.append(await db.kafka_producer.send(
+            'market-data', key=f"{tick.symbol}:{record['exchange']}".encode('utf-8'),
+            value=json.dumps(event).encode('utf-8')))
+    await asyncio.gather(*deliveries)
+
+
+class TickStreamIngestion:
+    """Decodes a tick feed into a ring buffer and fans it out in micro-batches.
+
+    A reader task pushes decoded ticks into the ring; a flusher drains up to
+    batch_size ticks every flush_interval seconds, or as soon as batch_size
+    are waiting, and hands each batch to all sinks concurrently. A failing
+    sink is logged and does not hold up the others.
+    """
+
+    def __init__(self, feed, sinks, capacity=65536, batch_size=2000, flush_interval=0.2):
+        self.feed = feed
+        self.sinks = list(sinks)
+        self.ring = TickRingBuffer(capacity)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.ready = asyncio.Event()
+        self.feed_done = False
+        self.received = 0
+        self.batches = 0
+        self.sink_errors = 0
+        self.last_latency = None
+
+    async def read_feed(self):
+        try:
+            async for message in self.feed:
+                tick = decode_tick(message)
+                if tick is None:
+                    continue
+                self.ring.push(*tick)
+                self.received += 1
+                if len(self.ring) >= self.batch_size:
+                    self.ready.set()
+        finally:
+            self.feed_done = True
+            self.ready.set()
+
+    async def flush(self):
+        batch = self.ring.drain(self.batch_size)
+        if not batch:
+            return
+        results = await asyncio.gather(*(sink(batch) for sink in self.sinks), return_exceptions=True)
+        for sink, result in zip(self.sinks, results):
+            if isinstance(result, Exception):
+                self.sink_errors += 1
+                print(f"Tick sink {getattr(sink, '__name__', sink)} failed: {result}")
+        self.batches += 1
+        # Receive-to-written time of the oldest tick in the batch
+        self.last_latency = time.time() - batch[0].received
+
+    async def run_flusher(self):
+        while not (self.feed_done and len(self.ring) == 0):
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.ready.clear()
+            await self.flush()
+            if len(self.ring) >= self.batch_size:
+                self.ready.set()
+
+    async def run(self):
+        """Stream until the feed ends (file replay) or the task is cancelled"""
+        await asyncio.gather(self.read_feed(), self.run_flusher())
+
+    def stats(self):
+        return {
+            'received': self.received,
+            'buffered': len(self.ring),
+            'dropped': self.ring.dropped,
+            'symbols': len(self.ring.symbols),
+            'batches': self.batches,
+            'sink_errors': self.sink_errors,
+            'last_latency_ms': None if self.last_latency is None else round(self.last_latency * 1000, 1)
+        }
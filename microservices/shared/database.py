@@ -2,11 +2,193 @@ import psycopg2
 from psycopg2 import pool
 import psycopg2.extras
 import os
+import threading
+import time
 from typing import Optional, Dict, Any
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+class PooledConnection:
+    """A connection checked out of a ConnectionPool; close() returns it to the pool.
+
+    Everything else is delegated to the underlying psycopg2 connection, so
+    code written against psycopg2.connect() works unchanged.
+    """
+
+    __slots__ = ('_pool', '_conn')
+
+    def __init__(self, owner: 'ConnectionPool', conn):
+        object.__setattr__(self, '_pool', owner)
+        object.__setattr__(self, '_conn', conn)
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._conn.__exit__(exc_type, exc_value, traceback)
+
+    def _detach(self):
+        conn = self._conn
+        object.__setattr__(self, '_conn', None)
+        return conn
+
+    def close(self):
+        if self._conn is not None:
+            self._pool.putconn(self)
+
+    def __del__(self):
+        # A connection dropped without close() must not leak its pool slot
+        if getattr(self, '_conn', None) is not None:
+            try:
+                self.close()
+            except Exception:
+                pass
+
+
+class ConnectionPool:
+    """Thread-safe psycopg2 pool with health checks and connection-age recycling.
+
+    getconn() blocks up to `timeout` seconds when all `maxconn` connections are
+    checked out. A connection idle for more than `health_check_after` seconds
+    is probed with SELECT 1 before it is handed out, and one older than
+    `max_age` seconds is closed and replaced.
+    """
+
+    def __init__(self, minconn: int = 1, maxconn: int = 10, max_age: float = 1800,
+                 health_check_after: float = 30, timeout: float = 30, **connect_kwargs):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.max_age = max_age
+        self.health_check_after = health_check_after
+        self.timeout = timeout
+        self.connect_kwargs = connect_kwargs
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(maxconn)
+        self._pool = None
+        self.created: Dict[int, float] = {}
+        self.last_used: Dict[int, float] = {}
+        self.stats = {'checkouts': 0, 'connects': 0, 'recycled': 0, 'health_check_failures': 0}
+
+    def _inner(self):
+        # Created on first use so importing a service does not require the database
+        with self.lock:
+            if self._pool is None:
+                self._pool = psycopg2.pool.ThreadedConnectionPool(
+                    self.minconn, self.maxconn, **self.connect_kwargs)
+                logger.info(f"Database connection pool created ({self.minconn}-{self.maxconn} connections)")
+            return self._pool
+
+    def _healthy(self, conn) -> bool:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, inner, conn):
+        with self.lock:
+            self.created.pop(id(conn), None)
+            self.last_used.pop(id(conn), None)
+            self.stats['recycled'] += 1
+        inner.putconn(conn, close=True)
+
+    def getconn(self) -> PooledConnection:
+        if not self.slots.acquire(timeout=self.timeout):
+            raise psycopg2.pool.PoolError(f"No pooled connection free after {self.timeout}s")
+        try:
+            inner = self._inner()
+            while True:
+                conn = inner.getconn()
+                now = time.monotonic()
+                with self.lock:
+                    key = id(conn)
+                    if key not in self.created:
+                        self.created[key] = now
+                        self.stats['connects'] += 1
+                    age = now - self.created[key]
+                    idle = now - self.last_used.get(key, now)
+                    self.stats['checkouts'] += 1
+
+                if conn.closed or age > self.max_age:
+                    self._discard(inner, conn)
+                    continue
+                if idle > self.health_check_after and not self._healthy(conn):
+                    with self.lock:
+                        self.stats['health_check_failures'] += 1
+                    self._discard(inner, conn)
+                    continue
+                return PooledConnection(self, conn)
+        except Exception:
+            self.slots.release()
+            raise
+
+    def putconn(self, conn):
+        """Return a connection; accepts the PooledConnection handed out by getconn()"""
+        raw = conn._detach() if isinstance(conn, PooledConnection) else conn
+        if raw is None:
+            return
+        try:
+            if not raw.closed and raw.autocommit:
+                raw.autocommit = False
+            with self.lock:
+                self.last_used[id(raw)] = time.monotonic()
+            if raw.closed:
+                self._discard(self._pool, raw)
+            else:
+                self._pool.putconn(raw)
+        finally:
+            self.slots.release()
+
+    def closeall(self):
+        with self.lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+            self.created.clear()
+            self.last_used.clear()
+
+    def status(self) -> Dict[str, Any]:
+        with self.lock:
+            return {**self.stats, 'open': len(self.created), 'maxconn': self.maxconn}
+
+
+_pools: Dict[tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(host: str, port: int, user: str, password: str, database: str) -> ConnectionPool:
+    """Process-wide pool for a database; services pointing at the same one share it.
+
+    Sized and tuned through DB_POOL_MIN_CONN, DB_POOL_MAX_CONN, DB_POOL_MAX_AGE,
+    DB_POOL_HEALTH_CHECK_AFTER and DB_POOL_TIMEOUT.
+    """
+    key = (host, int(port), user, database)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                minconn=int(os.getenv('DB_POOL_MIN_CONN', 1)),
+                maxconn=int(os.getenv('DB_POOL_MAX_CONN', 10)),
+                max_age=float(os.getenv('DB_POOL_MAX_AGE', 1800)),
+                health_check_after=float(os.getenv('DB_POOL_HEALTH_CHECK_AFTER', 30)),
+                timeout=float(os.getenv('DB_POOL_TIMEOUT', 30)),
+                host=host, port=int(port), user=user, password=password, database=database
+            )
+        return _pools[key]
+
+
 class DatabaseManager:
     def __init__(self):
         self.config = {
@@ -14,16 +196,14 @@ class DatabaseManager:
             'port': int(os.getenv('DB_PORT', 5432)),
             'user': os.getenv('DB_USER', 'postgres'),
             'password': os.getenv('DB_PASSWORD', 'postgres'),
-            'database': os.getenv('DB_NAME', 'stockmarket'),
-            'minconn': 1,
-            'maxconn': 10
+            'database': os.getenv('DB_NAME', 'stockmarket')
         }
         self.pool = None
         self._create_pool()
 
     def _create_pool(self):
         try:
-            self.pool = psycopg2.pool.SimpleConnectionPool(**self.config)
+            self.pool = get_pool(**self.config)
             logger.info("Database connection pool created successfully")
         except Exception as e:
             logger.error(f"Error creating database pool: {str(e)}")
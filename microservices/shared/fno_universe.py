@@ -0,0 +1,326 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# symbol_master segments holding exchange-traded derivatives
+FNO_SEGMENTS = ('NSE_FO', 'BSE_FO')
+
+# Contract kinds, in their sort order within an expiry
+FUTURE, CALL, PUT = 0, 1, 2
+KIND_NAMES = {FUTURE: 'FUT', CALL: 'CE', PUT: 'PE'}
+OPTION_KINDS = {'CE': CALL, 'PE': PUT}
+
+# Expiries are compared by Indian trading day, whatever their time of day
+IST_OFFSET = 19800
+
+# Index ticker codes whose F&O name differs, for masters without underFyTok
+INDEX_UNDERLYINGS = {'NIFTY50': 'NIFTY', 'NIFTYBANK': 'BANKNIFTY'}
+
+
+class ContractArrays:
+    """Struct-of-arrays F&O contract universe.
+
+    Contracts are sorted by (underlying, expiry, strike, kind), so every
+    underlying and every (underlying, expiry) group is a contiguous row
+    range, and within a group futures (strike -1) come first and options
+    follow in strike order. Lookups are a dict hit plus binary searches.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]]):
+        names: Dict[str, int] = {}
+        aliases: Dict[str, int] = {}
+        columns = {'underlying': [], 'expiry': [], 'strike': [], 'kind': [], 'lot': [], 'ticker': [], 'fy_token': []}
+        seen = set()
+        for row in rows:
+            ticker = row.get('symbol_ticker')
+            underlying = (row.get('under_sym') or '').upper()
+            if not ticker or not underlying or ticker in seen:
+                continue
+            try:
+                expiry = int(row.get('expiry_date'))
+            except (TypeError, ValueError):
+                continue
+            seen.add(ticker)
+            kind = OPTION_KINDS.get((row.get('opt_type') or '').upper(), FUTURE)
+            uid = names.setdefault(underlying, len(names))
+            aliases.setdefault(underlying, uid)
+            if row.get('underlying_ticker'):
+                aliases.setdefault(row['underlying_ticker'].upper(), uid)
+
+            columns['underlying'].append(uid)
+            columns['expiry'].append(expiry)
+            columns['strike'].append(float(row.get('strike_price') or 0) if kind != FUTURE else -1.0)
+            columns['kind'].append(kind)
+            columns['lot'].append(int(row.get('min_lot_size') or 0))
+            columns['ticker'].append(ticker)
+            columns['fy_token'].append(row.get('fy_token'))
+
+        underlying = np.array(columns['underlying'], dtype=np.int32)
+        expiry = np.array(columns['expiry'], dtype=np.int64)
+        strike = np.array(columns['strike'], dtype=np.float64)
+        kind = np.array(columns['kind'], dtype=np.int8)
+        order = np.lexsort((kind, strike, expiry, underlying))
+
+        self.names = list(names)
+        self.aliases = aliases
+        self.underlying = underlying[order]
+        self.expiry = expiry[order]
+        self.strike = strike[order]
+        self.kind = kind[order]
+        self.lot = np.array(columns['lot'], dtype=np.int32)[order]
+        self.ticker = np.array(columns['ticker'], dtype=object)[order]
+        self.fy_token = np.array(columns['fy_token'], dtype=object)[order]
+
+        # (underlying, expiry) groups and the group range of each underlying
+        count = len(order)
+        breaks = np.flatnonzero((self.underlying[1:] != self.underlying[:-1]) |
+                                (self.expiry[1:] != self.expiry[:-1])) + 1
+        self.group_start = np.concatenate(([0], breaks)).astype(np.int64) if count else np.zeros(0, np.int64)
+        self.group_end = np.concatenate((breaks, [count])).astype(np.int64) if count else np.zeros(0, np.int64)
+        self.group_underlying = self.underlying[self.group_start]
+        self.group_expiry = self.expiry[self.group_start]
+        ids = np.arange(len(self.names))
+        self.underlying_groups = np.stack((np.searchsorted(self.group_underlying, ids, 'left'),
+                                           np.searchsorted(self.group_underlying, ids, 'right')), axis=1)
+
+    def __len__(self):
+        return len(self.ticker)
+
+    def underlying_id(self, symbol: str) -> Optional[int]:
+        """Id for an underlying's F&O name (NIFTY), its Fyers ticker (NSE:NIFTY50-INDEX) or a Fyers cash ticker"""
+        key = symbol.strip().upper()
+        uid = self.aliases.get(key)
+        if uid is None and ':' in key:
+            code = key.split(':', 1)[1]
+            code = code.rsplit('-', 1)[0] if '-' in code else code
+            uid = self.aliases.get(INDEX_UNDERLYINGS.get(code, code))
+        return uid
+
+    def expiries(self, uid: int) -> np.ndarray:
+        first, last = self.underlying_groups[uid]
+        return self.group_expiry[first:last]
+
+    def group(self, uid: int, expiry: int = None, now: float = None) -> Optional[int]:
+        """Group index of an underlying's expiry; without one, its next expiry at or after `now`"""
+        first, last = self.underlying_groups[uid]
+        expiries = self.group_expiry[first:last]
+        if expiry is None:
+            position = int(np.searchsorted(expiries, time.time() if now is None else now, 'left'))
+            return first + position if position < len(expiries) else None
+        position = int(np.searchsorted(expiries, expiry, 'left'))
+        return first + position if position < len(expiries) and expiries[position] == expiry else None
+
+    def option_range(self, group: int):
+        """(first option row, end row) of a group; futures sort before the options"""
+        start, end = self.group_start[group], self.group_end[group]
+        return start + int(np.searchsorted(self.strike[start:end], -1.0, 'right')), end
+
+    def strikes(self, group: int) -> np.ndarray:
+        start, end = self.option_range(group)
+        strikes = self.strike[start:end]
+        if len(strikes) == 0:
+            return strikes
+        return strikes[np.concatenate(([True], strikes[1:] != strikes[:-1]))]
+
+    def chain_rows(self, group: int, spot: float = None, strike_count: int = None, kind: int = None) -> np.ndarray:
+        """Option rows of a group, limited to strike_count strikes either side of the one nearest spot"""
+        start, end = self.option_range(group)
+        if spot is not None and strike_count is not None:
+            strikes = self.strikes(group)
+            if len(strikes) == 0:
+                return np.arange(start, start)
+            atm = int(np.searchsorted(strikes, spot))
+            if atm == len(strikes) or (atm > 0 and spot - strikes[atm - 1] <= strikes[atm] - spot):
+                atm -= 1
+            low = strikes[max(0, atm - strike_count)]
+            high = strikes[min(len(strikes) - 1, atm + strike_count)]
+            option_strikes = self.strike[start:end]
+            start, end = (start + int(np.searchsorted(option_strikes, low, 'left')),
+                          start + int(np.searchsorted(option_strikes, high, 'right')))
+        rows = np.arange(start, end)
+        return rows if kind is None else rows[self.kind[start:end] == kind]
+
+    def contracts(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        """Contract dicts for rows, read column-wise rather than one numpy scalar at a time"""
+        columns = zip(self.ticker[rows].tolist(), self.fy_token[rows].tolist(), self.underlying[rows].tolist(),
+                      self.expiry[rows].tolist(), self.strike[rows].tolist(), self.kind[rows].tolist(),
+                      self.lot[rows].tolist())
+        return [{
+            'symbol': ticker,
+            'fy_token': fy_token,
+            'underlying': self.names[underlying],
+            'expiry': expiry,
+            'strike': strike if kind != FUTURE else None,
+            'option_type': KIND_NAMES[kind],
+            'lot_size': lot
+        } for ticker, fy_token, underlying, expiry, strike, kind, lot in columns]
+
+
+class FnOUniverse:
+    """Memory-resident NSE/BSE F&O contracts from symbol_master, for option-chain
+    pre-filtering and strike selection.
+
+    Loaded lazily (or with load()); once older than `ttl` seconds the next
+    query starts a background reload and queries keep using the previous
+    arrays until it is swapped in.
+    Expiries are the master's epoch seconds.
+    """
+
+    def __init__(self, connection_factory: Callable[[], Any] = None, ttl: float = None,
+                 segments: Iterable[str] = FNO_SEGMENTS):
+        self.connection_factory = connection_factory
+        self.ttl = float(os.getenv('FNO_UNIVERSE_TTL', 3600)) if ttl is None else ttl
+        self.segments = list(segments)
+        self.lock = threading.Lock()
+        self.arrays: Optional[ContractArrays] = None
+        self.loaded_at = 0.0
+
+    def _connection(self):
+        if self.connection_factory is None:
+            from shared.database import db
+            self.connection_factory = db.get_connection
+        return self.connection_factory()
+
+    def fetch_rows(self) -> List[Dict[str, Any]]:
+        columns = ['symbol_ticker', 'fy_token', 'under_sym', 'expiry_date', 'strike_price', 'opt_type',
+                   'min_lot_size', 'underlying_ticker']
+        conn = self._connection()
+        try:
+            cursor = conn.cursor(name='fno_universe')
+            cursor.itersize = 20000
+            # The underlying's own ticker comes from its row, found through under_fy_tok
+            cursor.execute("""
+                SELECT d.symbol_ticker, d.fy_token, d.under_sym, d.expiry_date, d.strike_price, d.opt_type,
+                       d.min_lot_size, u.symbol_ticker
+                FROM symbol_master d
+                LEFT JOIN symbol_master u ON u.fy_token = d.under_fy_tok
+                WHERE d.source_master = ANY(%s) AND d.is_active
+            """, (self.segments,))
+            rows = [dict(zip(columns, row)) for row in cursor]
+            cursor.close()
+            conn.commit()
+            return rows
+        finally:
+            conn.close()
+
+    def load(self, rows: Iterable[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build the arrays from derivative rows (queried when not given) and swap them in"""
+        arrays = ContractArrays(self.fetch_rows() if rows is None else rows)
+        self.arrays = arrays
+        self.loaded_at = time.monotonic()
+        logger.info(f"F&O universe loaded {len(arrays)} contracts over {len(arrays.names)} underlyings")
+        return self.stats()
+
+    def ready(self) -> bool:
+        return self.arrays is not None
+
+    def _arrays(self) -> ContractArrays:
+        if self.arrays is None:
+            # The first load blocks every caller
+            with self.lock:
+                if self.arrays is None:
+                    self.load()
+        elif time.monotonic() - self.loaded_at > self.ttl and self.lock.acquire(blocking=False):
+            # Stale arrays keep serving while one background thread reloads them
+            threading.Thread(target=self._reload, name='fno-universe-reload', daemon=True).start()
+        return self.arrays
+
+    def _reload(self):
+        try:
+            self.load()
+        except Exception as e:
+            logger.error(f"F&O universe reload failed, keeping previous contracts: {str(e)}")
+            self.loaded_at = time.monotonic()
+        finally:
+            self.lock.release()
+
+    def has_derivatives(self, symbol: str) -> bool:
+        return self._arrays().underlying_id(symbol) is not None
+
+    def expiries(self, symbol: str) -> List[int]:
+        arrays = self._arrays()
+        uid = arrays.underlying_id(symbol)
+        return [] if uid is None else arrays.expiries(uid).tolist()
+
+    def match_expiry(self, symbol: str, timestamp: int) -> Optional[int]:
+        """The listed expiry falling on the same IST day as timestamp"""
+        day = (int(timestamp) + IST_OFFSET) // 86400
+        for expiry in self.expiries(symbol):
+            if (expiry + IST_OFFSET) // 86400 == day:
+                return expiry
+        return None
+
+    def next_expiry(self, symbol: str, now: float = None) -> Optional[int]:
+        arrays = self._arrays()
+        uid = arrays.underlying_id(symbol)
+        group = None if uid is None else arrays.group(uid, now=now)
+        return None if group is None else int(arrays.group_expiry[group])
+
+    def strikes(self, symbol: str, expiry: int = None) -> List[float]:
+        arrays = self._arrays()
+        uid = arrays.underlying_id(symbol)
+        group = None if uid is None else arrays.group(uid, expiry)
+        return [] if group is None else arrays.strikes(group).tolist()
+
+    def futures(self, symbol: str) -> List[Dict[str, Any]]:
+        arrays = self._arrays()
+        uid = arrays.underlying_id(symbol)
+        if uid is None:
+            return []
+        first, last = arrays.underlying_groups[uid]
+        starts = arrays.group_start[first:last]
+        return arrays.contracts(starts[arrays.kind[starts] == FUTURE])
+
+    def chain(self, symbol: str, expiry: int = None, spot: float = None, strike_count: int = None,
+              option_type: str = None) -> List[Dict[str, Any]]:
+        """Option contracts of an underlying's expiry (next expiry by default), optionally
+        only strike_count strikes either side of the strike nearest spot, and one side"""
+        arrays = self._arrays()
+        uid = arrays.underlying_id(symbol)
+        group = None if uid is None else arrays.group(uid, expiry)
+        if group is None:
+            return []
+        kind = OPTION_KINDS[option_type.upper()] if option_type else None
+        return arrays.contracts(arrays.chain_rows(group, spot, strike_count, kind))
+
+    def select_strike(self, symbol: str, spot: float, option_type: str = 'CE', offset: int = 0,
+                      expiry: int = None) -> Optional[Dict[str, Any]]:
+        """The option `offset` strikes out of the money from ATM (negative: in the money)"""
+        arrays = self._arrays()
+        uid = arrays.underlying_id(symbol)
+        group = None if uid is None else arrays.group(uid, expiry)
+        if group is None:
+            return None
+        kind = OPTION_KINDS[option_type.upper()]
+        # Calls go out of the money upwards, puts downwards
+        steps = offset if kind == CALL else -offset
+        rows = arrays.chain_rows(group, spot, abs(steps), kind)
+        if len(rows) == 0:
+            return None
+        strikes = arrays.strike[rows]
+        atm = int(np.argmin(np.abs(strikes - spot)))
+        position = min(max(atm + steps, 0), len(rows) - 1)
+        return arrays.contracts(rows[position:position + 1])[0]
+
+    def stats(self) -> Dict[str, Any]:
+        arrays = self.arrays
+        if arrays is None:
+            return {'loaded': False}
+        return {
+            'loaded': True,
+            'contracts': len(arrays),
+            'underlyings': len(arrays.names),
+            'expiries': len(arrays.group_start),
+            'array_bytes': sum(column.nbytes for column in (arrays.underlying, arrays.expiry, arrays.strike,
+                                                       arrays.kind, arrays.lot, arrays.ticker, arrays.fy_token))
+        }
+
+
+# Process-wide universe over the shared database
+fno_universe = FnOUniverse()
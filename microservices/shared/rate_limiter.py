@@ -0,0 +1,222 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Responses that mean the remote side wants us to slow down
+THROTTLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class RateLimitedError(Exception):
+    """A fetch failed or came back incomplete because the remote side throttled it"""
+
+
+def parse_budgets(value: Optional[str]) -> Dict[str, float]:
+    """Parse "endpoint=requests_per_second,endpoint=requests_per_second" budgets"""
+    budgets = {}
+    for part in (value or '').split(','):
+        if '=' in part:
+            endpoint, rate = part.split('=', 1)
+            budgets[endpoint.strip()] = float(rate)
+    return budgets
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header; HTTP-date values are ignored"""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2**attempt)]"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take `tokens` now, going into debt if needed; returns the seconds to wait before using them.
+
+        Waiting callers are served in reservation order, and async callers can
+        sleep on the returned delay instead of blocking a thread.
+        """
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= tokens
+            return max(0.0, -self.tokens / self.rate)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until `tokens` are available; returns the seconds spent waiting"""
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+
+class AdaptiveBucket(TokenBucket):
+    """Token bucket whose rate follows the remote side (AIMD).
+
+    A throttling response halves the rate (at most once per `cooldown`
+    seconds, so a burst of in-flight failures counts once) and honours
+    Retry-After by pausing the bucket; every `increase_after` consecutive
+    successes add `increase_step` of the budget back, up to the budget.
+    """
+
+    def __init__(self, budget: float, min_fraction: float = 0.1, decrease_factor: float = 0.5,
+                 increase_after: int = 20, increase_step: float = 0.1, cooldown: float = 1.0):
+        super().__init__(budget)
+        self.max_rate = float(budget)
+        self.min_rate = max(0.01, budget * min_fraction)
+        self.decrease_factor = decrease_factor
+        self.increase_after = increase_after
+        self.increase_step = budget * increase_step
+        self.cooldown = cooldown
+        self.successes = 0
+        self.last_decrease = 0.0
+        self.counters = {'requests': 0, 'throttled': 0}
+
+    def on_success(self):
+        with self.lock:
+            self.counters['requests'] += 1
+            self.successes += 1
+            if self.successes >= self.increase_after and self.rate < self.max_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+                self.successes = 0
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        with self.lock:
+            now = time.monotonic()
+            self.counters['requests'] += 1
+            self.counters['throttled'] += 1
+            self.successes = 0
+            self._refill(now)
+            if now - self.last_decrease >= self.cooldown:
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self.last_decrease = now
+            if retry_after:
+                # Debt of retry_after seconds of tokens holds back every caller
+                self.tokens = min(self.tokens, 0.0) - retry_after * self.rate
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {**self.counters, 'rate': round(self.rate, 3), 'budget': self.max_rate}
+
+
+class AdaptiveRateLimiter:
+    """One adaptive token bucket per endpoint, created lazily.
+
+    `budgets` maps endpoint names (e.g. "yahoo:chart", "fyers:history") to
+    their requests-per-second ceiling; other endpoints get `default_rate`.
+    Callers reserve or acquire a token before each request and report() the
+    response status afterwards so the rate tracks what the server sustains.
+    """
+
+    def __init__(self, default_rate: float, budgets: Optional[Dict[str, float]] = None,
+                 **bucket_options):
+        self.default_rate = default_rate
+        self.budgets = dict(budgets or {})
+        self.bucket_options = bucket_options
+        self.buckets: Dict[str, AdaptiveBucket] = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, endpoint: str) -> AdaptiveBucket:
+        with self.lock:
+            if endpoint not in self.buckets:
+                self.buckets[endpoint] = AdaptiveBucket(self.budgets.get(endpoint, self.default_rate),
+                                                        **self.bucket_options)
+            return self.buckets[endpoint]
+
+    def reserve(self, endpoint: str, tokens: float = 1.0) -> float:
+        return self.bucket(endpoint).reserve(tokens)
+
+    def acquire(self, endpoint: str, tokens: float = 1.0) -> float:
+        return self.bucket(endpoint).acquire(tokens)
+
+    def report(self, endpoint: str, status: Optional[int], retry_after: Optional[float] = None) -> bool:
+        """Feed back a response status (None for a connection error); returns True if it was throttling"""
+        throttled = status is None or status in THROTTLE_STATUSES
+        if throttled:
+            self.bucket(endpoint).on_throttle(retry_after)
+        else:
+            self.bucket(endpoint).on_success()
+        return throttled
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            buckets = dict(self.buckets)
+        return {endpoint: bucket.stats() for endpoint, bucket in buckets.items()}
+
+
+class RetryQueue:
+    """Thread-safe schedule of failed work items, each due after a jittered backoff.
+
+    push() gives up (returns False) once an item has used `max_attempts`
+    retries; pop_due() hands back the items whose delay has elapsed together
+    with their attempt number.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.heap: List[Tuple[float, int, int, Any]] = []
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+        self.counters = {'scheduled': 0, 'exhausted': 0}
+
+    def push(self, item: Any, attempt: int, min_delay: float = 0.0) -> bool:
+        """Schedule retry number `attempt` (1-based) of `item`"""
+        with self.lock:
+            if attempt > self.max_attempts:
+                self.counters['exhausted'] += 1
+                return False
+            delay = max(min_delay, backoff_delay(attempt - 1, self.base_delay, self.max_delay))
+            heapq.heappush(self.heap, (time.monotonic() + delay, next(self.sequence), attempt, item))
+            self.counters['scheduled'] += 1
+            return True
+
+    def pop_due(self) -> List[Tuple[Any, int]]:
+        now = time.monotonic()
+        due = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                _, _, attempt, item = heapq.heappop(self.heap)
+                due.append((item, attempt))
+        return due
+
+    def next_delay(self) -> Optional[float]:
+        """Seconds until the next item is due, or None when the queue is empty"""
+        with self.lock:
+            return max(0.0, self.heap[0][0] - time.monotonic()) if self.heap else None
+
+    def drain(self) -> List[Tuple[Any, int]]:
+        """Remove and return every scheduled item regardless of its due time"""
+        with self.lock:
+            items = [(item, attempt) for _, _, attempt, item in sorted(self.heap)]
+            self.heap = []
+        return items
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.heap)
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {**self.counters, 'pending': len(self.heap)}
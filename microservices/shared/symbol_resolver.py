@@ -0,0 +1,233 @@
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# symbol_master columns the resolver is built from
+RESOLVER_COLUMNS = ['symbol_ticker', 'fy_token', 'isin', 'ex_symbol', 'ex_token', 'ex_series', 'exchange_name',
+                    'source_master', 'sym_details', 'trade_status', 'upper_price', 'lower_price',
+                    'min_lot_size', 'tick_size', 'is_active']
+
+SymbolRecord = namedtuple('SymbolRecord', [
+    'fyers', 'yahoo', 'isin', 'fy_token', 'ex_token', 'exchange', 'segment', 'symbol', 'series', 'name',
+    'active', 'tradeable', 'upper_price', 'lower_price', 'min_lot_size', 'tick_size'])
+
+# Fyers index tickers and their Yahoo symbols
+YAHOO_INDICES = {
+    'NSE:NIFTY50-INDEX': '^NSEI',
+    'NSE:NIFTYBANK-INDEX': '^NSEBANK',
+    'NSE:FINNIFTY-INDEX': 'NIFTY_FIN_SERVICE.NS',
+    'NSE:NIFTYIT-INDEX': '^CNXIT',
+    'NSE:INDIAVIX-INDEX': '^INDIAVIX',
+    'BSE:SENSEX-INDEX': '^BSESN',
+}
+FYERS_INDICES = {yahoo: fyers for fyers, yahoo in YAHOO_INDICES.items()}
+
+# Yahoo suffix of each exchange's cash market, and the series assumed without a master row
+YAHOO_SUFFIXES = {'NSE': '.NS', 'BSE': '.BO'}
+DEFAULT_SERIES = {'NSE': 'EQ', 'BSE': 'A'}
+
+
+def yahoo_symbol(identifier: str) -> Optional[str]:
+    """Yahoo symbol for a Fyers ticker or bare NSE symbol by naming rules alone; None for derivatives"""
+    identifier = identifier.strip().upper()
+    if identifier in YAHOO_INDICES:
+        return YAHOO_INDICES[identifier]
+    if ':' not in identifier:
+        # Already a Yahoo symbol, or a bare NSE symbol
+        return identifier if '.' in identifier or identifier.startswith('^') else identifier + '.NS'
+    exchange, code = identifier.split(':', 1)
+    if '-' not in code or exchange not in YAHOO_SUFFIXES:
+        return None
+    base, series = code.rsplit('-', 1)
+    return None if series == 'INDEX' else base + YAHOO_SUFFIXES[exchange]
+
+
+def fyers_symbol(identifier: str) -> Optional[str]:
+    """Fyers ticker for a Yahoo symbol or bare NSE symbol by naming rules alone"""
+    identifier = identifier.strip().upper()
+    if ':' in identifier:
+        return identifier
+    if identifier in FYERS_INDICES:
+        return FYERS_INDICES[identifier]
+    if identifier.startswith('^'):
+        return None
+    for exchange, suffix in YAHOO_SUFFIXES.items():
+        if identifier.endswith(suffix):
+            return f"{exchange}:{identifier[:-len(suffix)]}-{DEFAULT_SERIES[exchange]}"
+    return f"NSE:{identifier}-EQ"
+
+
+def _number(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def _priority(row: Dict[str, Any]):
+    """Which of several rows sharing an identifier it resolves to: active, cash, NSE, EQ series first"""
+    code = (row.get('symbol_ticker') or '').split(':', 1)[-1]
+    return (row.get('is_active') is False, '-' not in code, row.get('exchange_name') != 'NSE',
+            row.get('ex_series') not in ('EQ', 'A'), row.get('symbol_ticker') or '')
+
+
+class SymbolResolver:
+    """Memoized two-way mapping between Fyers tickers, Yahoo symbols, ISINs,
+    fy_tokens and exchange tokens, built from symbol_master.
+
+    Every identifier of every row goes into one alias dict, so resolving any
+    of them is a single lookup. Where several rows share an identifier (an
+    ISIN listed on NSE and BSE, a bare symbol) the active NSE cash row wins.
+    Once the tables are older than `ttl` seconds the next lookup reloads
+    them while concurrent lookups keep using the previous ones.
+    """
+
+    def __init__(self, connection_factory: Callable[[], Any] = None, ttl: float = None):
+        self.connection_factory = connection_factory
+        self.ttl = float(os.getenv('SYMBOL_RESOLVER_TTL', 3600)) if ttl is None else ttl
+        self.lock = threading.Lock()
+        # (records, aliases) swapped as one object so readers never see a mix
+        self.tables: Optional[Tuple[List[SymbolRecord], Dict[str, int]]] = None
+        self.loaded_at = 0.0
+
+    def _connection(self):
+        if self.connection_factory is None:
+            from shared.database import db
+            self.connection_factory = db.get_connection
+        return self.connection_factory()
+
+    def fetch_rows(self) -> List[Dict[str, Any]]:
+        conn = self._connection()
+        try:
+            cursor = conn.cursor(name='symbol_resolver')
+            cursor.itersize = 20000
+            cursor.execute(f"SELECT {', '.join(RESOLVER_COLUMNS)} FROM symbol_master")
+            rows = [dict(zip(RESOLVER_COLUMNS, row)) for row in cursor]
+            cursor.close()
+            conn.commit()
+            return rows
+        finally:
+            conn.close()
+
+    def load(self, rows: Iterable[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build the tables from symbol_master rows (queried when not given) and swap them in"""
+        rows = sorted(self.fetch_rows() if rows is None else rows, key=_priority)
+        records, aliases = [], {}
+        for row in rows:
+            ticker = (row.get('symbol_ticker') or '').upper()
+            if not ticker:
+                continue
+            exchange = row.get('exchange_name') or ticker.split(':', 1)[0]
+            code = ticker.split(':', 1)[-1]
+            cash = '-' in code and not code.endswith('-INDEX')
+            record = SymbolRecord(
+                fyers=ticker,
+                yahoo=YAHOO_INDICES.get(ticker) or (yahoo_symbol(ticker) if cash else None),
+                isin=row.get('isin') or None,
+                fy_token=row.get('fy_token') or None,
+                ex_token=row.get('ex_token'),
+                exchange=exchange,
+                segment=row.get('source_master'),
+                symbol=row.get('ex_symbol'),
+                series=row.get('ex_series'),
+                name=row.get('sym_details'),
+                active=row.get('is_active') is not False,
+                tradeable=row.get('trade_status') == 1,
+                upper_price=_number(row.get('upper_price')),
+                lower_price=_number(row.get('lower_price')),
+                min_lot_size=row.get('min_lot_size'),
+                tick_size=_number(row.get('tick_size'))
+            )
+            position = len(records)
+            records.append(record)
+
+            keys = [ticker, record.yahoo, record.isin, record.fy_token]
+            if record.segment and record.ex_token is not None:
+                keys.append(f"{record.segment}:{record.ex_token}")
+            if cash and exchange == 'NSE':
+                keys.append(code.rsplit('-', 1)[0])
+            for key in keys:
+                if key:
+                    aliases.setdefault(str(key).upper(), position)
+
+        self.tables = (records, aliases)
+        self.loaded_at = time.monotonic()
+        logger.info(f"Symbol resolver loaded {len(records)} symbols, {len(aliases)} identifiers")
+        return {'symbols': len(records), 'identifiers': len(aliases)}
+
+    def _tables(self):
+        tables = self.tables
+        if tables is None or time.monotonic() - self.loaded_at > self.ttl:
+            # The first load blocks every caller; later reloads run in one caller only
+            if self.lock.acquire(blocking=tables is None):
+                try:
+                    if self.tables is tables:
+                        try:
+                            self.load()
+                        except Exception as e:
+                            if tables is None:
+                                raise
+                            logger.error(f"Symbol resolver reload failed, keeping previous tables: {str(e)}")
+                            self.loaded_at = time.monotonic()
+                finally:
+                    self.lock.release()
+        return self.tables
+
+    def lookup(self, identifier: str) -> Optional[SymbolRecord]:
+        """The record for a Fyers ticker, Yahoo symbol, ISIN, fy_token, "<master>:<exchange token>"
+        (e.g. "NSE_CM:2885") or bare NSE symbol"""
+        if not identifier:
+            return None
+        records, aliases = self._tables()
+        position = aliases.get(identifier.strip().upper())
+        return None if position is None else records[position]
+
+    def resolve(self, identifier: str) -> Optional[Dict[str, Any]]:
+        record = self.lookup(identifier)
+        return None if record is None else record._asdict()
+
+    def resolve_many(self, identifiers: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return {identifier: self.resolve(identifier) for identifier in identifiers}
+
+    def validate(self, identifier: str) -> Dict[str, Any]:
+        record = self.lookup(identifier)
+        if record is None:
+            return {'valid': False}
+        return {
+            'valid': record.active,
+            'symbol': record._asdict(),
+            'tradeable': record.active and record.tradeable,
+            'limits': {
+                'upper_price': record.upper_price,
+                'lower_price': record.lower_price,
+                'min_lot_size': record.min_lot_size,
+                'tick_size': record.tick_size
+            }
+        }
+
+    def validate_many(self, identifiers: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        return {identifier: self.validate(identifier) for identifier in identifiers}
+
+    def to_yahoo(self, identifier: str) -> Optional[str]:
+        """Yahoo symbol from the master, else by naming rules"""
+        record = self.lookup(identifier)
+        return record.yahoo if record is not None else yahoo_symbol(identifier)
+
+    def to_fyers(self, identifier: str) -> Optional[str]:
+        """Fyers ticker from the master, else by naming rules"""
+        record = self.lookup(identifier)
+        return record.fyers if record is not None else fyers_symbol(identifier)
+
+    def equities(self, exchange: str = 'NSE', limit: int = None) -> List[SymbolRecord]:
+        """Active equity-series cash symbols of an exchange, in master order"""
+        records, _ = self._tables()
+        series = DEFAULT_SERIES.get(exchange, 'EQ')
+        matches = (record for record in records
+                   if record.active and record.exchange == exchange and record.series == series)
+        return [record for _, record in zip(range(limit), matches)] if limit else list(matches)
+
+
+# Process-wide resolver over the shared database
+symbol_resolver = SymbolResolver()